@@ -1,11 +1,29 @@
 from agent.computer import Computer
+from agent.game_state import GameState, compile_state, state_to_dict
+from agent.transposition_table import ZobristHasher, TranspositionTable
+from agent.search_statistics import SearchStatistics, json_value
+from agent.parallel_search import RootSearchPool
+from grid_graph import (
+    ACTION_DIRECTIONS,
+    ALL_ACTIONS,
+    FOLLOW_MASKS,
+    MASK_ACTIONS,
+    NO_CELL,
+    UNREACHABLE
+)
 import constants as C
 import numpy as np
+import json
+import random
 import time
-import copy
 from abc import abstractmethod
 
 
+class SearchTimeout(Exception):
+    """ Raised inside a search when the time budget for the move has run
+    out. """
+
+
 class CompetitiveComputer(Computer):
     """ This class will represent the agents different pathfinding algos
         available to use.
@@ -18,9 +36,102 @@ class CompetitiveComputer(Computer):
             be controlling.
         state (dict): Representation of the game state and any given moment.
         _agent_type (int): Identifies if the agent is the main or enemy.
+        joint_enemies (bool): The computer chooses the moves of every enemy,
+            not just those of its own agent.
+        best_reply_search (bool): The main agent searches against only the
+            most dangerous enemy move between two of its own moves, instead
+            of against every enemy moving in turn.
         _prev_action (str): stores the previous action the minimax agent has
             taken.
+        _diamond_cells (tuple of int): The diamond cells the bits of the
+            current search's GameState diamond masks refer to.
+        _diamond_bits (dict): Maps a diamond cell to its bit in the mask.
+        _cell_offsets (dict): Maps an action to the change in cell index it
+            makes.
+        move_time_ms (int): The time budget for choosing a move, in
+            milliseconds. If None the search always goes to a fixed depth.
+        depth_limit (int): The fixed depth searched to without a time
+            budget.
+        search_depth (int): The depth of the last completed search.
+        _deadline (float): The perf_counter time the running search has to
+            give up at, or None.
+        transposition_table (TranspositionTable): The positions this
+            computer has searched, kept between moves.
+        _hasher (ZobristHasher): Gives the transposition table keys.
+        _hashed_distances (ndarray): The distance table the transposition
+            table entries were evaluated with.
+        search_statistics (SearchStatistics): Node, cutoff and timing
+            counts for the current move.
+        principal_variation (list): The (agent index, action) moves the
+            last completed search expects to be played from the root.
+        _pv (dict): Maps a depth to the best line found from the node
+            being searched at that depth.
+        _killers (dict): Maps a depth to the (at most two) actions that
+            last caused a cutoff at that depth.
+        _history (dict): Maps an (agent index, cell, action) move to a score
+            that grows every time the move causes a cutoff.
+        search_workers (int): The number of worker processes to search the
+            root moves on, or None to search in this thread.
+        _search_pool (RootSearchPool): The worker processes, started the
+            first time they are needed.
+        _cell_distances (ndarray): The distance table as floats, with
+            unreachable pairs set to -infinity the way get_cell_distance
+            returns them.
+        _diamond_distances (ndarray): The columns of _cell_distances for
+            the diamond cells of the current search.
+        _nearest_diamond (list of float): The distance from every cell to
+            the closest diamond of the current search, the way
+            evaluation_function finds it.
+        _enemy_term_rows (dict): Maps the cell of the main agent to what an
+            enemy on each cell takes off the score, filled in as the search
+            needs them.
+        plan_horizon (int): The most moves made from the principal
+            variation of one search, counting the move searched for.
+        _plan (list of tuple): The (state, action) moves left to make from
+            the principal variation of the last search, where state is the
+            state the search expects the move to be made from.
+        _plan_diamond_cells (tuple of int): The diamond cells the states of
+            _plan were compiled with.
+        _plan_distances (ndarray): The distance table _plan was searched
+            with.
+        searches_avoided (int): The moves made from a plan instead of a new
+            search.
+        plans_invalidated (int): The plans given up on because the game
+            did not go the way the search expected.
     """
+    # The next move depends on where the enemies are, not just the maze.
+    use_path_cache = False
+
+    # Remember searched positions for the rest of the game.
+    use_transposition_table = True
+
+    # Try the moves most likely to cause a cutoff first. Only alpha-beta
+    # prunes, so only it gains anything from the ordering.
+    use_move_ordering = False
+
+    # Search the root moves on worker processes when given search_workers.
+    # Alpha-beta needs the value of the earlier moves to prune the later
+    # ones, so it always searches in one thread.
+    use_root_parallelism = False
+
+    # Carry the terms of evaluation_function in the states of the search,
+    # updating them as each agent moves, so scoring a leaf takes no distance
+    # lookups.
+    use_incremental_evaluation = True
+
+    # Keep making the moves of the principal variation while the other
+    # agents keep to it, instead of searching again for every grid.
+    use_plans = True
+
+    # The attributes the worker processes of a root parallel search copy
+    # from this computer.
+    worker_settings = (
+        "use_transposition_table",
+        "use_move_ordering",
+        "use_incremental_evaluation",
+        "best_reply_search"
+    )
+
     def __init__(self, character, walkable_maze, **kwargs):
         super().__init__(
             character,
@@ -31,16 +142,248 @@ class CompetitiveComputer(Computer):
         self.state = kwargs.get("state", {})
 
         self._agent_type = kwargs.get("agent_type")
+        self.joint_enemies = kwargs.get("joint_enemies", False)
+
+        # A best-reply search is searched from the side of the main agent,
+        # an enemy needs the move of its own agent from every round.
+        self.best_reply_search = (
+            kwargs.get("enemy_search") == "best-reply" and
+            self._agent_type == 0
+        )
 
         self._prev_action = None
         self.num_characters = kwargs.get("num_characters")
         self.nodes_expanded = 0
 
+        self.move_time_ms = kwargs.get("move_time_ms")
+        self.depth_limit = (
+            kwargs.get("depth_limit") or C.COMPETITIVE_SEARCH_DEPTH
+        )
+        self.search_depth = 0
+        self._root_depth = None
+        self._deadline = None
+
+        self._diamond_cells = ()
+        self._diamond_bits = {}
+        self._cell_offsets = {}
+
+        self.transposition_table = TranspositionTable()
+        self._hasher = None
+        self._hashed_distances = None
+
+        self.search_statistics = SearchStatistics()
+        self.principal_variation = []
+        self._pv = {}
+        self._killers = {}
+        self._history = {}
+
+        self.search_workers = kwargs.get("search_workers")
+        self._search_pool = None
+
+        self._cell_distances = None
+        self._diamond_distances = None
+        self._nearest_diamond = []
+        self._enemy_term_rows = {}
+
+        self.plan_horizon = kwargs.get("plan_horizon") or C.PLAN_HORIZON
+        self._plan = []
+        self._plan_diamond_cells = None
+        self._plan_distances = None
+        self.searches_avoided = 0
+        self.plans_invalidated = 0
+
+    def to_game_state(self, state) -> GameState:
+        """ Compile a game state dict into the GameState the search works
+        on. The diamond cells it was compiled with are kept, so the diamond
+        bits of every state in this search can be read back.
+
+        Args:
+            state (dict or GameState): The state to compile, a GameState is
+                returned as it is.
+
+        Returns:
+            GameState: The compiled state.
+        """
+        if isinstance(state, GameState):
+            return state
+
+        grid = self._grid
+        game_state, self._diamond_cells = compile_state(state, grid)
+
+        self._diamond_bits = {
+            cell: 1 << bit for bit, cell in enumerate(self._diamond_cells)
+        }
+        self._cell_offsets = grid.action_offsets
+
+        # Stored values were scored with the maze distances, they are no
+        # good once the walkable grids have changed.
+        distances = grid.get_distance_table()
+        if distances is not self._hashed_distances:
+            self._hasher = ZobristHasher(grid.get_cell_count())
+            self._hashed_distances = distances
+            self.transposition_table.clear()
+
+            self._cell_distances = distances.astype(np.float64)
+            self._cell_distances[distances == UNREACHABLE] = float("-inf")
+            self._enemy_term_rows = {}
+
+        # The diamonds change between searches, their columns are copied
+        # out once so the closest diamond is found in one small table.
+        diamond_ranks = np.array(
+            [grid.walkable_rank[cell] for cell in self._diamond_cells],
+            dtype=np.intp
+        )
+        self._diamond_distances = np.where(
+            diamond_ranks == NO_CELL,
+            float("-inf"),
+            self._cell_distances[:, diamond_ranks]
+        )
+
+        if self.use_incremental_evaluation:
+            game_state = self.add_evaluation_terms(game_state)
+
+        self.transposition_table.new_search()
+
+        # Killer moves only make sense within one search, the history is
+        # kept but older cutoffs count for less and less.
+        self._killers = {}
+        self._history = {
+            move: score // 2 for move, score in self._history.items()
+            if score > 1
+        }
+
+        return game_state
+
+    def add_evaluation_terms(self, state) -> GameState:
+        """ Give a state the terms of the evaluation function, so they can
+        be carried down the search by generate_successor. The closest
+        diamond to every cell is worked out first, as the diamonds in play
+        never change below the state.
+
+        Args:
+            state (GameState): The state at the root of the search.
+
+        Returns:
+            GameState: The state with its terms, or the state as it is if an
+                agent is off the maze, as there are no distances to it.
+        """
+        cell_count = self._grid.get_cell_count()
+        if not all(0 <= cell < cell_count
+                   for cell in (state.player,) + state.enemies):
+            return state
+
+        in_play = [
+            column for column in range(len(self._diamond_cells))
+            if state.diamonds >> column & 1
+        ]
+
+        # Unreachable diamonds are at -infinity, as in evaluation_function.
+        # A wall reaches nothing.
+        nearest = np.full(cell_count,
+                          float("-inf") if in_play else float("inf"))
+        nearest[self._grid.walkable_cells] = (
+            self._diamond_distances[:, in_play].min(
+                axis=1, initial=float("inf")
+            )
+        )
+        self._nearest_diamond = nearest.tolist()
+
+        enemy_terms = self.get_enemy_terms(state.player, state.enemies)
+
+        return state._replace(
+            enemy_terms=enemy_terms,
+            enemy_score=self.get_enemy_score(enemy_terms),
+            closest_diamond=self._nearest_diamond[state.player]
+        )
+
+    def get_enemy_terms(self, player, enemies) -> tuple:
+        """ What each enemy takes off the score with the main agent on the
+        cell player. """
+        row = self.get_enemy_term_row(player)
+
+        return tuple(row[enemy_cell] for enemy_cell in enemies)
+
+    def get_enemy_term_row(self, player) -> list:
+        """ What an enemy on each cell takes off the score with the main
+        agent on the cell player, the way evaluation_function works it out.
+        The rows are kept until the maze distances change. """
+        row = self._enemy_term_rows.get(player)
+
+        if row is None:
+            grid = self._grid
+            distances = np.full(grid.get_cell_count(), float("-inf"))
+
+            rank = grid.walkable_rank[player]
+            if rank != NO_CELL:
+                distances[grid.walkable_cells] = self._cell_distances[rank]
+
+            row = (20 / (distances + 1)).tolist()
+            self._enemy_term_rows[player] = row
+
+        return row
+
+    @staticmethod
+    def get_enemy_score(enemy_terms) -> float:
+        """ Take the enemy terms off zero in the order evaluation_function
+        does, so the rounding matches. """
+        score = 0
+        for term in enemy_terms:
+            score -= term
+
+        return score
+
+    def controls_agent(self, agent_index) -> bool:
+        """ Check if this computer chooses the moves of an agent, rather
+        than playing against them. """
+        if self.joint_enemies:
+            return agent_index != 0
+
+        return agent_index == self._agent_type
+
+    def get_transposition_key(self, state, agent_index, player_action,
+                              enemy_action):
+        """ Return the transposition table key of a game tree node, or None
+        if this computer does not use the table. """
+        if not self.use_transposition_table:
+            return None
+
+        return self._hasher.get_key(state, self._diamond_cells, agent_index,
+                                    player_action, enemy_action)
+
+    def lookup_transposition(self, key, depth, alpha, beta):
+        """ Return the (value, action) stored for a node, or None if the
+        node has to be searched. The root is always searched, as a stored
+        result has no principal variation to go with it. """
+        if key is None or depth == self._root_depth:
+            return None
+
+        return self.transposition_table.lookup(key, depth, alpha, beta)
+
+    def store_transposition(self, key, depth, result, nodes_before, alpha,
+                            beta) -> None:
+        """ Store the (value, action) result of searching a node, along
+        with the number of nodes the search expanded. """
+        # A search cut short by the thread stopping has no real value.
+        if key is None or self.stop_thread:
+            return
+
+        value, action = result
+
+        self.transposition_table.store(
+            key,
+            depth,
+            value,
+            action,
+            self.nodes_expanded - nodes_before,
+            alpha,
+            beta
+        )
+
     def evaluation_function(self, state, depth, player_action):
         """The function is used to calculate the cost of a game state.
 
         Attributes:
-            state (dict): The current game state.
+            state (GameState): The current game state.
             depth (int): The current depth of the game tree.
             player_action (str): The action taken by the player.
 
@@ -48,48 +391,60 @@ class CompetitiveComputer(Computer):
                 int: The score of the state.
         """
 
-        main_agent_pos = state["main_agent"]
-        enemy_agent_positions = state["enemies"]
+        main_agent_cell = state.player
         score = 0
 
         # if the state ends in a win or lose state, we return -/+infinity
-        if state["lose"]:
+        if state.lose:
             return float('-inf')
-        if state["win"]:
+        if state.win:
             return float('inf')
 
+        # The terms carried down the search add up to the same score.
+        if state.enemy_terms is not None:
+            return (state.enemy_score + 10 / (state.closest_diamond + 1) +
+                    state.diamond_count)
+
         # We need to go through every enemy agent and calculate the total
         # distance between the main agent and enemy agents.
-        for enemy_agent in enemy_agent_positions:
+        for enemy_cell in state.enemies:
             # Add the bfs distance between the main agent and enemy position of
             # the given state.
             score -= (
-                20 / (self.generate_bfs_dist(main_agent_pos, enemy_agent) + 1)
+                20 / (self.get_cell_distance(main_agent_cell, enemy_cell) + 1)
             )
 
-        # For the second set of calculations we will need information about
-        # the diamonds, so we will store all there coords in a list.
-        diamond_positions = state["diamond_coords"]
-
-        # from all the diamonds in the game, find the closet one.
+        # from all the diamonds still in the game, find the closet one.
         closest_diamond = float("inf")
-        for diamond in diamond_positions:
-            closest_diamond = min(
-                closest_diamond,
-                self.generate_bfs_dist(main_agent_pos, diamond)
-            )
+        for bit, diamond_cell in enumerate(self._diamond_cells):
+            if state.diamonds >> bit & 1:
+                closest_diamond = min(
+                    closest_diamond,
+                    self.get_cell_distance(main_agent_cell, diamond_cell)
+                )
 
         score += 10 / (closest_diamond + 1)
 
         # We will give awards for the number of diamonds the current state
         # covers for the main agent.
-        score += state["diamond_count"]
+        score += state.diamond_count
 
         return score
 
+    def evaluate_leaf(self, state, depth, player_action):
+        """ Score a leaf of the game tree with the evaluation function,
+        recording the time it took in the search statistics. """
+        started = time.perf_counter()
+        value = self.evaluation_function(state, depth, player_action)
+        self.search_statistics.record_leaf(depth,
+                                           time.perf_counter() - started)
+
+        return value
+
     def generate_bfs_dist(self, pos1, pos2) -> int:
-        """ This function uses bfs search to find the closest path between two
-        positions.
+        """ This function finds the length of the shortest path between two
+        positions. The distances are looked up in the all pairs table of the
+        grid graph, so this no longer runs a search for every call.
 
         Attributes:
             pos1 (tuple): The first position to start the search from. It is
@@ -97,34 +452,22 @@ class CompetitiveComputer(Computer):
             pos2 (tuple): The goal position.
 
         Returns:
-            int: The shortest distance between two points.
+            int: The shortest distance between two points, or -infinity if
+                there is no path between them.
         """
 
-        # The queue will contain tuples with two arguments:
-        #   1. arg1 is a pos tuple
-        #   2. arg2 is the current distance that has been covered.
-        queue = [(pos1, 0)]
-        visited = set()
-
-        while queue:
-            current, dist = queue.pop(0)
-            visited.add(current)
+        grid = self._grid
 
-            if current == pos2:
-                return dist
+        return self.get_cell_distance(grid.to_index(pos1), grid.to_index(pos2))
 
-            # Loop through all 4 directions the computer can take
-            for direction in self._directions:
-                next_grid = (current[0] + direction[0],
-                             current[1] + direction[1])
+    def get_cell_distance(self, cell_1, cell_2) -> int:
+        """ The same as generate_bfs_dist, for two cell indices. """
+        dist = self._grid.get_distance(cell_1, cell_2)
 
-                # Check if the next grid we are looking at is
-                # walkable and not visited.
-                if (self._walkable_maze_matrix[next_grid[0]][next_grid[1]]
-                        != 0 and next_grid not in visited):
-                    queue.append((next_grid, dist + 1))
+        if dist == UNREACHABLE:
+            return float("-inf")
 
-        return float("-inf")
+        return dist
 
     def legal_movements(self, pos, prev_action) -> list:
         """Determine the legal movements that the agent can perform.
@@ -140,37 +483,17 @@ class CompetitiveComputer(Computer):
             list: A list of valid movement directions based on the given
                 coordinates.
         """
-        legal_movements = []
-
-        # Define boundary constraints to check if a move is within the game
-        # limits.
-        # These values help determine whether a movement is valid or out of
-        # bounds.
-        LEFT_WALL, RIGHT_WALL = 0, len(self._walkable_maze_matrix[0]) - 1
-        CEILING, FLOOR = 0, len(self._walkable_maze_matrix) - 1
-
-        if (pos[1] - 1 > LEFT_WALL and
-           self._walkable_maze_matrix[pos[0]][pos[1] - 1] !=
-           C.NON_WALKABLE_GRID):
-            legal_movements.append("LEFT")
-
-        if (pos[1] + 1 < RIGHT_WALL and
-           self._walkable_maze_matrix[pos[0]][pos[1] + 1] !=
-           C.NON_WALKABLE_GRID
-           and prev_action != "LEFT"):
-            legal_movements.append("RIGHT")
-
-        if (pos[0] + 1 < FLOOR and
-           self._walkable_maze_matrix[pos[0] + 1][pos[1]] == C.LADDER_GRID
-           and prev_action != "UP"):
-            legal_movements.append("DOWN")
-
-        if (pos[0] - 1 > CEILING and
-           self._walkable_maze_matrix[pos[0] - 1][pos[1]] == C.LADDER_GRID
-           and prev_action != "DOWN"):
-            legal_movements.append("UP")
-
-        return legal_movements
+        return self.legal_cell_moves(self._grid.to_index(pos), prev_action)
+
+    def legal_cell_moves(self, cell, prev_action) -> list:
+        """ The same as legal_movements, for a cell index. The moves are
+        looked up in the move masks the grid graph compiles once per maze,
+        with the moves that would walk straight back masked out.
+        """
+        mask = (self._grid.move_masks[cell] &
+                FOLLOW_MASKS.get(prev_action, ALL_ACTIONS))
+
+        return list(MASK_ACTIONS[mask])
 
     def simulate_movement(self, position, action) -> tuple:
         """ This function simulates the movement of the agent.
@@ -182,79 +505,96 @@ class CompetitiveComputer(Computer):
         Returns:
             tuple: The new position after the movement.
         """
-        y, x = position
+        direction = ACTION_DIRECTIONS.get(action)
 
-        if action == "UP":
-            return (y - 1, x)
-        elif action == "DOWN":
-            return (y + 1, x)
-        elif action == "LEFT":
-            return (y, x - 1)
-        elif action == "RIGHT":
-            return (y, x + 1)
+        # if action was not given return the position
+        if direction is None:
+            return position
 
-        # if action was not given return None
-        return position
+        return (position[0] + direction[0], position[1] + direction[1])
 
     def is_terminal(self, state) -> bool:
         """ This function checks if the game has reached a terminal state.
 
         Attributes:
-            state (dict): The current game state we will assess.
+            state (GameState): The current game state we will assess.
 
         Returns:
             bool: True if the game has reached a terminal state, otherwise
                 False.
         """
-        if len(state["diamond_coords"]) == 0:
-            state["win"] = True
-        elif state["main_agent"] in state["enemies"]:
-            state["lose"] = True
-
-        return state["win"] or state["lose"]
+        return state.win or state.lose
 
-    def generate_successor(self, state, agent_index, action) -> dict:
+    def generate_successor(self, state, agent_index, action):
         """This function generates a new simulated state.
 
         Attributes:
-            state (dict): The state we will use to generate the successor
-                state.
+            state (GameState or dict): The state we will use to generate the
+                successor state. A dict is compiled first, and the successor
+                is given back as a dict too.
             agent (int): The agent type.
             action (String): The movement we want to perform on the current
                 state to create the successor.
 
         Returns:
-            dict: The new state after performing the action.
+            GameState or dict: The new state after performing the action.
         """
+        if isinstance(state, dict):
+            successor = self.generate_successor(
+                self.to_game_state(state),
+                agent_index,
+                action
+            )
+            return state_to_dict(successor, self._grid, self._diamond_cells)
 
-        # We must copy the state, to avoid modifying values of the original
-        # one.
-        new_state = copy.deepcopy(state)
+        # The state is immutable, so the successor only needs a new tuple
+        # with the moved agent in it.
+        offset = self._cell_offsets.get(action, 0)
 
         # We need to check which agent to perform the action on
         if agent_index == 0:
-            new_state["main_agent"] = (
-                self.simulate_movement(
-                    new_state["main_agent"],
-                    action
-                )
-            )
+            player = state.player + offset
 
             # If the action leads to diamond overlap, then increment the
             # diamond count. This will be useful a useful heuristic to
             # consider for the evaluation function.
-            for dmd in state["diamond_coords"]:
-                if dmd == new_state["main_agent"]:
-                    new_state["diamond_count"] += 1
-        else:
-            new_state["enemies"][agent_index - 1] = (
-                self.simulate_movement(
-                    new_state["enemies"][agent_index - 1],
-                    action
-                )
-            )
+            diamond_count = state.diamond_count
+            if self._diamond_bits.get(player, 0) & state.diamonds:
+                diamond_count += 1
+
+            if state.enemy_terms is None:
+                return GameState(player, state.enemies, state.diamonds,
+                                 diamond_count)
+
+            # Every enemy is now a different distance away.
+            enemy_terms = self.get_enemy_terms(player, state.enemies)
+
+            return GameState(player, state.enemies, state.diamonds,
+                             diamond_count, enemy_terms,
+                             self.get_enemy_score(enemy_terms),
+                             self._nearest_diamond[player])
+
+        enemies = state.enemies
+        enemy_id = agent_index - 1
+        enemy_cell = enemies[enemy_id] + offset
+        enemies = enemies[:enemy_id] + (enemy_cell,) + enemies[enemy_id + 1:]
+
+        if state.enemy_terms is None:
+            return GameState(state.player, enemies, state.diamonds,
+                             state.diamond_count)
+
+        # Only the term of the enemy that moved changes.
+        enemy_terms = state.enemy_terms
+        enemy_terms = (
+            enemy_terms[:enemy_id] +
+            (self.get_enemy_term_row(state.player)[enemy_cell],) +
+            enemy_terms[enemy_id + 1:]
+        )
 
-        return new_state
+        return GameState(state.player, enemies, state.diamonds,
+                         state.diamond_count, enemy_terms,
+                         self.get_enemy_score(enemy_terms),
+                         state.closest_diamond)
 
     def generate_path(self) -> list:
         """
@@ -269,14 +609,41 @@ class CompetitiveComputer(Computer):
                 traverse to.
         """
 
-        state_copy = copy.deepcopy(self.state)
+        # The dict is compiled into a GameState once, nothing below the root
+        # has to copy it again.
+        state = self.to_game_state(self.state)
 
-        cost, action = self.minimax(
-            state_copy,
-            depth=3,
-            agent_index=self._agent_type
-        )
+        planned = self.follow_plan(state)
+        if planned:
+            return self.plan_step(planned[1])
+
+        self.search_statistics.reset()
+        started = time.perf_counter()
+
+        cost, action = self.choose_action(state)
+
+        search_time = time.perf_counter() - started
+
+        if self.use_plans:
+            self.make_plan(state, action)
+
+        next_grid = self.get_next_grid(action)
+
+        # For analysis we will keep track of nodes expanded on main agent
+        if self.perform_analysis and self._agent_type == 0:
+            table = self.transposition_table
+            print(json.dumps(self.get_search_report(cost, action,
+                                                    search_time)))
+            self.tracker.transposition_probes += table.probes
+            self.tracker.transposition_hits += table.hits
+            self.tracker.transposition_nodes_saved += table.nodes_saved
+            self.nodes_expanded = 0
+
+        return [next_grid]
 
+    def get_next_grid(self, action) -> tuple:
+        """ Work out the grid an action takes the character to, and remember
+        the action as the last one made. """
         # we are using state coordinates instead of directly retrieving
         # character coordinates to avoid going into illegal girds.
         next_grid = self.simulate_movement(
@@ -286,13 +653,445 @@ class CompetitiveComputer(Computer):
 
         self._prev_action = action
 
-        # For analysis we will keep track of nodes expanded on main agent
+        return next_grid
+
+    def plan_step(self, action) -> list:
+        """ Make the next move of the plan instead of searching. """
+        next_grid = self.get_next_grid(action)
+
         if self.perform_analysis and self._agent_type == 0:
-            print(f"Nodes expanded: {self.nodes_expanded}")
-            self.nodes_expanded = 0
+            print(f"Following plan: {action}, {len(self._plan)} moves left")
 
         return [next_grid]
 
+    def make_plan(self, state, action) -> None:
+        """ Turn the principal variation of the last search into a plan.
+        Every later move of this computer's agent in the principal
+        variation is kept, along with the state the search expects it to be
+        made from, up to plan_horizon moves in all.
+
+        Args:
+            state (GameState): The state the search started from.
+            action (str): The move the search chose.
+        """
+        self._plan = []
+        self._plan_diamond_cells = self._diamond_cells
+        self._plan_distances = self._grid.get_distance_table()
+
+        # A best-reply variation moves one enemy a round, while in the game
+        # they all move, so the states it expects never come up.
+        if self.best_reply_search:
+            return
+
+        # A variation that does not start with the move chosen is not the
+        # line the search expects.
+        variation = self.principal_variation
+        if not variation or variation[0][1] != action:
+            return
+
+        for ply, (agent_index, action) in enumerate(self.principal_variation):
+            if ply and agent_index == self._agent_type:
+                # An agent with no move to make cannot plan past it.
+                if action is None or len(self._plan) + 1 >= self.plan_horizon:
+                    break
+
+                self._plan.append((state, action))
+
+            if self.is_terminal(state):
+                break
+
+            state = self.generate_successor(state, agent_index, action)
+
+    def follow_plan(self, state):
+        """ Take the next move of the plan, if the game has gone the way the
+        search expected since the plan was made. The plan is given up on if
+        any agent is not where it was expected to be, a diamond has been
+        collected or the maze has changed.
+
+        Args:
+            state (GameState): The state of the game now.
+
+        Returns:
+            tuple: The (state, action) planned for the state, or None if
+                there has to be a new search.
+        """
+        if not self._plan:
+            return None
+
+        planned = self._plan.pop(0)
+        expected = planned[0]
+
+        if (expected.player != state.player or
+                expected.enemies != state.enemies or
+                self._plan_diamond_cells != self._diamond_cells or
+                self._plan_distances is not self._grid.get_distance_table()):
+            self._plan = []
+            self.plans_invalidated += 1
+
+            if self.perform_analysis and self._agent_type == 0:
+                self.tracker.plans_invalidated += 1
+
+            return None
+
+        self.searches_avoided += 1
+
+        if self.perform_analysis and self._agent_type == 0:
+            self.tracker.searches_avoided += 1
+
+        return planned
+
+    def choose_action(self, state) -> tuple:
+        """ Search for the move to make from a state, to a fixed depth or
+        for as long as the time budget for the move allows.
+
+        Args:
+            state (GameState): The state to search from.
+
+        Returns:
+            tuple: The (value, action) of the search.
+        """
+        if self.move_time_ms is None:
+            return self.search_to_depth(state, self.depth_limit)
+
+        return self.iterative_deepening(state)
+
+    def order_moves(self, actions, state, depth, agent_index, player_action,
+                    enemy_action) -> list:
+        """ Sort the legal actions of a node so the ones most likely to
+        cause a cutoff are searched first:
+
+            1. The best action stored in the transposition table, which is
+               the best action of the last search of this node.
+            2. The killer actions of this depth.
+            3. The actions with the highest history score.
+            4. For the main agent, the actions that get nearest to a diamond
+               and then furthest from the enemies. For an enemy, the actions
+               that get nearest to the main agent.
+
+        Args:
+            actions (list of str): The legal actions.
+            state (GameState): The state of the node.
+            depth (int): The depth left to search.
+            agent_index (int): The agent to move.
+            player_action (str): The last action of the main agent.
+            enemy_action (str): The last action of an enemy.
+
+        Returns:
+            list: The actions, best first. They are returned as they are if
+                this computer does not order its moves.
+        """
+        if not self.use_move_ordering or len(actions) < 2:
+            return actions
+
+        key = self.get_transposition_key(state, agent_index, player_action,
+                                         enemy_action)
+        best_action = (
+            self.transposition_table.get_action(key) if key is not None
+            else None
+        )
+        killers = self._killers.get(depth, ())
+
+        get_distance = self._grid.get_distance
+        offsets = self._cell_offsets
+
+        if agent_index == 0:
+            cell = state.player
+            targets = [
+                diamond_cell
+                for bit, diamond_cell in enumerate(self._diamond_cells)
+                if state.diamonds >> bit & 1
+            ]
+            threats = state.enemies
+        else:
+            cell = state.enemies[agent_index - 1]
+            targets = [state.player]
+            threats = ()
+
+        def rank(action) -> tuple:
+            if action == best_action:
+                return (0,)
+            if action in killers:
+                return (1, killers.index(action))
+
+            next_cell = cell + offsets[action]
+
+            return (
+                2,
+                -self._history.get((agent_index, cell, action), 0),
+                min((get_distance(next_cell, target) for target in targets),
+                    default=0),
+                -min((get_distance(next_cell, threat) for threat in threats),
+                     default=0)
+            )
+
+        return sorted(actions, key=rank)
+
+    def record_cutoff(self, state, depth, agent_index, action,
+                      move_number) -> None:
+        """ Record that an action caused a cutoff, so it is tried earlier
+        at this depth and from this grid from now on.
+
+        Args:
+            state (GameState): The state of the node that was cut off.
+            depth (int): The depth left to search at the node.
+            agent_index (int): The agent to move at the node.
+            action (str): The action that caused the cutoff.
+            move_number (int): How many actions were searched before it.
+        """
+        self.search_statistics.record_cutoff(depth, move_number)
+
+        killers = self._killers.setdefault(depth, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+
+        cell = (
+            state.player if agent_index == 0
+            else state.enemies[agent_index - 1]
+        )
+        move = (agent_index, cell, action)
+        self._history[move] = self._history.get(move, 0) + depth * depth
+
+    def search_to_depth(self, state, depth) -> tuple:
+        """ Search from the root to a fixed depth for the agent this
+        computer controls, keeping the depth and principal variation of the
+        search once it has finished.
+
+        Args:
+            state (GameState): The state to search from.
+            depth (int): The depth to search to.
+
+        Returns:
+            tuple: The (value, action) of the search.
+        """
+        self.search_statistics.begin_search(depth)
+        self._root_depth = depth
+        self._pv[depth] = []
+
+        if self.search_workers and self.use_root_parallelism:
+            result = self.root_parallel_search(state, depth)
+        else:
+            result = self.minimax(
+                state,
+                depth=depth,
+                agent_index=self._agent_type
+            )
+
+        self.search_depth = depth
+        self.principal_variation = self._pv.get(depth, [])
+
+        return result
+
+    def root_parallel_search(self, state, depth) -> tuple:
+        """ Search the root of the game tree with every root move searched
+        on the worker processes. The results are merged in move order with
+        the same tie breaking as the maximizer and minimizer, so the move
+        picked is the same whatever order the workers finish in.
+
+        Args:
+            state (dict or GameState): The state to search from.
+            depth (int): The depth to search to.
+
+        Returns:
+            tuple: The (value, action) of the search.
+        """
+        state = self.to_game_state(state)
+        agent_index = self._agent_type
+
+        if self.is_terminal(state) or depth <= 0:
+            return self.minimax(state, depth, agent_index)
+
+        cell = (
+            state.player if agent_index == 0
+            else state.enemies[agent_index - 1]
+        )
+        actions = self.legal_cell_moves(cell, None)
+
+        time_left = None
+        if self._deadline is not None:
+            time_left = self._deadline - time.perf_counter()
+
+        results = self.get_search_pool().search(
+            state_to_dict(state, self._grid, self._diamond_cells),
+            depth,
+            agent_index,
+            actions,
+            time_left
+        )
+
+        # A worker that ran out of time has left the whole search unfinished.
+        if None in results:
+            raise SearchTimeout()
+
+        self.nodes_expanded += 1
+        self.search_statistics.record_node(depth, agent_index)
+
+        action_to_take, best_line = None, []
+        best_value = float("-inf") if agent_index == 0 else float("inf")
+
+        for action, result in zip(actions, results):
+            value, nodes, statistics, line = result
+            self.nodes_expanded += nodes
+            self.search_statistics.merge(statistics)
+
+            if (best_value <= value if agent_index == 0
+                    else best_value >= value):
+                best_value, action_to_take, best_line = value, action, line
+
+        self._pv[depth] = [(agent_index, action_to_take)] + best_line
+
+        return (best_value, action_to_take)
+
+    def search_root_move(self, state, depth, agent_index, action,
+                         time_left) -> tuple:
+        """ Search the subtree below one root move, as the maximizer or
+        minimizer would. Run on a worker process by root_parallel_search.
+
+        The transposition table is cleared first, so the result only
+        depends on the move and not on what the worker searched before.
+
+        Args:
+            state (dict): The game state dict at the root.
+            depth (int): The depth the root is searched to.
+            agent_index (int): The agent to move at the root.
+            action (str): The root move to search.
+            time_left (float): The seconds the search may take, or None.
+
+        Returns:
+            tuple: (value, nodes expanded, search statistics, principal
+                variation below the move), or None if the search ran out of
+                time.
+        """
+        game_state = self.to_game_state(state)
+        self.transposition_table.clear()
+        self.nodes_expanded = 0
+        self.search_statistics.reset()
+        self.search_statistics.begin_search(depth)
+
+        if time_left is not None:
+            self._deadline = time.perf_counter() + time_left
+
+        player_action, enemy_action = None, None
+        if agent_index == 0:
+            player_action = action
+        else:
+            enemy_action = action
+
+        self._pv[depth - 1] = []
+
+        try:
+            value = self.minimax(
+                self.generate_successor(game_state, agent_index, action),
+                depth - 1,
+                (agent_index + 1) % self.num_characters,
+                player_action=player_action,
+                enemy_action=enemy_action
+            )[0]
+        except SearchTimeout:
+            return None
+        finally:
+            self._deadline = None
+
+        return (value, self.nodes_expanded, self.search_statistics,
+                self._pv[depth - 1])
+
+    def get_search_pool(self) -> RootSearchPool:
+        """ Return the worker processes, starting them if they are not
+        running or were given a distance table that is out of date. """
+        pool = self._search_pool
+
+        if (pool is not None and
+                pool.distances is not self._grid.get_distance_table()):
+            self.close_search_pool()
+            pool = None
+
+        if pool is None:
+            pool = self._search_pool = RootSearchPool(self,
+                                                      self.search_workers)
+
+        return pool
+
+    def close_search_pool(self) -> None:
+        """ Stop the worker processes, if any were started. """
+        if self._search_pool is not None:
+            self._search_pool.close()
+            self._search_pool = None
+
+    def get_search_report(self, value, action, search_time) -> dict:
+        """ Build the report of the search for one move, printed as a
+        JSON line with the --analysis flag.
+
+        Args:
+            value (float): The value the search gave the move.
+            action (str): The move chosen.
+            search_time (float): The seconds the search took.
+
+        Returns:
+            dict: The report, every value of which can be written as JSON.
+        """
+        table = self.transposition_table
+
+        report = {
+            "agent": self._agent_type,
+            "algo": type(self).__name__,
+            "depth": self.search_depth,
+            "value": json_value(value),
+            "action": action,
+            "search_ms": round(search_time * 1000, 3),
+            "principal_variation": [
+                [agent_index, move]
+                for agent_index, move in self.principal_variation
+            ],
+            "transposition_hits": table.hits,
+            "transposition_probes": table.probes,
+            "transposition_nodes_saved": table.nodes_saved
+        }
+        report.update(self.search_statistics.report())
+
+        return report
+
+    def iterative_deepening(self, state) -> tuple:
+        """ Search depth 1, 2, 3, ... until the time budget for the move
+        runs out, and return the result of the deepest search that finished.
+        The transposition table is shared between the searches, so each one
+        reuses what the last one found.
+
+        The first search is always allowed to finish, so there is a move to
+        make however small the budget is.
+
+        Args:
+            state (GameState): The state to search from.
+
+        Returns:
+            tuple: The (value, action) of the deepest completed search.
+        """
+        start = time.perf_counter()
+        result = (None, None)
+        depth = 1
+
+        try:
+            while depth <= C.MAX_COMPETITIVE_SEARCH_DEPTH:
+                result = self.search_to_depth(state, depth)
+
+                self._deadline = start + self.move_time_ms / 1000
+                if time.perf_counter() >= self._deadline:
+                    break
+
+                depth += 1
+        except SearchTimeout:
+            # The unfinished search is thrown away, the last finished one
+            # still holds.
+            pass
+        finally:
+            self._deadline = None
+
+        return result
+
+    def check_time_budget(self) -> None:
+        """ Stop the running search if it has used up its time budget. """
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
     def move_based_on_path_instructions(self) -> None:
         """ This function will use generate_path to locate the next grid to
         traverse to. Then it will update the requested_movement based on which
@@ -377,6 +1176,8 @@ class CompetitiveComputer(Computer):
         while not self.stop_thread:
             self.move_based_on_path_instructions()
 
+        self.close_search_pool()
+
     def update_state(self, state) -> None:
         self.state = state
 
@@ -397,7 +1198,7 @@ class CompetitiveComputer(Computer):
         """ This function will simulate the maximizer agent.
 
         Args:
-            state (dict): The current game state.
+            state (GameState): The current game state.
             depth (int): The current depth of the game tree.
             player_action (str): The action taken by the main player.
             enemy_action (str): The action taken by the enemy agent.
@@ -412,12 +1213,30 @@ class CompetitiveComputer(Computer):
         action_to_take, best_value = None, float("-inf")
 
         self.nodes_expanded += 1
+        self.search_statistics.record_node(depth, agent_index)
+        self.check_time_budget()
+
+        actions = self.order_moves(
+            self.legal_cell_moves(state.player, player_action),
+            state,
+            depth,
+            agent_index,
+            player_action,
+            enemy_action
+        )
+
+        statistics = self.search_statistics
+        pv = self._pv
 
-        for action in self.legal_movements(state["main_agent"], player_action):
+        for move_number, action in enumerate(actions):
 
             # Generate the sate for when the action is performed.
+            started = time.perf_counter()
             successor = self.generate_successor(state, agent_index, action)
+            statistics.successor_time += time.perf_counter() - started
 
+            # Leaves and table hits leave no line of their own.
+            pv[depth - 1] = []
             current_value = self.minimax(
                 successor,
                 depth - 1,
@@ -428,17 +1247,22 @@ class CompetitiveComputer(Computer):
                 beta=beta
             )[0]
 
-            # Only prune if we are using alpha beta pruning.
-            if alpha and beta:
+            if best_value <= current_value:
+                best_value = current_value
+                action_to_take = action
+                pv[depth] = [(agent_index, action)] + pv[depth - 1]
+
+            # Only prune if we are using alpha beta pruning. The value that
+            # caused the cut off has been kept, so the value returned is
+            # always a bound on the true value.
+            if alpha is not None and beta is not None:
                 alpha = max(alpha, current_value)
 
                 if self.prune_alpha_beta(alpha, beta):
+                    self.record_cutoff(state, depth, agent_index, action,
+                                       move_number)
                     break
 
-            if best_value <= current_value:
-                best_value = current_value
-                action_to_take = action
-
         return (best_value, action_to_take)
 
     def minimizer(self, state, depth, player_action, enemy_action, next_agent,
@@ -446,7 +1270,7 @@ class CompetitiveComputer(Computer):
         """ This function will simulate the minimizer agent.
 
         Args:
-            state (dict): The current game state.
+            state (GameState): The current game state.
             depth (int): The current depth of the game tree.
             player_action (str): The action taken by the main player.
             enemy_action (str): The action taken by the enemy agent.
@@ -460,26 +1284,41 @@ class CompetitiveComputer(Computer):
         """
 
         self.nodes_expanded += 1
+        self.search_statistics.record_node(depth, agent_index)
+        self.check_time_budget()
 
         action_to_take, best_value = None, float("inf")
 
         if not self.stop_thread:
 
             # Skip the first enemy agent, because it is the main agent.
-            enemy_pos = state["enemies"][agent_index - 1]
+            actions = self.order_moves(
+                self.legal_cell_moves(state.enemies[agent_index - 1],
+                                      enemy_action),
+                state,
+                depth,
+                agent_index,
+                player_action,
+                enemy_action
+            )
+
+            statistics = self.search_statistics
+            pv = self._pv
 
-            for action in self.legal_movements(enemy_pos,
-                                               enemy_action):
+            for move_number, action in enumerate(actions):
 
+                started = time.perf_counter()
                 successor = self.generate_successor(
                     state,
                     agent_index,
                     action
                 )
+                statistics.successor_time += time.perf_counter() - started
 
                 # We decrease the depth here if we are the point where both
                 # the player and enemy(s) have made there moves.
                 # (A full round has taken place)
+                pv[depth - 1] = []
                 current_value = self.minimax(
                     successor,
                     depth - 1,
@@ -490,21 +1329,117 @@ class CompetitiveComputer(Computer):
                     beta=beta
                 )[0]
 
+                if best_value >= current_value:
+                    best_value = current_value
+                    action_to_take = action
+                    pv[depth] = [(agent_index, action)] + pv[depth - 1]
+
                 # Only prune if we are using alpha beta pruning.
-                if alpha and beta:
+                if alpha is not None and beta is not None:
                     beta = min(beta, current_value)
 
                     if self.prune_alpha_beta(alpha, beta):
+                        self.record_cutoff(state, depth, agent_index,
+                                           action, move_number)
                         break
 
-                if best_value >= current_value:
-                    best_value = current_value
-                    action_to_take = action
-
             return (best_value, action_to_take)
         else:
             return (0, "None")
 
+    def best_reply_minimizer(self, state, depth, player_action, alpha=None,
+                             beta=None) -> tuple:
+        """ This function will simulate the enemies in a best-reply search.
+        Rather than every enemy moving in turn, the enemies get a single
+        ply between two moves of the main agent, in which only one of them
+        moves: whichever has the reply that is worst for the main agent. The
+        other enemies stay where they are.
+
+        The main agent then sees as far ahead in two plies as a full round
+        of enemy moves would take it, whatever the number of enemies, at
+        the cost of never facing two enemies closing in on the same move.
+
+        Args:
+            state (GameState): The current game state.
+            depth (int): The current depth of the game tree.
+            player_action (str): The action taken by the main player.
+            alpha (float): The alpha value for alpha-beta pruning.
+            beta (float): The beta value for alpha-beta pruning.
+
+        Returns:
+            tuple: A tuple containing the best value and the action of the
+                enemy that moves.
+        """
+        self.nodes_expanded += 1
+        self.search_statistics.record_node(depth, 1)
+        self.check_time_budget()
+
+        if self.stop_thread:
+            return (0, "None")
+
+        action_to_take, best_value = None, float("inf")
+
+        get_distance = self._grid.get_distance
+        enemies = state.enemies
+
+        # The enemies nearest the main agent are the most dangerous, so
+        # their replies are tried first and give the earliest cutoffs.
+        enemy_indices = sorted(
+            range(1, self.num_characters),
+            key=lambda enemy_index: get_distance(enemies[enemy_index - 1],
+                                                 state.player)
+        )
+
+        # The enemy that moved last is not the one to move next, so none of
+        # them is kept from walking back.
+        moves = [
+            (enemy_index, action)
+            for enemy_index in enemy_indices
+            for action in self.order_moves(
+                self.legal_cell_moves(enemies[enemy_index - 1], None),
+                state,
+                depth,
+                enemy_index,
+                player_action,
+                None
+            )
+        ]
+
+        statistics = self.search_statistics
+        pv = self._pv
+
+        for move_number, (enemy_index, action) in enumerate(moves):
+            started = time.perf_counter()
+            successor = self.generate_successor(state, enemy_index, action)
+            statistics.successor_time += time.perf_counter() - started
+
+            pv[depth - 1] = []
+            current_value = self.minimax(
+                successor,
+                depth - 1,
+                0,
+                player_action=player_action,
+                enemy_action=None,
+                alpha=alpha,
+                beta=beta
+            )[0]
+
+            if best_value >= current_value:
+                best_value = current_value
+                action_to_take = action
+                pv[depth] = [(enemy_index, action)] + pv[depth - 1]
+
+            # Only prune if we are using alpha beta pruning.
+            if alpha is not None and beta is not None:
+                beta = min(beta, current_value)
+
+                if self.prune_alpha_beta(alpha, beta):
+                    self.record_cutoff(state, depth, enemy_index, action,
+                                       move_number)
+                    break
+
+        return (best_value, action_to_take)
+
     @abstractmethod
     def minimax(self, state, depth, agent_index, player_action=None,
                 enemy_action=None, alpha=None, beta=None) -> tuple:
@@ -513,7 +1448,7 @@ class CompetitiveComputer(Computer):
         movement for whichever agent called the algo.
 
         Attributes:
-            state (dict): The current game state.
+            state (GameState): The current game state.
             depth (int): Number which indicated how far down the game tree
                 we are.
             agent_index (int): Indicate which agent is currently running the
@@ -536,19 +1471,31 @@ class CompetitiveComputer(Computer):
 
 
 class MinimaxComputer(CompetitiveComputer):
+    use_root_parallelism = True
+
     def minimax(self, state, depth, agent_index, player_action=None,
                 enemy_action=None, alpha=None, beta=None) -> tuple:
 
+        state = self.to_game_state(state)
+
         # end algorithm if we reached max depth or find a terminating state
         if self.is_terminal(state) or depth <= 0:
-            return (self.evaluation_function(state, depth, player_action),
-                    None)
+            return (self.evaluate_leaf(state, depth, player_action), None)
+
+        # A position already searched deep enough is not searched again.
+        key = self.get_transposition_key(state, agent_index, player_action,
+                                         enemy_action)
+        result = self.lookup_transposition(key, depth, alpha, beta)
+        if result is not None:
+            return result
+
+        nodes_before = self.nodes_expanded
 
         # Check which agent will run the function next.
         next_agent = (agent_index + 1) % self.num_characters
 
         if agent_index == 0:
-            return self.maximizer(
+            result = self.maximizer(
                 state,
                 depth,
                 player_action,
@@ -556,8 +1503,10 @@ class MinimaxComputer(CompetitiveComputer):
                 next_agent,
                 agent_index
             )
+        elif self.best_reply_search:
+            result = self.best_reply_minimizer(state, depth, player_action)
         else:
-            return self.minimizer(
+            result = self.minimizer(
                 state,
                 depth,
                 player_action,
@@ -566,23 +1515,40 @@ class MinimaxComputer(CompetitiveComputer):
                 agent_index
             )
 
+        self.store_transposition(key, depth, result, nodes_before, alpha,
+                                 beta)
+
+        return result
+
 
 class AlphaBetaComputer(CompetitiveComputer):
+    use_move_ordering = True
+
     def minimax(self, state, depth, agent_index, player_action=None,
                 enemy_action=None,  alpha=float('-inf'),
                 beta=float('inf')) -> tuple:
 
+        state = self.to_game_state(state)
+
         # end algorithm if we reached max depth or find a terminating state
         if self.is_terminal(state) or depth <= 0:
-            return (self.evaluation_function(state, depth, player_action),
-                    None)
+            return (self.evaluate_leaf(state, depth, player_action), None)
+
+        # A position already searched deep enough is not searched again.
+        key = self.get_transposition_key(state, agent_index, player_action,
+                                         enemy_action)
+        result = self.lookup_transposition(key, depth, alpha, beta)
+        if result is not None:
+            return result
+
+        nodes_before = self.nodes_expanded
 
         # Check which agent will run the function next.
         next_agent = (agent_index + 1) % self.num_characters
 
         # This minimax function imposes alpha beta pruning.
         if agent_index == 0:
-            return self.maximizer(
+            result = self.maximizer(
                 state,
                 depth,
                 player_action,
@@ -592,8 +1558,11 @@ class AlphaBetaComputer(CompetitiveComputer):
                 alpha=alpha,
                 beta=beta
             )
+        elif self.best_reply_search:
+            result = self.best_reply_minimizer(state, depth, player_action,
+                                               alpha=alpha, beta=beta)
         else:
-            return self.minimizer(
+            result = self.minimizer(
                 state,
                 depth,
                 player_action,
@@ -604,62 +1573,212 @@ class AlphaBetaComputer(CompetitiveComputer):
                 beta=beta
             )
 
+        self.store_transposition(key, depth, result, nodes_before, alpha,
+                                 beta)
+
+        return result
+
 
 class ExpectimaxComputer(CompetitiveComputer):
+    """ Plays against enemies that move at random, averaging over their
+    moves at chance nodes instead of assuming the worst.
+
+    The evaluation is bounded, a loss or win is scored just outside the
+    range of every other score rather than as -/+infinity, so chance nodes
+    can prune with Star1: once the moves searched so far, with the rest at
+    the bounds, already put the average outside the window there is no
+    need to search the rest.
+
+    Attributes:
+        chance_samples (int): The number of joint moves of the random
+            enemies drawn at each chance node, or None to average over
+            every move exactly.
+        _random (Random): Draws the sampled moves.
+        _closest_diamonds (list of float): The distance from each walkable
+            grid, by rank, to the closest reachable diamond of the current
+            search, infinite if there is none.
+    """
+    use_root_parallelism = True
+
+    # Prune chance nodes with Star1. Without it every move of every random
+    # enemy is searched, which gives the same values with more nodes.
+    use_chance_pruning = True
+
+    # The random enemies have no one move the search expects of them, so
+    # the principal variation ends at the first chance node and there is
+    # nothing to plan with.
+    use_plans = False
+
+    worker_settings = CompetitiveComputer.worker_settings + (
+        "use_chance_pruning",
+        "chance_samples"
+    )
+
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+        self.chance_samples = kwargs.get("chance_samples")
+        self._random = random.Random(kwargs.get("seed"))
+        self._closest_diamonds = []
+
+    def to_game_state(self, state) -> GameState:
+        if isinstance(state, GameState):
+            return state
+
+        game_state = super().to_game_state(state)
+
+        # Diamonds are never taken off the board in the search, so the
+        # closest one to each grid is the same for the whole search.
+        distances = self._diamond_distances
+        self._closest_diamonds = np.where(
+            np.isinf(distances), float("inf"), distances
+        ).min(axis=1, initial=float("inf")).tolist()
+
+        return game_state
+
+    def get_value_bounds(self, state, depth, agent_index=0) -> tuple:
+        """ Bounds on the value of every leaf below a node, from the terms
+        of evaluation_function. Each enemy takes off at most 10 unless it
+        has caught the main agent, and at least what it would if the
+        distance to it grew by one every ply. The closest diamond adds the
+        most when the main agent walks straight towards it, and the main
+        agent can step onto at most one diamond per move.
+
+        Args:
+            state (GameState): The state of the node.
+            depth (int): The depth left to search below the node.
+            agent_index (int): The agent to move at the node.
+
+        Returns:
+            tuple: (lower, upper), lower is also the value of a loss.
+        """
+        # The number of the plies left that are moves of the main agent.
+        first_move = -agent_index % self.num_characters
+        player_moves = 0
+        if first_move < depth:
+            player_moves = (depth - 1 - first_move) // self.num_characters + 1
+
+        closest = self._closest_diamonds[
+            self._grid.walkable_rank[state.player]
+        ]
+
+        lower = -10 * len(state.enemies) - C.EXPECTIMAX_OUTCOME_MARGIN
+        upper = (10 / (max(closest - player_moves, 0) + 1) +
+                 state.diamond_count + player_moves)
+
+        for enemy_cell in state.enemies:
+            distance = self._grid.get_distance(state.player, enemy_cell)
+
+            # An enemy that cannot reach the main agent takes nothing off.
+            if distance != UNREACHABLE:
+                upper -= 20 / (distance + depth + 1)
+
+        return (lower, upper)
+
+    def evaluation_function(self, state, depth, player_action):
+        if state.lose:
+            return self.get_value_bounds(state, 0)[0]
+        if state.win:
+            return (self.get_value_bounds(state, 0)[1] +
+                    C.EXPECTIMAX_OUTCOME_MARGIN)
+
+        return super().evaluation_function(state, depth, player_action)
+
     def minimax(self, state, depth, agent_index, player_action=None,
                 enemy_action=None,  alpha=None,
                 beta=None) -> tuple:
 
+        state = self.to_game_state(state)
+
         # end algorithm if we reached max depth or find a terminating state
         if self.is_terminal(state) or depth <= 0:
-            return (self.evaluation_function(state, depth, player_action),
-                    None)
+            return (self.evaluate_leaf(state, depth, player_action), None)
+
+        # The root of a pruned search starts with the widest window there
+        # can be.
+        if alpha is None and self.use_chance_pruning:
+            alpha, beta = self.get_value_bounds(state, depth, agent_index)
+
+        # A position already searched deep enough is not searched again.
+        key = self.get_transposition_key(state, agent_index, player_action,
+                                         enemy_action)
+        result = self.lookup_transposition(key, depth, alpha, beta)
+        if result is not None:
+            return result
+
+        nodes_before = self.nodes_expanded
 
         # Check which agent will run the function next.
         next_agent = (agent_index + 1) % self.num_characters
 
         if agent_index == 0:
-            return self.maximizer(
+            result = self.maximizer(
                 state,
                 depth,
                 player_action,
                 enemy_action,
                 next_agent,
-                agent_index
+                agent_index,
+                alpha,
+                beta
             )
-        # If the agent is not a smart enemy, in other words not the enemy
-        # agent assigned to this class then call chance function.
-        elif agent_index != self._agent_type:
-            return self.chance_node(
+        # If the agent is not a smart enemy, in other words not an enemy
+        # this computer moves, then call chance function.
+        elif not self.controls_agent(agent_index):
+            result = self.chance_node(
                 state,
                 depth,
                 player_action,
                 next_agent,
-                agent_index
+                agent_index,
+                alpha,
+                beta
             )
         else:
-            return self.minimizer(
+            result = self.minimizer(
                 state,
                 depth,
                 player_action,
                 enemy_action,
                 next_agent,
-                agent_index
+                agent_index,
+                alpha,
+                beta
             )
 
+        self.store_transposition(key, depth, result, nodes_before, alpha,
+                                 beta)
+
+        return result
+
     def chance_node(self, state, depth, player_action, next_agent,
-                    agent_index) -> tuple:
+                    agent_index, alpha=None, beta=None) -> tuple:
         """ This handles the chance node logic where the enemy acts randomly.
         Instead of choosing the best or worst outcome, it calculates the
         expected value by averaging over all possible enemy actions weighted
         by their probability.
 
+        With alpha and beta given the moves are searched with Star1 windows,
+        and the search stops as soon as the expected value is known to be
+        outside the window. The bound the search stopped at is returned in
+        place of the expected value, the same way alpha-beta does.
+
+        With chance_samples set, chance_samples joint moves of this enemy
+        and the random enemies after it are drawn instead, and averaged as
+        if they were all the moves there are.
+
         Args:
-            state (dict): The current game state.
+            state (GameState): The current game state.
             depth (int): The current depth of the game tree.
             player_action (str): The action taken by the main player.
             next_agent (int): The index of the next agent to run the function.
             agent_index (int): The index of the current agent.
+            alpha (float): The alpha value for Star1 pruning.
+            beta (float): The beta value for Star1 pruning.
 
         Returns:
             tuple: A tuple containing the expected value and None as the
@@ -669,34 +1788,139 @@ class ExpectimaxComputer(CompetitiveComputer):
         """
 
         self.nodes_expanded += 1
+        self.search_statistics.record_node(depth, agent_index)
+        self.check_time_budget()
 
-        enemy_id = agent_index - 1
-        enemy_pos = state["enemies"][enemy_id]
-
-        expected_value = 0
-        actions_with_probs = self.get_enemy_actions_with_probs(
-            enemy_pos
-        )
+        statistics = self.search_statistics
+        child_depth = depth - 1
 
-        for action, prob in actions_with_probs:
-            successor = self.generate_successor(
+        if self.chance_samples:
+            outcomes, next_agent, child_depth = self.sample_joint_moves(
                 state,
-                agent_index,
-                action
+                depth,
+                agent_index
+            )
+        else:
+            enemy_pos = self._grid.to_coord(
+                state.enemies[agent_index - 1]
             )
+            outcomes = [
+                (action, prob, None) for action, prob in
+                self.get_enemy_actions_with_probs(enemy_pos)
+            ]
+
+        # An enemy with no move to make stays where it is, as it does when
+        # the moves are sampled. Scoring it as 0 could put the node outside
+        # the bounds Star1 prunes with.
+        if not outcomes:
+            outcomes = [(None, 1.0, state)]
+
+        lower, upper = self.get_value_bounds(state, depth, agent_index)
+        pruning = self.use_chance_pruning and alpha is not None
+
+        expected_value, remaining = 0, 1.0
+        child_alpha, child_beta = None, None
+
+        for move_number, (action, prob, successor) in enumerate(outcomes):
+            remaining -= prob
+
+            if successor is None:
+                started = time.perf_counter()
+                successor = self.generate_successor(
+                    state,
+                    agent_index,
+                    action
+                )
+                statistics.successor_time += time.perf_counter() - started
+
+            # The window the move has to land in for the average to land in
+            # the window of this node, with every move after it at the
+            # bounds.
+            if pruning:
+                child_alpha = (
+                    alpha - expected_value - remaining * upper
+                ) / prob
+                child_beta = (
+                    beta - expected_value - remaining * lower
+                ) / prob
 
             current_value = self.minimax(
                 successor,
-                depth - 1,
+                child_depth,
                 agent_index=next_agent,
                 player_action=player_action,
-                enemy_action=action
+                enemy_action=action,
+                alpha=child_alpha,
+                beta=child_beta
             )[0]
 
             expected_value += prob * current_value
 
+            if pruning and move_number < len(outcomes) - 1:
+                if expected_value + remaining * upper <= alpha:
+                    self.record_cutoff(state, depth, agent_index, action,
+                                       move_number)
+                    return (expected_value + remaining * upper, None)
+
+                if expected_value + remaining * lower >= beta:
+                    self.record_cutoff(state, depth, agent_index, action,
+                                       move_number)
+                    return (expected_value + remaining * lower, None)
+
         return (expected_value, None)
 
+    def sample_joint_moves(self, state, depth, agent_index) -> tuple:
+        """ Draw chance_samples joint moves of the run of random enemies
+        starting at agent_index, each enemy picking one of its moves
+        uniformly at random. The same joint move drawn twice is only
+        searched once, with twice the probability.
+
+        Args:
+            state (GameState): The state of the chance node.
+            depth (int): The depth left to search at the chance node, the
+                run stops there.
+            agent_index (int): The first enemy of the run.
+
+        Returns:
+            tuple: (outcomes, next_agent, child_depth), outcomes being a
+                list of (last action, probability, successor) tuples.
+        """
+        agents = []
+        agent = agent_index
+        while (len(agents) < depth and agent != 0 and
+               not self.controls_agent(agent)):
+            agents.append(agent)
+            agent = (agent + 1) % self.num_characters
+
+        prob = 1 / self.chance_samples
+        outcomes = {}
+
+        started = time.perf_counter()
+        for _ in range(self.chance_samples):
+            successor, action = state, None
+
+            for enemy in agents:
+                actions = self.legal_cell_moves(successor.enemies[enemy - 1],
+                                                None)
+                if actions:
+                    action = self._random.choice(actions)
+                    successor = self.generate_successor(successor, enemy,
+                                                        action)
+
+            outcome = outcomes.get(successor, (action, 0))
+            outcomes[successor] = (outcome[0], outcome[1] + prob)
+
+        self.search_statistics.successor_time += (
+            time.perf_counter() - started
+        )
+
+        return (
+            [(action, total, successor)
+             for successor, (action, total) in outcomes.items()],
+            agent,
+            depth - len(agents)
+        )
+
     def get_enemy_actions_with_probs(self, enemy_pos):
         """ This function will generate the possible actions for the enemy
         agent and return a list of tuples with the action and its probability.
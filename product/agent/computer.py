@@ -4,6 +4,8 @@ import inspect
 import numpy as np
 
 from lock import visited_and_path_data_flag
+from grid_graph import GridGraph, NO_CELL
+from path_cache import shared_path_cache
 
 
 class AnalyticsTracker:
@@ -16,12 +18,29 @@ class AnalyticsTracker:
         self.average_nodes_visited = 0
         self.total_path_length = 0
         self.average_path_length = 0
+        self.path_cache_hits = 0
+        self.path_cache_misses = 0
+        self.transposition_probes = 0
+        self.transposition_hits = 0
+        self.transposition_nodes_saved = 0
+        self.searches_avoided = 0
+        self.plans_invalidated = 0
 
     def print_analytics(self):
         print('\033[1m' + "ANALYTICS" + '\033[0m')
         print(f"TOTAL TIME: {self.total_time}")
         print(f"TOTAL NODES VISITED: {self.total_nodes_visited}")
         print(f"TOTAL PATH LENGTH: {self.total_path_length}")
+        print(f"PATH CACHE HITS: {self.path_cache_hits}")
+        print(f"PATH CACHE MISSES: {self.path_cache_misses}")
+        if self.transposition_probes:
+            print("TRANSPOSITION TABLE HITS: "
+                  f"{self.transposition_hits}/{self.transposition_probes}")
+            print("TRANSPOSITION TABLE NODES SAVED: "
+                  f"{self.transposition_nodes_saved}")
+        if self.searches_avoided or self.plans_invalidated:
+            print(f"SEARCHES AVOIDED BY PLANS: {self.searches_avoided}")
+            print(f"PLANS INVALIDATED: {self.plans_invalidated}")
         print()
 
 
@@ -36,16 +55,25 @@ class Computer:
             the character to perform.
         _walkable_maze_matrix (list of list): The maze which represents the
             walkable areas of the character.
+        _grid (GridGraph): The compiled array version of the walkable maze,
+            this is shared with the world and every other computer.
         _directions (list of tuple): The directions the computer can command
             the player to do.
         stop_thread (bool): A flag to stop the path find algo thread.
         th (Thread): The thread which will do the pathfinding.
         perform_analysis (bool): When this flag is set it records and prints
             analysis of the particular algo being used.
-        _visited_grids (list of tuple): List of grids visited to get to the
-            goal state by a algorithm.
+        _visited_grids (array of int): Cell indices of the grids visited to
+            get to the goal state by a algorithm, in the order they were
+            visited.
         _path_generated (list of grids): List of sequential grids from start
             to get to the goal state.
+        _path_cache (PathCache): Cache of previously generated paths, shared
+            with every other computer unless one is passed in.
+        use_path_cache (bool): Computers whose paths depend on more than the
+            start, goal and maze set this to False to skip the cache.
+        _path_cache_key (tuple): The cache key of the path last returned by
+            get_path.
 
     Args:
         character (MainAnimationManager): The character the computer will
@@ -53,10 +81,13 @@ class Computer:
         walkable_maze (list of list): The maze which represents the walkable
             areas of the character.
     """
+    use_path_cache = True
+
     def __init__(self, character, walkable_maze, **kwargs):
         self.character = character
         self.requested_movement = "RIGHT"
         self._walkable_maze_matrix = walkable_maze
+        self._grid = GridGraph.for_matrix(walkable_maze)
         # right, left, up, down
         self._directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
         self.stop_thread = False
@@ -66,6 +97,8 @@ class Computer:
 
         self._visited_grids = []
         self._path_generated = []
+        self._path_cache = kwargs.get("path_cache", shared_path_cache)
+        self._path_cache_key = None
         self.path_to_follow = []
         self.enemy_list = kwargs.get("enemy_list", [])
         self.enemy_in_way = False
@@ -132,15 +165,17 @@ class Computer:
             path its found to the target.
 
         Args:
-            search_path_history (list of tuples): A list of all the paths that
-                                                  has been looked into.
-            end (list): The coord of the diamond.
+            search_path_history (dict): Maps the cell index of every grid
+                                        looked into to the cell index it was
+                                        reached from, the start maps to
+                                        NO_CELL.
+            end (int): The cell index of the diamond.
         """
         final_path = []
         current = end
 
-        while current is not None:
-            final_path.append(current)
+        while current != NO_CELL:
+            final_path.append(self._grid.to_coord(current))
             current = search_path_history[current]
 
         final_path.reverse()
@@ -156,10 +191,80 @@ class Computer:
 
         return final_path
 
+    def get_goal_cell(self) -> int:
+        """ Return the cell index of the diamond this computer is heading
+        for, or NO_CELL if any diamond will do. """
+        if hasattr(self, "diamond_grid_y"):
+            return self._grid.to_index(
+                (self.diamond_grid_y, self.diamond_grid_x)
+            )
+
+        return NO_CELL
+
+    def get_algorithm_name(self) -> tuple:
+        """ Return a name for the search this computer runs. The heuristic
+        is part of the name, as weighted and normal A* use the same class. """
+        return (type(self).__name__, getattr(self, "heuristic", None))
+
+    def get_path_cache_key(self) -> tuple:
+        """ Return the key the next generated path is cached under. """
+        grid = self._grid
+
+        return (
+            self.get_algorithm_name(),
+            grid.to_index(self.character.get_player_grid_coordinates()),
+            self.get_goal_cell(),
+            grid.revision
+        )
+
+    def get_path(self) -> list:
+        """ Return the path to the goal, taking it from the path cache when
+        the same search has been done on the same maze before. Otherwise
+        generate_path is run and its result cached. """
+        if not self.use_path_cache:
+            return self.generate_path()
+
+        key = self.get_path_cache_key()
+        entry = self._path_cache.get(key)
+
+        if entry is not None:
+            path, self._visited_grids = entry
+            self._path_generated = list(path)
+
+            # Asking again for the path already being followed, while an
+            # enemy is in the way, is not a new path.
+            if key == self._path_cache_key:
+                return list(path)
+
+            self._path_cache_key = key
+
+            if self.perform_analysis:
+                self.tracker.path_cache_hits += 1
+                self.tracker.total_path_length += len(path)
+                print(f"Path cache hit, the path is: {path}")
+
+            # Let the highlighter pick up the cached path like a new one.
+            visited_and_path_data_flag.clear()
+
+            return list(path)
+
+        if self.perform_analysis:
+            self.tracker.path_cache_misses += 1
+
+        path = self.generate_path()
+
+        # The player can move while the path is being generated, only cache
+        # the path if it starts where the key says it does.
+        if path and self._grid.to_index(path[0]) == key[1]:
+            self._path_cache.put(key, path, self._visited_grids)
+            self._path_cache_key = key
+
+        return path
+
     def move_based_on_path_instructions(self) -> None:
         """ This function will get the BFS path, then  move the character
         to follow the path it's found. """
-        path_to_follow = self.generate_path()
+        path_to_follow = self.get_path()
 
         instruction_number = 0
         target = path_to_follow[-1]
@@ -172,7 +277,7 @@ class Computer:
                 break
 
             if self.enemy_in_way:
-                self.path_to_follow = self.generate_path()
+                self.path_to_follow = self.get_path()
                 continue
 
             if instruction_number == len(path_to_follow):
@@ -211,19 +316,24 @@ class Computer:
         """ This function retrieves and returns the visited list generated by
         whatever algorithm is currently in use. """
 
-        if self.perform_analysis:
-            print(f"The list of visited grids is: {self._visited_grids}")
-
-        if (self._visited_grids == [] or self._visited_grids is None):
+        if self._visited_grids is None or len(self._visited_grids) == 0:
             print(f"{inspect.currentframe().f_code.co_name}: Cannot get "
                   "visited grids")
             return None
 
-        return self._visited_grids, self._path_generated
+        # The visited cells are stored as compact indices, so convert them
+        # back into coords for the highlighter.
+        visited_grids = [self._grid.to_coord(i) for i in self._visited_grids]
+
+        if self.perform_analysis:
+            print(f"The list of visited grids is: {visited_grids}")
+
+        return visited_grids, self._path_generated
 
     def set_walkable_maze(self, walkable_maze) -> None:
         """ Set the walkable maze matrix with a new one. """
         self._walkable_maze_matrix = walkable_maze
+        self._grid = GridGraph.for_matrix(walkable_maze)
 
     def update_diamond_list(self, new_diamond_list):
         """ This function is used to update the status of the list of
@@ -243,27 +353,39 @@ def get_agent_types():
     from agent.informed_computer import (
         AStarComputer,
         AStarFilledComputer,
-        GreedyComputer
+        BidirectionalAStarComputer,
+        DStarLiteComputer,
+        GreedyComputer,
+        JumpPointComputer,
+        PlatformGraphComputer
     )
     from agent.uninformed_computer import (
         RandomComputer,
         BFSComputer,
+        BidirectionalBFSComputer,
         DFSComputer,
         UCSComputer
     )
     from agent.competitive_computer import (
         MinimaxComputer, AlphaBetaComputer, ExpectimaxComputer
     )
+    from agent.mcts_computer import MCTSComputer
 
     return {
         "random": RandomComputer,
         "bfs": BFSComputer,
+        "bibfs": BidirectionalBFSComputer,
         "dfs": DFSComputer,
         "ucs": UCSComputer,
         "astar": AStarComputer,
         "astarFilled": AStarFilledComputer,
+        "biastar": BidirectionalAStarComputer,
         "greedy": GreedyComputer,
+        "dstar": DStarLiteComputer,
+        "jps": JumpPointComputer,
+        "platform": PlatformGraphComputer,
         "minimax": MinimaxComputer,
         "alphabeta": AlphaBetaComputer,
         "expectimax": ExpectimaxComputer,
+        "mcts": MCTSComputer,
     }
@@ -0,0 +1,227 @@
+import heapq
+import numpy as np
+
+from array import array
+
+from grid_graph import NO_CELL
+
+""" D* Lite (Koenig and Likhachev) over the cells of a GridGraph.
+
+The planner searches backwards from the goal, so the g values it keeps are
+distances to the goal. This lets the start move along the path without
+throwing anything away. When the walkable matrix changes, only the grids whose
+step cost changed, and their neighbours, are put back on the open list. Grids
+further away are only looked at again if their distance really changed.
+"""
+
+INFINITY = float("inf")
+
+
+class DStarLite:
+    """ Incremental planner which keeps its g and rhs values between calls to
+    plan().
+
+    Attributes:
+        grid (GridGraph): The graph the planner searches over.
+        goal (int): The cell index the planner is searching towards, NO_CELL
+            before the first plan.
+        nodes_expanded (int): The number of grids expanded by the last call
+            to plan().
+        _start (int): The start cell of the last plan.
+        _km (int): Key modifier, this grows by the heuristic distance the
+            start has moved so the keys already on the open list stay valid.
+        _g (list): The current distance estimate to the goal of every cell.
+        _rhs (list): The one step lookahead distance of every cell.
+        _open (list of tuple): Heap of (key, cell) entries, replaced entries
+            are left in the heap and skipped when popped.
+        _open_keys (list): The key every cell is on the open list with, or
+            None if the cell is not on the open list.
+        _step_costs (ndarray): The step costs the g values were computed for.
+        _revision (int): The grid revision the g values were computed for.
+        _visit_order (array of int): Cells expanded by the last plan, in the
+            order they were expanded.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+    """
+    def __init__(self, grid) -> None:
+        self.grid = grid
+        self.goal = NO_CELL
+        self.nodes_expanded = 0
+
+        self._start = NO_CELL
+        self._km = 0
+        self._g = []
+        self._rhs = []
+        self._open = []
+        self._open_keys = []
+        self._step_costs = None
+        self._revision = None
+        self._visit_order = array("i")
+
+    def plan(self, start, goal) -> tuple:
+        """ Find the cheapest path from start to goal, reusing the previous
+        search where possible.
+
+        Args:
+            start (int): The cell index to start from.
+            goal (int): The cell index to reach.
+
+        Returns:
+            tuple: (path, visit_order). The path is a list of cell indices
+                from start to goal, or None if the goal cannot be reached.
+        """
+        self._visit_order = array("i")
+
+        # The g values are distances to the old goal, so a new goal means
+        # starting again.
+        if goal != self.goal or len(self._g) != self.grid.get_cell_count():
+            self._reset(start, goal)
+        else:
+            if start != self._start:
+                self._km += self.get_heuristic(self._start, start)
+                self._start = start
+
+            if self.grid.revision != self._revision:
+                self._repair_changed_cells()
+
+        self._compute_shortest_path()
+        self.nodes_expanded = len(self._visit_order)
+
+        return self._extract_path(), self._visit_order
+
+    def get_heuristic(self, cell_1, cell_2) -> int:
+        """ Manhattan distance between two cells. Every step costs at least
+        1, so this never overestimates the cost of a path. """
+        y_1, x_1 = self.grid.to_coord(cell_1)
+        y_2, x_2 = self.grid.to_coord(cell_2)
+
+        return abs(y_1 - y_2) + abs(x_1 - x_2)
+
+    def _reset(self, start, goal) -> None:
+        """ Forget every value and start a new search rooted at the goal. """
+        cell_count = self.grid.get_cell_count()
+
+        self.goal = goal
+        self._start = start
+        self._km = 0
+        self._g = [INFINITY] * cell_count
+        self._rhs = [INFINITY] * cell_count
+        self._open = []
+        self._open_keys = [None] * cell_count
+        self._step_costs = self.grid.step_costs.copy()
+        self._revision = self.grid.revision
+
+        self._rhs[goal] = 0
+        self._push(goal)
+
+    def _repair_changed_cells(self) -> None:
+        """ Find the grids whose step cost changed since the last plan, and
+        update them and every grid that can step onto them. """
+        grid = self.grid
+        changed = np.flatnonzero(grid.step_costs != self._step_costs)
+
+        self._step_costs = grid.step_costs.copy()
+        self._revision = grid.revision
+
+        # A diamond being picked up changes the grid type but not its step
+        # cost, so there is nothing to repair.
+        for cell in changed.tolist():
+            self._update_vertex(cell)
+
+            for neighbour in grid.neighbours[cell]:
+                self._update_vertex(neighbour)
+
+    def _calculate_key(self, cell) -> tuple:
+        best = min(self._g[cell], self._rhs[cell])
+
+        return (best + self.get_heuristic(self._start, cell) + self._km, best)
+
+    def _push(self, cell) -> None:
+        key = self._calculate_key(cell)
+        self._open_keys[cell] = key
+        heapq.heappush(self._open, (key, cell))
+
+    def _top_key(self) -> tuple:
+        """ Return the smallest key on the open list, dropping replaced
+        entries from the top of the heap. """
+        open_list, open_keys = self._open, self._open_keys
+
+        while open_list and open_keys[open_list[0][1]] != open_list[0][0]:
+            heapq.heappop(open_list)
+
+        return open_list[0][0] if open_list else (INFINITY, INFINITY)
+
+    def _update_vertex(self, cell) -> None:
+        """ Recalculate the rhs value of a cell and put it on the open list
+        if it is inconsistent. """
+        grid, g = self.grid, self._g
+
+        if cell != self.goal:
+            if grid.is_walkable(cell):
+                step_costs = grid.step_cost_list
+                self._rhs[cell] = min(
+                    (step_costs[n] + g[n] for n in grid.neighbours[cell]),
+                    default=INFINITY
+                )
+            else:
+                self._rhs[cell] = INFINITY
+
+        self._open_keys[cell] = None
+
+        if g[cell] != self._rhs[cell]:
+            self._push(cell)
+
+    def _compute_shortest_path(self) -> None:
+        """ Expand inconsistent cells until the start is consistent and no
+        cell on the open list can give it a cheaper path. """
+        g, rhs, start = self._g, self._rhs, self._start
+        neighbours = self.grid.neighbours
+
+        while (self._top_key() < self._calculate_key(start) or
+               rhs[start] != g[start]):
+            old_key, cell = heapq.heappop(self._open)
+            new_key = self._calculate_key(cell)
+
+            if old_key < new_key:
+                # The start has moved since this cell was pushed.
+                self._push(cell)
+                continue
+
+            self._open_keys[cell] = None
+            self._visit_order.append(cell)
+
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INFINITY
+                self._update_vertex(cell)
+
+            for neighbour in neighbours[cell]:
+                self._update_vertex(neighbour)
+
+    def _extract_path(self) -> list:
+        """ Follow the cheapest neighbour from the start to the goal. """
+        grid, g = self.grid, self._g
+        step_costs = grid.step_cost_list
+
+        if g[self._start] == INFINITY and self._start != self.goal:
+            return None
+
+        path = [self._start]
+        current = self._start
+
+        while current != self.goal:
+            current = min(
+                grid.neighbours[current],
+                key=lambda n: step_costs[n] + g[n]
+            )
+
+            # A walk longer than the number of cells must be going round in a
+            # loop, which only happens if the values are corrupt.
+            if len(path) > grid.get_cell_count():
+                return None
+
+            path.append(current)
+
+        return path
@@ -0,0 +1,227 @@
+import threading
+import time
+
+import constants as C
+
+from agent.competitive_computer import CompetitiveComputer
+
+""" One search for the moves of every enemy. Giving each enemy a competitive
+computer of its own runs a full game tree search per enemy, all of them over
+the same agents and all fighting over the GIL. Instead one planner searches
+the game tree once, from the side of the enemies, and hands each enemy its
+move from the principal variation.
+
+Every enemy searches with the same tree, so the search only has to go one
+round of enemy moves deeper than a single enemy would, and the work per round
+grows with the tree rather than with a whole search per enemy.
+"""
+
+
+class EnemyPlanner:
+    """ Chooses the moves of every enemy with one competitive computer, which
+    plays all the enemies against the main agent. The search is rooted at the
+    first enemy and goes one move of every enemy, then as many plies further
+    as a single enemy would search past its own move.
+
+    The enemies ask for their moves as they reach their grids. The first to
+    ask starts a search, and the others are handed the moves it found for
+    them as long as they ask from the grid the search expected. Enemies still
+    walking to a grid are searched for from that grid.
+
+    Attributes:
+        computer (CompetitiveComputer): The computer the enemies are searched
+            for with.
+        enemy_count (int): The number of enemies.
+        state (dict): The game state, as the game last gave it.
+        searches (int): The number of searches run.
+        _moves (dict): Maps an enemy index to the (cell, action) the last
+            search chose for it, the action being made from the cell.
+        _targets (dict): Maps an enemy index to the cell it was last sent
+            to.
+        _searched_state (dict): The game state the last search was made
+            for.
+        _lock (Lock): Lets one enemy at a time ask for a move, so only one
+            search runs at once.
+
+    Args:
+        computer_class (type): The competitive computer class to search
+            with.
+        walkable_maze (list of list): The walkable maze matrix.
+        enemy_count (int): The number of enemies.
+    """
+    def __init__(self, computer_class, walkable_maze, enemy_count, **kwargs):
+        self.enemy_count = enemy_count
+        self.computer = computer_class(
+            None,
+            walkable_maze,
+            **kwargs,
+            agent_type=1,
+            num_characters=enemy_count + 1,
+            joint_enemies=True,
+            depth_limit=enemy_count + C.COMPETITIVE_SEARCH_DEPTH - 1
+        )
+
+        # The moves are read off the principal variation, which a table hit
+        # cuts short.
+        self.computer.use_transposition_table = False
+
+        self.state = kwargs.get("state") or {}
+        self.searches = 0
+        self._moves = {}
+        self._targets = {}
+        self._searched_state = None
+        self._lock = threading.Lock()
+
+    def update_state(self, state) -> None:
+        self.state = state
+
+    def request_move(self, enemy_index, coord):
+        """ Hand an enemy its next move, searching again if there is no
+        move planned for it from where it is.
+
+        Args:
+            enemy_index (int): The enemy asking, 1 for the first enemy.
+            coord (tuple): The (grid_y, grid_x) grid the enemy is on.
+
+        Returns:
+            str: The action for the enemy, or None if it cannot move or the
+                planner has been stopped.
+        """
+        grid = self.computer._grid
+        cell = grid.to_index(coord)
+
+        with self._lock:
+            if self.computer.stop_thread:
+                return None
+
+            planned = self._moves.pop(enemy_index, None)
+
+            if planned is None or planned[0] != cell:
+                self.search(enemy_index, cell)
+                planned = self._moves.pop(enemy_index)
+
+            action = planned[1]
+
+            # An enemy that cannot move asks again straight away. It keeps
+            # its move until the game changes, rather than searching again
+            # for the same state.
+            if action is None:
+                if self.state == self._searched_state:
+                    self._moves[enemy_index] = planned
+
+                return None
+            self._targets[enemy_index] = (
+                cell + grid.action_offsets.get(action, 0)
+            )
+
+            return action
+
+    def search(self, enemy_index, cell) -> None:
+        """ Search for the next move of every enemy, with the enemy asking
+        on its cell and every other enemy on the grid it was last sent to.
+
+        Args:
+            enemy_index (int): The enemy asking.
+            cell (int): The cell the enemy is on.
+        """
+        computer = self.computer
+        grid = computer._grid
+
+        enemies = []
+        for index, coord in enumerate(self.state["enemies"], start=1):
+            if index == enemy_index:
+                coord = grid.to_coord(cell)
+            elif index in self._targets:
+                coord = grid.to_coord(self._targets[index])
+            enemies.append(coord)
+
+        self._searched_state = self.state
+        state = computer.to_game_state({**self.state, "enemies": enemies})
+        computer.choose_action(state)
+        self.searches += 1
+
+        moves = {}
+        for agent_index, action in computer.principal_variation:
+            # The first round of enemy moves ends with the main agent.
+            if agent_index == 0:
+                break
+            moves[agent_index] = action
+
+        self._moves = {}
+        for index in range(1, self.enemy_count + 1):
+            enemy_cell = state.enemies[index - 1]
+            action = moves.get(index)
+
+            if action is None:
+                action = self.chase(state, index)
+
+            self._moves[index] = (enemy_cell, action)
+
+    def chase(self, state, enemy_index):
+        """ The move of an enemy the search did not reach, the step that
+        takes it closest to the main agent. It is the move the search would
+        pick for the enemy on its last ply, where only the distance to the
+        main agent counts.
+
+        Args:
+            state (GameState): The state searched from.
+            enemy_index (int): The enemy to move.
+
+        Returns:
+            str: The action, or None if the enemy cannot move.
+        """
+        computer = self.computer
+        cell = state.enemies[enemy_index - 1]
+        actions = computer.legal_cell_moves(cell, None)
+
+        if not actions:
+            return None
+
+        return min(
+            actions,
+            key=lambda action: computer._grid.get_distance(
+                cell + computer._cell_offsets[action],
+                state.player
+            )
+        )
+
+
+class PlannedEnemyComputer(CompetitiveComputer):
+    """ Moves an enemy the way the enemy planner tells it to, instead of
+    searching for itself.
+
+    Attributes:
+        planner (EnemyPlanner): The planner shared by every enemy.
+    """
+    use_plans = False
+
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+        self.planner = kwargs["planner"]
+
+    def update_state(self, state) -> None:
+        self.state = state
+        self.planner.update_state(state)
+
+    def stop_path_find_algo_thread(self) -> None:
+        """ Stop the path find thread, and any search the planner is
+        running for it. """
+        super().stop_path_find_algo_thread()
+        self.planner.computer.stop_thread = True
+
+    def generate_path(self) -> list:
+        action = self.planner.request_move(
+            self._agent_type,
+            self.character.get_player_grid_coordinates()
+        )
+
+        # Give the other threads a turn while this enemy cannot move.
+        if action is None:
+            time.sleep(C.STUCK_ENEMY_WAIT)
+
+        return [self.get_next_grid(action)]
@@ -0,0 +1,106 @@
+from typing import NamedTuple
+
+""" The compact game state searched by the competitive computers. The game
+hands the computers a dict of coords and lists, which is compiled once at the
+root of a search into a GameState. Every node below the root is then a small
+tuple of ints, so successors are built without copying any containers and
+states can be hashed and compared directly.
+"""
+
+
+class GameState(NamedTuple):
+    """ An immutable snapshot of the game for the competitive search.
+
+    Attributes:
+        player (int): The cell index of the main agent.
+        enemies (tuple of int): The cell index of every enemy, in the same
+            order as the enemies of the game state dict.
+        diamonds (int): A bitmask of the diamonds in the game, bit i is set
+            while the i-th diamond cell of the search is still in play.
+        diamond_count (int): The number of times the main agent has stepped
+            onto a diamond since the root of the search.
+        enemy_terms (tuple of float): What each enemy takes off the score
+            of the state, or None if the state does not carry the terms of
+            the evaluation function.
+        enemy_score (float): The enemy terms taken off zero one at a time,
+            in order.
+        closest_diamond (float): The distance from the main agent to the
+            closest diamond in play.
+    """
+    player: int
+    enemies: tuple
+    diamonds: int
+    diamond_count: int = 0
+    enemy_terms: tuple = None
+    enemy_score: float = None
+    closest_diamond: float = None
+
+    @property
+    def win(self) -> bool:
+        """ The main agent wins once there are no diamonds left. """
+        return not self.diamonds
+
+    @property
+    def lose(self) -> bool:
+        """ The main agent loses when it shares a grid with an enemy while
+        there are still diamonds to collect. """
+        return bool(self.diamonds) and self.player in self.enemies
+
+
+def compile_state(state, grid) -> tuple:
+    """ Compile a game state dict into a GameState.
+
+    Args:
+        state (dict): The game state dict, with "main_agent", "enemies",
+            "diamond_coords" and "diamond_count" entries.
+        grid (GridGraph): The grid graph the coords are converted with.
+
+    Returns:
+        tuple: (game_state, diamond_cells), where diamond_cells is the tuple
+            of diamond cell indices that the bits of game_state.diamonds
+            refer to.
+    """
+    to_index = grid.to_index
+
+    # A diamond listed twice still only needs the one bit.
+    diamond_cells = tuple(dict.fromkeys(
+        to_index(coord) for coord in state["diamond_coords"]
+    ))
+
+    game_state = GameState(
+        to_index(state["main_agent"]),
+        tuple(to_index(coord) for coord in state["enemies"]),
+        (1 << len(diamond_cells)) - 1,
+        state.get("diamond_count", 0)
+    )
+
+    return game_state, diamond_cells
+
+
+def state_to_dict(game_state, grid, diamond_cells) -> dict:
+    """ Turn a GameState back into the game state dict it was compiled
+    from.
+
+    Args:
+        game_state (GameState): The state to convert.
+        grid (GridGraph): The grid graph the cells are converted with.
+        diamond_cells (tuple of int): The diamond cells the state was
+            compiled with.
+
+    Returns:
+        dict: The game state dict.
+    """
+    to_coord = grid.to_coord
+
+    return {
+        "main_agent": to_coord(game_state.player),
+        "enemies": [to_coord(cell) for cell in game_state.enemies],
+        "diamond_coords": [
+            to_coord(cell) for bit, cell in enumerate(diamond_cells)
+            if game_state.diamonds >> bit & 1
+        ],
+        "score": 0,
+        "win": game_state.win,
+        "lose": game_state.lose,
+        "diamond_count": game_state.diamond_count
+    }
@@ -1,8 +1,17 @@
 import heapq
 
 from agent.computer import Computer
-from queue import PriorityQueue
-from collections import deque
+from agent.search_kernels import (
+    breadth_first_search,
+    best_first_search,
+    bidirectional_a_star_search,
+    nearest_goal_search,
+    jump_point_search,
+    fill_jump_path
+)
+from agent.dstar_lite import DStarLite
+from platform_graph import PlatformGraph
+from grid_graph import NO_CELL
 
 
 class InformedComputer(Computer):
@@ -15,90 +24,43 @@ class InformedComputer(Computer):
     def generate_path(self) -> list:
         """ This function generates a path leading to the diamond. """
 
-        start = self.character.get_player_grid_coordinates()
-        fringe = PriorityQueue()
-        # This dict records the lowest cost currently seen for any
-        # vertex encountered.
-        costs = {start: 0}
-        # We will use this dict to go to generate the final path when
-        # the goal is found.
-        came_from = {start: None}
-        # I have coded this algo such that a visited list is not needed but
-        # we still want to use it for showing which grids were visited on
-        # the maze game.
-        visited = []
-
-        # The fringe will record the (cost, position) of the grids
-        fringe.put((0, start))
-
-        while not fringe.empty():
-            cost, current = fringe.get()
-            visited.append(current)
-
-            # When we found the diamond we can stop the algorithm
-            if current == (self.diamond_grid_y, self.diamond_grid_x):
-                self._visited_grids = visited
-
-                if self.perform_analysis:
-                    self.tracker.total_nodes_visited += len(visited)
-                    if not self.character.in_filled_maze:
-                        print(
-                            f"The number of visited nodes is: {len(came_from)}"
-                        )
-
-                return self.reconstruct_path(came_from, current)
-
-            # Loop through the neighbours of the current vertex and add to
-            # the fringe if its not been recorded in the costs dict, or if it
-            # has been recorded then see if it can grant as a lower path cost.
-            for neighbour in self.get_neighbour(current, cost):
-                new_cost, neighbour_pos = neighbour
-
-                if (neighbour_pos in came_from and
-                   came_from[current] == neighbour_pos):
-                    continue
-
-                if ((neighbour_pos not in costs) or
-                        (new_cost < costs[neighbour_pos])):
-                    costs[neighbour_pos] = new_cost
-                    came_from[neighbour_pos] = current
-                    fringe.put((new_cost, neighbour_pos))
-
-    def get_neighbour(self, current, cost) -> list:
-        """ Get the neighbours and its costs from a grid/vertex. """
-
-        neighbours = []
-
-        # Loop through all the neighbours
-        for direction in self._directions:
-            new_cost = 0
-            neighbour = (current[0] + direction[0], current[1] + direction[1])
-
-            # Get the type of grid the neighbour is
-            neighbour_grid_value = (
-                self._walkable_maze_matrix[neighbour[0]][neighbour[1]]
-            )
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
 
-            # If the neighbour is a wall or floor then skip
-            if (neighbour_grid_value == 0):
-                continue
+        goal, came_from, visited = best_first_search(
+            grid,
+            start,
+            grid.to_index((self.diamond_grid_y, self.diamond_grid_x)),
+            heuristic=self.get_heuristic_function()
+        )
 
-            # Check if the neighbour is a empty space or a ladder
-            if (neighbour_grid_value == 1 or neighbour_grid_value == 3):
-                new_cost = cost + 1
-            # Check if the neighbour is a slow tile
-            elif (neighbour_grid_value == 4):
-                new_cost = cost + 3
+        if goal == NO_CELL:
+            return None
 
-            if self.heuristic == "manhattan":
-                new_cost += self.get_manhattan_distance(neighbour)
-            elif self.heuristic == "weighted_manhattan":
-                new_cost += self.get_weighted_manhattan_distance(neighbour)
+        self._visited_grids = visited
 
-            neighbours.append((new_cost, neighbour))
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            if not self.character.in_filled_maze:
+                print(
+                    f"The number of visited nodes is: {len(visited)}"
+                )
+
+        return self.reconstruct_path(came_from, goal)
 
-        # sort neighbour from low to high using the cost value
-        return sorted(neighbours, key=lambda x: x[0])
+    def get_heuristic_function(self):
+        """ Return a function which gives the heuristic value of a cell
+        index, or None if this computer does not use a heuristic. """
+        to_coord = self._grid.to_coord
+
+        if self.heuristic == "manhattan":
+            return lambda cell: self.get_manhattan_distance(to_coord(cell))
+        elif self.heuristic == "weighted_manhattan":
+            return lambda cell: self.get_weighted_manhattan_distance(
+                to_coord(cell)
+            )
+
+        return None
 
     def get_manhattan_distance(self, neighbour) -> int:
         """ This function gets the manhattan distance between player
@@ -139,6 +101,10 @@ class InformedComputer(Computer):
 
 
 class AStarFilledComputer(InformedComputer):
+    # The goal comes from the spanning tree edges this computer works
+    # through, so the same start and maze can lead to a different path.
+    use_path_cache = False
+
     def __init__(self, character, walkable_maze, **kwargs):
         super().__init__(
             character,
@@ -269,6 +235,202 @@ class AStarComputer(InformedComputer):
             self.heuristic = "manhattan"
 
 
+class BidirectionalAStarComputer(InformedComputer):
+    """ This computer runs A* from the player towards the diamond and from
+    the diamond towards the player, taking turns, until no path through the
+    unexpanded grids can be cheaper than where the two searches met. """
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+        diamond = kwargs.get("diamond")
+        self.diamond_grid_x = diamond.grid_x
+        self.diamond_grid_y = diamond.grid_y
+
+    def generate_path(self) -> list:
+        """ This function uses bidirectional A* to find the path to the
+        diamond. """
+
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
+
+        goal, came_from, visited = bidirectional_a_star_search(
+            grid,
+            start,
+            grid.to_index((self.diamond_grid_y, self.diamond_grid_x))
+        )
+
+        if goal == NO_CELL:
+            return None
+
+        # Holds the grids expanded from both ends, in the order they were
+        # expanded.
+        self._visited_grids = visited
+
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            if not self.character.in_filled_maze:
+                print(
+                    f"The number of visited nodes is: {len(visited)}"
+                )
+
+        return self.reconstruct_path(came_from, goal)
+
+
+class JumpPointComputer(InformedComputer):
+    """ This computer runs A* over the jump points of the maze, so long
+    corridors are crossed in one step instead of one grid at a time. """
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+        diamond = kwargs.get("diamond")
+        self.diamond_grid_x = diamond.grid_x
+        self.diamond_grid_y = diamond.grid_y
+
+    def generate_path(self) -> list:
+        """ This function uses jump point search to find the path to the
+        diamond. """
+
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
+
+        goal, jump_parents, visited = jump_point_search(
+            grid,
+            start,
+            grid.to_index((self.diamond_grid_y, self.diamond_grid_x))
+        )
+
+        if goal == NO_CELL:
+            return None
+
+        # Only the jump points are expanded, so these are what the
+        # highlighter shows as visited.
+        self._visited_grids = visited
+
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            if not self.character.in_filled_maze:
+                print(
+                    f"The number of visited nodes is: {len(visited)}"
+                )
+
+        # Fill in the grids between the jump points, then give
+        # reconstruct_path a parent for every grid on the path.
+        path = fill_jump_path(grid, jump_parents, goal)
+        parents = {cell: parent for parent, cell in zip(path, path[1:])}
+        parents[path[0]] = NO_CELL
+
+        return self.reconstruct_path(parents, goal)
+
+
+class PlatformGraphComputer(InformedComputer):
+    """ This computer searches the contracted platform graph, where every
+    corridor and ladder shaft is a single edge, then expands the result back
+    into a grid by grid path. """
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+        diamond = kwargs.get("diamond")
+        self.diamond_grid_x = diamond.grid_x
+        self.diamond_grid_y = diamond.grid_y
+
+    def generate_path(self) -> list:
+        """ This function searches the platform graph for the path to the
+        diamond. """
+
+        grid = self._grid
+
+        path, visited = PlatformGraph.for_grid(grid).find_path(
+            grid.to_index(self.character.get_player_grid_coordinates()),
+            grid.to_index((self.diamond_grid_y, self.diamond_grid_x))
+        )
+
+        if path is None:
+            return None
+
+        self._visited_grids = visited
+
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            if not self.character.in_filled_maze:
+                print(
+                    f"The number of visited nodes is: {len(visited)}"
+                )
+
+        parents = {cell: parent for parent, cell in zip(path, path[1:])}
+        parents[path[0]] = NO_CELL
+
+        return self.reconstruct_path(parents, path[-1])
+
+
+class DStarLiteComputer(InformedComputer):
+    """ This computer keeps one D* Lite planner for the whole game. Each call
+    to generate_path only repairs the part of the previous search that the
+    player moving, or the maze changing, has made out of date.
+
+    Attributes:
+        _planner (DStarLite): The incremental planner, created on the first
+            call to generate_path.
+    """
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+        diamond = kwargs.get("diamond")
+        self.diamond_grid_x = diamond.grid_x
+        self.diamond_grid_y = diamond.grid_y
+
+        self._planner = None
+
+    def generate_path(self) -> list:
+        """ This function replans the path to the diamond. """
+
+        grid = self._grid
+
+        # The walkable maze may have been swapped for a new one, the old
+        # planner's values mean nothing for it.
+        if self._planner is None or self._planner.grid is not grid:
+            self._planner = DStarLite(grid)
+
+        path, visited = self._planner.plan(
+            grid.to_index(self.character.get_player_grid_coordinates()),
+            grid.to_index((self.diamond_grid_y, self.diamond_grid_x))
+        )
+
+        if path is None:
+            return None
+
+        self._visited_grids = visited
+
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            if not self.character.in_filled_maze:
+                print(
+                    f"The number of visited nodes is: {len(visited)}"
+                )
+
+        # The planner returns the path itself, so give reconstruct_path a
+        # parent array that walks it backwards.
+        parents = {cell: parent for parent, cell in zip(path, path[1:])}
+        parents[path[0]] = NO_CELL
+
+        return self.reconstruct_path(parents, path[-1])
+
+
 class GreedyComputer(InformedComputer):
     def __init__(self, character, walkable_maze, **kwargs):
         super().__init__(
@@ -279,46 +441,58 @@ class GreedyComputer(InformedComputer):
         self.heuristic = None
         self.diamond_list = kwargs.get("diamond_list")
 
+        # When set, every diamond is a target of one search and the first
+        # one reached is taken, instead of picking a target by manhattan
+        # distance first.
+        self.multi_target = kwargs.get("multi_target", False)
+
+    def get_algorithm_name(self) -> tuple:
+        return super().get_algorithm_name() + (self.multi_target,)
+
     def generate_path(self) -> list:
         """ This function uses the manhattan distance to get the closet
-        diamond, then it will use bfs to get the path to that diamond."""
+        diamond, then it will use bfs to get the path to that diamond.
 
-        start = self.character.get_player_grid_coordinates()
-        goal = self.get_manhattan_distance_of_all_diamonds()
-        queue = deque([start])
-        visited = []
-        # This will contain the all the potential paths, bfs has looked into
-        search_path_history = {start: None}
-
-        while queue:
-            current = queue.popleft()
-            visited.append(current)
-
-            if current == goal:
-                self._visited_grids = visited
-
-                if self.perform_analysis:
-                    self.tracker.total_nodes_visited += len(visited)
-                    if not self.character.in_filled_maze:
-                        print(
-                            f"The number of visited nodes is: {len(visited)}"
-                        )
-
-                return self.reconstruct_path(search_path_history, current)
-
-            # Loop through all 4 directions the computer can take
-            for direction in self._directions:
-                next_grid = (current[0] + direction[0],
-                             current[1] + direction[1])
-
-                # Check if the next grid we are looking at is
-                # walkable and not visited.
-                if (self._walkable_maze_matrix[next_grid[0]][next_grid[1]]
-                        != 0 and next_grid not in visited):
-                    queue.append(next_grid)
-                    search_path_history[next_grid] = current
+        In multi target mode a single Dijkstra search is run towards every
+        diamond at once, which finds the diamond that is really the cheapest
+        to walk to."""
 
-        return None
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
+
+        if self.multi_target:
+            goal, search_path_history, visited = nearest_goal_search(
+                grid,
+                start,
+                grid.diamond_cells
+            )
+        else:
+            target = self.get_manhattan_distance_of_all_diamonds()
+
+            # Only the chosen diamond counts as a goal for the bfs.
+            goal_cells = bytearray(grid.get_cell_count())
+            if self.diamond_list:
+                goal_cells[grid.to_index(target)] = 1
+
+            goal, search_path_history, visited = breadth_first_search(
+                grid,
+                start,
+                goal_cells
+            )
+
+        if goal == NO_CELL:
+            return None
+
+        self._visited_grids = visited
+
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            if not self.character.in_filled_maze:
+                print(
+                    f"The number of visited nodes is: {len(visited)}"
+                )
+
+        return self.reconstruct_path(search_path_history, goal)
 
     def get_manhattan_distance_of_all_diamonds(self) -> tuple:
         """ This function returns the coordinates of the diamond with the
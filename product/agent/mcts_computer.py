@@ -0,0 +1,381 @@
+import math
+import random
+import time
+
+import constants as C
+
+from agent.competitive_computer import CompetitiveComputer
+
+""" Monte Carlo tree search for the competitive game. Rather than searching
+every move to a fixed depth, the tree is grown one node at a time towards the
+moves that have scored best so far, with each new node scored by the
+evaluation function, after an optional short rollout of cheap random and
+greedy moves. The search can be stopped after any number of iterations, so
+the time it takes per move is bounded by its budget whatever the number of
+enemies.
+
+The tree is kept between moves. Once the move chosen and the replies of the
+other agents have been played, the subtree they lead to becomes the root of
+the next search, so it starts with the visits already made below it.
+"""
+
+
+class MCTSNode:
+    """ A node of the search tree, one agent's move in the game.
+
+    Attributes:
+        state (GameState): The state of the game at the node.
+        agent_index (int): The agent to move at the node.
+        player_action (str): The last action of the main agent.
+        enemy_action (str): The last action of an enemy.
+        parent (MCTSNode): The node this one was expanded from, or None for
+            the root.
+        action (str): The action the parent took to get here.
+        ply (int): The number of moves made since the root.
+        children (list of MCTSNode): The nodes expanded from this one.
+        untried (list of str): The actions of agent_index not expanded yet.
+        visits (int): The number of rollouts made through the node.
+        value (float): The sum of the rewards of those rollouts, for the
+            main agent, each between 0 (lose) and 1 (win).
+    """
+    __slots__ = ("state", "agent_index", "player_action", "enemy_action",
+                 "parent", "action", "ply", "children", "untried", "visits",
+                 "value")
+
+    def __init__(self, state, agent_index, player_action, enemy_action,
+                 parent, action, ply, untried) -> None:
+        self.state = state
+        self.agent_index = agent_index
+        self.player_action = player_action
+        self.enemy_action = enemy_action
+        self.parent = parent
+        self.action = action
+        self.ply = ply
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.value = 0.0
+
+
+class MCTSComputer(CompetitiveComputer):
+    """ Chooses moves with Monte Carlo tree search, picking children with
+    UCT. The main agent picks the child with the highest reward, the enemies
+    the lowest.
+
+    Each move is given a budget of mcts_iterations rollouts, or of
+    move_time_ms milliseconds when that is set. Rollouts made in an earlier
+    search below the new root count towards the budget.
+
+    Attributes:
+        mcts_iterations (int): The number of rollouts made below the root
+            per move when there is no time budget.
+        iterations (int): The number of iterations the last search ran.
+        reused_visits (int): The number of rollouts below the root the last
+            search started with, taken over from the search before it.
+        _random (Random): Picks the random moves of the search.
+        _tree (MCTSNode): The root of the last search, or None.
+        _tree_diamond_cells (tuple of int): The diamond cells the states of
+            _tree were compiled with.
+        _tree_distances (ndarray): The distance table the states of _tree
+            were scored with.
+    """
+    # The tree holds everything the search learns about a position, so
+    # there is nothing left to share through a transposition table.
+    use_transposition_table = False
+
+    # Carry the subtree of the moves actually played over to the next
+    # search.
+    use_tree_reuse = True
+
+    # The moves below the root have far fewer visits than the root move, so
+    # they are not followed blindly. Searching again from the reused tree is
+    # cheap anyway.
+    use_plans = False
+
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+        self.mcts_iterations = (
+            kwargs.get("mcts_iterations") or C.MCTS_ITERATIONS
+        )
+        self.iterations = 0
+        self.reused_visits = 0
+        self._random = random.Random(kwargs.get("seed"))
+
+        self._tree = None
+        self._tree_diamond_cells = None
+        self._tree_distances = None
+
+    def choose_action(self, state) -> tuple:
+        """ Grow a search tree from the state until the budget for the move
+        is used up, then take the most visited move. The tree is picked up
+        from the last search when it reached the state. The first iteration
+        always runs, so there is a move to make however small the budget.
+
+        Args:
+            state (GameState): The state to search from.
+
+        Returns:
+            tuple: (value, action), where value is the average reward of
+                the move for the main agent.
+        """
+        root = self.find_subtree(state)
+        if root is None:
+            root = self.new_node(state, self._agent_type, None, None, None,
+                                 None, 0)
+
+        self.reused_visits = root.visits
+
+        deadline = None
+        if self.move_time_ms is not None:
+            deadline = time.perf_counter() + self.move_time_ms / 1000
+
+        # Tree nodes are counted by their ply, the statistics take that as
+        # a negative depth left below a root at depth -ply.
+        self.search_statistics.begin_search(-root.ply)
+
+        iterations = 0
+        while not self.stop_thread:
+            if deadline is None:
+                if iterations and root.visits >= self.mcts_iterations:
+                    break
+            elif iterations and time.perf_counter() >= deadline:
+                break
+
+            self.run_iteration(root)
+            iterations += 1
+
+        self.iterations = iterations
+
+        if self.use_tree_reuse:
+            self._tree = root
+            self._tree_diamond_cells = self._diamond_cells
+            self._tree_distances = self._grid.get_distance_table()
+
+        # The principal variation follows the most visited moves down.
+        self.principal_variation = []
+        node = root
+        while node.children:
+            node = max(node.children, key=lambda child: child.visits)
+            self.principal_variation.append((node.parent.agent_index,
+                                             node.action))
+        self.search_depth = len(self.principal_variation)
+
+        if not root.children:
+            return (self.evaluation_function(state, 0, None), None)
+
+        best = max(root.children, key=lambda child: child.visits)
+
+        return (best.value / best.visits, best.action)
+
+    def find_subtree(self, state):
+        """ Find the node of the last search tree the game has reached, one
+        move of every agent below its root, and make it the new root.
+
+        The tree only models one move per agent in turn, and diamonds are
+        never taken off the board inside it. If an agent did not make
+        exactly one move, a diamond has been collected or the maze has
+        changed, the tree cannot have reached the state.
+
+        Args:
+            state (GameState): The state to search from.
+
+        Returns:
+            MCTSNode: The new root, or None if the tree has to be rebuilt.
+        """
+        node, self._tree = self._tree, None
+
+        if (node is None or
+                self._tree_diamond_cells != self._diamond_cells or
+                self._tree_distances is not self._grid.get_distance_table()):
+            return None
+
+        for _ in range(self.num_characters):
+            agent_index = node.agent_index
+            cell = self.get_cell(state, agent_index)
+            node = next(
+                (child for child in node.children
+                 if self.get_cell(child.state, agent_index) == cell),
+                None
+            )
+
+            if node is None:
+                return None
+
+        if node.state != state:
+            return None
+
+        node.parent = None
+
+        return node
+
+    @staticmethod
+    def get_cell(state, agent_index) -> int:
+        """ The cell an agent is on. """
+        if agent_index == 0:
+            return state.player
+
+        return state.enemies[agent_index - 1]
+
+    def run_iteration(self, root) -> None:
+        """ Run one iteration of the search: select a node with UCT, expand
+        one of its untried actions, roll the game out from the new node and
+        pass the reward back up to the root. """
+        node = root
+
+        while not node.untried and node.children:
+            node = self.select_child(node)
+
+        if node.untried:
+            action = node.untried.pop(
+                self._random.randrange(len(node.untried))
+            )
+            node = self.expand(node, action)
+
+        reward = self.rollout(node)
+
+        while node is not None:
+            node.visits += 1
+            node.value += reward
+            node = node.parent
+
+    def new_node(self, state, agent_index, player_action, enemy_action,
+                 parent, action, ply) -> MCTSNode:
+        """ Build a tree node, with the legal actions of the agent to move
+        as its untried actions. The game is over at a terminal node, so it
+        has none. An agent with no legal action passes its turn. """
+        untried = []
+
+        if not self.is_terminal(state):
+            untried = self.get_actions(state, agent_index, player_action,
+                                       enemy_action) or [None]
+
+        return MCTSNode(state, agent_index, player_action, enemy_action,
+                        parent, action, ply, untried)
+
+    def get_actions(self, state, agent_index, player_action,
+                    enemy_action) -> list:
+        """ The legal actions of an agent, the same as the minimax search
+        would give it. """
+        prev_action = player_action if agent_index == 0 else enemy_action
+
+        return self.legal_cell_moves(self.get_cell(state, agent_index),
+                                     prev_action)
+
+    def select_child(self, node) -> MCTSNode:
+        """ Pick the child with the best upper confidence bound, from the
+        point of view of the agent to move at the node. """
+        log_visits = math.log(node.visits)
+        best_child, best_score = None, float("-inf")
+
+        for child in node.children:
+            mean = child.value / child.visits
+            if node.agent_index != 0:
+                mean = 1 - mean
+
+            score = mean + C.MCTS_EXPLORATION * math.sqrt(
+                log_visits / child.visits
+            )
+
+            if score > best_score:
+                best_child, best_score = child, score
+
+        return best_child
+
+    def expand(self, node, action) -> MCTSNode:
+        """ Add the child reached by taking an action at a node. """
+        agent_index = node.agent_index
+        player_action, enemy_action = node.player_action, node.enemy_action
+
+        if agent_index == 0:
+            player_action = action
+        else:
+            enemy_action = action
+
+        started = time.perf_counter()
+        successor = self.generate_successor(node.state, agent_index, action)
+        self.search_statistics.successor_time += (
+            time.perf_counter() - started
+        )
+
+        child = self.new_node(
+            successor,
+            (agent_index + 1) % self.num_characters,
+            player_action,
+            enemy_action,
+            node,
+            action,
+            node.ply + 1
+        )
+        node.children.append(child)
+
+        self.nodes_expanded += 1
+        self.search_statistics.record_node(-child.ply, agent_index)
+
+        return child
+
+    def rollout(self, node) -> float:
+        """ Play the game on from a node for MCTS_ROLLOUT_DEPTH moves and
+        score where it ends up. Enemies mostly chase the main agent, which
+        moves at random.
+
+        Returns:
+            float: The reward for the main agent, between 0 and 1.
+        """
+        state, agent_index = node.state, node.agent_index
+        player_action, enemy_action = node.player_action, node.enemy_action
+        steps = 0
+
+        while steps < C.MCTS_ROLLOUT_DEPTH and not self.is_terminal(state):
+            actions = self.get_actions(state, agent_index, player_action,
+                                       enemy_action)
+
+            if actions:
+                action = self.rollout_policy(state, agent_index, actions)
+                state = self.generate_successor(state, agent_index, action)
+
+                if agent_index == 0:
+                    player_action = action
+                else:
+                    enemy_action = action
+
+            agent_index = (agent_index + 1) % self.num_characters
+            steps += 1
+
+        started = time.perf_counter()
+        score = self.evaluation_function(state, 0, player_action)
+        self.search_statistics.record_leaf(-(node.ply + steps),
+                                           time.perf_counter() - started)
+
+        # Squash the score into a reward between 0 and 1, a win or loss is
+        # infinite so it lands on 1 or 0.
+        return 0.5 + 0.5 * math.tanh(score / C.MCTS_SCORE_SCALE)
+
+    def rollout_policy(self, state, agent_index, actions) -> str:
+        """ Pick the action an agent takes in a rollout. """
+        if (agent_index == 0 or
+                self._random.random() < C.MCTS_ROLLOUT_RANDOMNESS):
+            return self._random.choice(actions)
+
+        # Greedy enemies step to the grid closest to the main agent.
+        cell = state.enemies[agent_index - 1]
+        get_distance = self._grid.get_distance
+
+        return min(
+            actions,
+            key=lambda action: get_distance(
+                cell + self._cell_offsets[action],
+                state.player
+            )
+        )
+
+    def get_search_report(self, value, action, search_time) -> dict:
+        report = super().get_search_report(value, action, search_time)
+        report["iterations"] = self.iterations
+        report["reused_visits"] = self.reused_visits
+
+        return report
@@ -0,0 +1,136 @@
+import multiprocessing
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+""" Root parallel search for the competitive computers. Each move at the root
+of the game tree is searched in its own task on a pool of worker processes,
+which sidesteps the GIL the search threads share with the render loop.
+
+Every worker builds its own computer once, from a copy of the walkable maze,
+and reads the maze distance table straight out of shared memory rather than
+building or copying it. The results come back in the order the moves were
+handed out, so the move picked never depends on which worker finished
+first.
+"""
+
+# The computer each worker process searches with, set up by init_worker.
+_worker_computer = None
+
+# Keeps the shared distance table mapped for the life of the worker.
+_worker_memory = None
+
+
+def init_worker(computer_class, walkable_maze, kwargs, settings,
+                memory_name, table_shape) -> None:
+    """ Build the computer a worker process searches with.
+
+    Args:
+        computer_class (type): The competitive computer class to build.
+        walkable_maze (list of list): Copy of the walkable maze matrix.
+        kwargs (dict): The keyword arguments for the computer.
+        settings (dict): Attributes to set on the computer once it is
+            built, such as use_transposition_table.
+        memory_name (str): The shared memory block holding the distance
+            table.
+        table_shape (tuple): The shape of the distance table.
+    """
+    global _worker_computer, _worker_memory
+
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    distances = np.ndarray(table_shape, dtype=np.uint16,
+                           buffer=_worker_memory.buf)
+    distances.flags.writeable = False
+
+    _worker_computer = computer_class(None, walkable_maze, **kwargs)
+    _worker_computer._grid.use_distance_table(distances)
+
+    for name, value in settings.items():
+        setattr(_worker_computer, name, value)
+
+
+def search_root_move(*args):
+    """ Search below one root move with the computer of this worker. The
+    arguments and result are those of CompetitiveComputer.search_root_move.
+    """
+    return _worker_computer.search_root_move(*args)
+
+
+class RootSearchPool:
+    """ A pool of worker processes for one competitive computer.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        distances (ndarray): The distance table the workers were given,
+            the pool has to be replaced once the computer's table changes.
+        _memory (SharedMemory): The block the distance table is shared in.
+        _executor (ProcessPoolExecutor): The worker processes.
+
+    Args:
+        computer (CompetitiveComputer): The computer the pool searches for.
+        workers (int): The number of worker processes to start.
+    """
+    def __init__(self, computer, workers) -> None:
+        self.workers = workers
+        self.distances = computer._grid.get_distance_table()
+
+        self._memory = shared_memory.SharedMemory(
+            create=True,
+            size=max(self.distances.nbytes, 1)
+        )
+        np.ndarray(self.distances.shape, dtype=np.uint16,
+                   buffer=self._memory.buf)[:] = self.distances
+
+        kwargs = {
+            "agent_type": computer._agent_type,
+            "joint_enemies": computer.joint_enemies,
+            "num_characters": computer.num_characters
+        }
+        settings = {
+            name: getattr(computer, name)
+            for name in computer.worker_settings
+        }
+
+        # The game runs threads, which forking does not copy safely, so the
+        # workers are started fresh.
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(
+                type(computer),
+                [row[:] for row in computer._walkable_maze_matrix],
+                kwargs,
+                settings,
+                self._memory.name,
+                self.distances.shape
+            )
+        )
+
+    def search(self, state, depth, agent_index, actions, time_left) -> list:
+        """ Search below every root move.
+
+        Args:
+            state (dict): The game state dict at the root.
+            depth (int): The depth the root is searched to.
+            agent_index (int): The agent to move at the root.
+            actions (list of str): The root moves.
+            time_left (float): The seconds each search may take, or None.
+
+        Returns:
+            list: The result of each move, in the order of actions.
+        """
+        futures = [
+            self._executor.submit(search_root_move, state, depth,
+                                  agent_index, action, time_left)
+            for action in actions
+        ]
+
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """ Stop the workers and free the shared distance table. """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._memory.close()
+        self._memory.unlink()
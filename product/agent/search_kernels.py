@@ -0,0 +1,577 @@
+import heapq
+
+from array import array
+from collections import deque
+
+from grid_graph import NO_CELL
+
+""" The search kernels in this file work on the flat cell indices of a
+GridGraph. Visited sets are bytearrays and parents are int32 arrays indexed by
+cell, so every check is a constant time lookup and a search never costs more
+than the number of cells and edges in the maze.
+
+Every kernel returns a tuple of:
+    1. The cell index of the goal that was reached, or NO_CELL.
+    2. The int32 parent array, the start cell has NO_CELL as its parent.
+    3. The int32 array of cells in the order they were visited.
+"""
+
+
+def breadth_first_search(grid, start, goal_cells) -> tuple:
+    """ Breadth first search from start until a goal cell is reached.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+        start (int): The cell index to start from.
+        goal_cells (bytearray): Has a non-zero value for every goal cell.
+
+    Returns:
+        tuple: (goal, parents, visit_order) as described above.
+    """
+    neighbours = grid.neighbours
+    cell_count = grid.get_cell_count()
+
+    parents = array("i", [NO_CELL]) * cell_count
+    visited = bytearray(cell_count)
+    visit_order = array("i")
+
+    # Cells are marked as visited as soon as they are queued, so no cell can
+    # be queued twice.
+    queue = deque([start])
+    visited[start] = 1
+
+    while queue:
+        current = queue.popleft()
+        visit_order.append(current)
+
+        if goal_cells[current]:
+            return current, parents, visit_order
+
+        for next_cell in neighbours[current]:
+            if not visited[next_cell]:
+                visited[next_cell] = 1
+                parents[next_cell] = current
+                queue.append(next_cell)
+
+    return NO_CELL, parents, visit_order
+
+
+def depth_first_search(grid, start, goal_cells) -> tuple:
+    """ Depth first search from start until a goal cell is reached.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+        start (int): The cell index to start from.
+        goal_cells (bytearray): Has a non-zero value for every goal cell.
+
+    Returns:
+        tuple: (goal, parents, visit_order) as described above.
+    """
+    neighbours = grid.neighbours
+    cell_count = grid.get_cell_count()
+
+    parents = array("i", [NO_CELL]) * cell_count
+    visited = bytearray(cell_count)
+    visit_order = array("i")
+
+    stack = [start]
+
+    while stack:
+        current = stack.pop()
+
+        # A cell can be pushed by more than one neighbour before it is
+        # popped, only the first pop counts.
+        if visited[current]:
+            continue
+
+        visited[current] = 1
+        visit_order.append(current)
+
+        if goal_cells[current]:
+            return current, parents, visit_order
+
+        # The latest push of a cell is the one that gets popped first, so
+        # overwriting the parent keeps it in line with the pop order.
+        for next_cell in neighbours[current]:
+            if not visited[next_cell]:
+                parents[next_cell] = current
+                stack.append(next_cell)
+
+    return NO_CELL, parents, visit_order
+
+
+class OpenList:
+    """ Binary heap open list for the best first searches. Unlike
+    queue.PriorityQueue it takes no locks, and instead of removing an entry
+    when a cheaper route to its cell is found, the old entry is left in the
+    heap and skipped when it reaches the top (lazy deletion).
+
+    Entries are (priority, cell) tuples, so ties on priority are always
+    broken by the smaller cell index.
+
+    Attributes:
+        _heap (list of tuple): The heap of (priority, cell) entries.
+        _priorities (list): The best priority pushed so far for every cell.
+        _closed (bytearray): Has a 1 for every cell which has been popped,
+            these cells will never be pushed or popped again.
+
+    Args:
+        cell_count (int): The number of cells in the maze.
+    """
+    def __init__(self, cell_count) -> None:
+        self._heap = []
+        self._priorities = [float("inf")] * cell_count
+        self._closed = bytearray(cell_count)
+
+    def __bool__(self) -> bool:
+        self._discard_stale_entries()
+        return bool(self._heap)
+
+    def push(self, priority, cell) -> bool:
+        """ Push a cell onto the open list, if it improves on the best
+        priority seen for the cell.
+
+        Returns:
+            bool: True if the cell was pushed, otherwise False.
+        """
+        if self._closed[cell] or priority >= self._priorities[cell]:
+            return False
+
+        self._priorities[cell] = priority
+        heapq.heappush(self._heap, (priority, cell))
+
+        return True
+
+    def peek(self) -> float:
+        """ Return the lowest priority on the open list without popping it,
+        or infinity if the open list is empty. """
+        self._discard_stale_entries()
+
+        return self._heap[0][0] if self._heap else float("inf")
+
+    def pop(self) -> tuple:
+        """ Pop the (priority, cell) entry with the lowest priority and close
+        the cell. """
+        self._discard_stale_entries()
+        priority, cell = heapq.heappop(self._heap)
+        self._closed[cell] = 1
+
+        return priority, cell
+
+    def _discard_stale_entries(self) -> None:
+        """ Remove entries from the top of the heap that have been replaced
+        by a cheaper entry, or whose cell has already been closed. """
+        heap = self._heap
+
+        while heap and (self._closed[heap[0][1]] or
+                        heap[0][0] != self._priorities[heap[0][1]]):
+            heapq.heappop(heap)
+
+
+def best_first_search(grid, start, goal, heuristic=None) -> tuple:
+    """ Uniform cost search from start to goal, this becomes A* when a
+    heuristic is given.
+
+    The priority of a grid is the priority of the grid it was reached from
+    plus the cost of stepping onto it, plus its heuristic value. A diamond
+    grid drops its priority to just the heuristic value, so it is taken off
+    the open list straight away.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+        start (int): The cell index to start from.
+        goal (int): The cell index to reach.
+        heuristic (function): Takes a cell index and returns its heuristic
+            value. When this is None the search is uniform cost.
+
+    Returns:
+        tuple: (goal, parents, visit_order) as described above.
+    """
+    neighbours = grid.neighbours
+    step_costs = grid.step_cost_list
+    diamond_cells = grid.diamond_cells
+    cell_count = grid.get_cell_count()
+
+    parents = array("i", [NO_CELL]) * cell_count
+    visit_order = array("i")
+
+    open_list = OpenList(cell_count)
+    open_list.push(0, start)
+
+    while open_list:
+        cost, current = open_list.pop()
+        visit_order.append(current)
+
+        if current == goal:
+            return current, parents, visit_order
+
+        parent = parents[current]
+
+        for next_cell in neighbours[current]:
+            # There is no point going back to the grid we came from.
+            if next_cell == parent:
+                continue
+
+            if diamond_cells[next_cell]:
+                new_cost = 0
+            else:
+                new_cost = cost + step_costs[next_cell]
+
+            if heuristic is not None:
+                new_cost += heuristic(next_cell)
+
+            if open_list.push(new_cost, next_cell):
+                parents[next_cell] = current
+
+    return NO_CELL, parents, visit_order
+
+
+def nearest_goal_search(grid, start, goal_cells) -> tuple:
+    """ Dijkstra's search from start which stops at the first goal cell
+    taken off the open list. Every goal is a target at once, so the goal
+    returned is the cheapest one to walk to, counting slow tiles and the
+    detours ladders force.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+        start (int): The cell index to start from.
+        goal_cells (bytearray): Has a non-zero value for every goal cell.
+
+    Returns:
+        tuple: (goal, parents, visit_order) as described above.
+    """
+    neighbours = grid.neighbours
+    step_costs = grid.step_cost_list
+    cell_count = grid.get_cell_count()
+
+    parents = array("i", [NO_CELL]) * cell_count
+    visit_order = array("i")
+
+    open_list = OpenList(cell_count)
+    open_list.push(0, start)
+
+    while open_list:
+        cost, current = open_list.pop()
+        visit_order.append(current)
+
+        if goal_cells[current]:
+            return current, parents, visit_order
+
+        for next_cell in neighbours[current]:
+            if open_list.push(cost + step_costs[next_cell], next_cell):
+                parents[next_cell] = current
+
+    return NO_CELL, parents, visit_order
+
+
+def jump_point_search(grid, start, goal) -> tuple:
+    """ A* over the jump points of the grid. Runs of plain corridor grids are
+    crossed in a single jump using the grid's jump table, so only ladders,
+    slow tiles, diamonds, junctions and dead ends are expanded.
+
+    The heuristic is the manhattan distance to the goal. Every step costs
+    at least 1, so the path found is as cheap as uniform cost search's.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+        start (int): The cell index to start from.
+        goal (int): The cell index to reach.
+
+    Returns:
+        tuple: (goal, parents, visit_order) as described above. Parents only
+            link the cells the search stopped on, fill_jump_path fills in
+            the grids between them.
+    """
+    jump_table = grid.get_jump_table()
+    cols = grid.cols
+    cell_count = grid.get_cell_count()
+    goal_y, goal_x = grid.to_coord(goal)
+
+    parents = array("i", [NO_CELL]) * cell_count
+    visit_order = array("i")
+    costs = [float("inf")] * cell_count
+
+    open_list = OpenList(cell_count)
+    costs[start] = 0
+    open_list.push(0, start)
+
+    while open_list:
+        _, current = open_list.pop()
+        visit_order.append(current)
+
+        if current == goal:
+            return current, parents, visit_order
+
+        current_y, current_x = divmod(current, cols)
+
+        for direction_index, (step_y, step_x) in enumerate(grid.DIRECTIONS):
+            jump = jump_table[current][direction_index]
+
+            if jump is None:
+                continue
+
+            landing, jump_cost = jump
+            landing_y, landing_x = divmod(landing, cols)
+
+            # A jump can pass over the goal when it is not a jump point, in
+            # that case stop on the goal instead. The goal's own jump in the
+            # same direction lands in the same place, so the difference in
+            # cost is the cost of getting to the goal.
+            if step_y == 0:
+                on_run = goal_y == current_y
+            else:
+                on_run = goal_x == current_x
+
+            steps_to_goal = (
+                (goal_x - current_x) * step_x + (goal_y - current_y) * step_y
+            )
+            steps_to_landing = (
+                abs(landing_x - current_x) + abs(landing_y - current_y)
+            )
+
+            if on_run and 0 < steps_to_goal < steps_to_landing:
+                landing = goal
+                jump_cost -= jump_table[goal][direction_index][1]
+                landing_y, landing_x = goal_y, goal_x
+
+            new_cost = costs[current] + jump_cost
+
+            if new_cost < costs[landing]:
+                heuristic = abs(landing_y - goal_y) + abs(landing_x - goal_x)
+
+                if open_list.push(new_cost + heuristic, landing):
+                    costs[landing] = new_cost
+                    parents[landing] = current
+
+    return NO_CELL, parents, visit_order
+
+
+def fill_jump_path(grid, parents, goal) -> list:
+    """ Turn the parents found by jump_point_search into a full list of cell
+    indices, filling in the straight runs between each pair of cells.
+
+    Returns:
+        list: Every cell index from the start to the goal.
+    """
+    path = [goal]
+    current = goal
+
+    while parents[current] != NO_CELL:
+        parent = parents[current]
+        parent_y, parent_x = grid.to_coord(parent)
+        current_y, current_x = grid.to_coord(current)
+
+        # Cells between two jump points are always in a straight line, so
+        # step back one grid at a time towards the parent.
+        step = ((parent_y > current_y) - (parent_y < current_y)) * grid.cols
+        step += (parent_x > current_x) - (parent_x < current_x)
+
+        cell = current + step
+        while cell != parent:
+            path.append(cell)
+            cell += step
+
+        path.append(parent)
+        current = parent
+
+    path.reverse()
+
+    return path
+
+
+def join_frontiers(parents, backward_parents, forward_cell,
+                   backward_cell) -> int:
+    """ Join the two halves of a bidirectional search into one parent array.
+    The forward half already leads back to the start, the cells of the
+    backward half are given parents leading back to forward_cell.
+
+    Args:
+        parents (array of int): The forward search parents, updated in place.
+        backward_parents (array of int): Parents of the backward search,
+            these point towards the goal.
+        forward_cell (int): The forward side of the edge the searches met
+            on.
+        backward_cell (int): The backward side of the edge the searches met
+            on, this can be the same cell as forward_cell.
+
+    Returns:
+        int: The goal the backward half leads to.
+    """
+    if backward_cell != forward_cell:
+        parents[backward_cell] = forward_cell
+
+    current = backward_cell
+
+    while backward_parents[current] != NO_CELL:
+        next_cell = backward_parents[current]
+        parents[next_cell] = current
+        current = next_cell
+
+    return current
+
+
+def bidirectional_breadth_first_search(grid, start, goal_cells) -> tuple:
+    """ Breadth first search from the start and from every goal cell at
+    once. Each step expands a whole layer of the smaller frontier, and the
+    search stops after the first layer in which the frontiers touch.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+        start (int): The cell index to start from.
+        goal_cells (bytearray): Has a non-zero value for every goal cell.
+
+    Returns:
+        tuple: (goal, parents, visit_order) as described above. The visit
+            order holds the cells expanded by both frontiers.
+    """
+    neighbours = grid.neighbours
+    cell_count = grid.get_cell_count()
+    visit_order = array("i")
+
+    parents = array("i", [NO_CELL]) * cell_count
+    backward_parents = array("i", [NO_CELL]) * cell_count
+
+    if goal_cells[start]:
+        visit_order.append(start)
+        return start, parents, visit_order
+
+    goals = [cell for cell in range(cell_count) if goal_cells[cell]]
+
+    # The number of steps from the start, and to the nearest goal, of every
+    # cell each side has reached. -1 means not reached yet.
+    forward_dist = array("i", [-1]) * cell_count
+    backward_dist = array("i", [-1]) * cell_count
+    forward_dist[start] = 0
+    for goal in goals:
+        backward_dist[goal] = 0
+
+    sides = {
+        True: ([start], forward_dist, backward_dist, parents),
+        False: (goals, backward_dist, forward_dist, backward_parents)
+    }
+
+    while sides[True][0] and sides[False][0]:
+        forward = len(sides[True][0]) <= len(sides[False][0])
+        frontier, dist, other_dist, side_parents = sides[forward]
+
+        next_frontier = []
+        best = None
+
+        for current in frontier:
+            visit_order.append(current)
+
+            for next_cell in neighbours[current]:
+                if other_dist[next_cell] != -1:
+                    length = dist[current] + 1 + other_dist[next_cell]
+
+                    if best is None or length < best[0]:
+                        best = (length, current, next_cell)
+                elif dist[next_cell] == -1:
+                    dist[next_cell] = dist[current] + 1
+                    side_parents[next_cell] = current
+                    next_frontier.append(next_cell)
+
+        # Every path through this layer has been seen, so the shortest one
+        # found is the shortest path.
+        if best is not None:
+            _, current, next_cell = best
+            if not forward:
+                current, next_cell = next_cell, current
+
+            goal = join_frontiers(parents, backward_parents, current,
+                                  next_cell)
+            return goal, parents, visit_order
+
+        sides[forward] = (next_frontier, dist, other_dist, side_parents)
+
+    return NO_CELL, parents, visit_order
+
+
+def bidirectional_a_star_search(grid, start, goal) -> tuple:
+    """ A* from the start towards the goal and from the goal towards the
+    start, taking turns. Stepping onto a grid costs that grid's step cost,
+    so the backward search pays for the grid it is leaving.
+
+    Both searches use a manhattan heuristic, which never overestimates as
+    every step costs at least 1. Once either open list has nothing cheaper
+    than the best meeting found so far, no unexpanded path can beat it and
+    the search stops.
+
+    Args:
+        grid (GridGraph): The graph to search over.
+        start (int): The cell index to start from.
+        goal (int): The cell index to reach.
+
+    Returns:
+        tuple: (goal, parents, visit_order) as described above. The visit
+            order holds the cells expanded by both searches.
+    """
+    neighbours = grid.neighbours
+    step_costs = grid.step_cost_list
+    cell_count = grid.get_cell_count()
+    cols = grid.cols
+    visit_order = array("i")
+
+    parents = array("i", [NO_CELL]) * cell_count
+    backward_parents = array("i", [NO_CELL]) * cell_count
+
+    if start == goal:
+        visit_order.append(start)
+        return start, parents, visit_order
+
+    def manhattan(cell, target):
+        cell_y, cell_x = divmod(cell, cols)
+        target_y, target_x = divmod(target, cols)
+        return abs(cell_y - target_y) + abs(cell_x - target_x)
+
+    forward_costs = [float("inf")] * cell_count
+    backward_costs = [float("inf")] * cell_count
+    forward_costs[start] = backward_costs[goal] = 0
+
+    forward_open = OpenList(cell_count)
+    backward_open = OpenList(cell_count)
+    forward_open.push(manhattan(start, goal), start)
+    backward_open.push(manhattan(goal, start), goal)
+
+    sides = {
+        True: (forward_open, forward_costs, backward_costs, parents, goal),
+        False: (backward_open, backward_costs, forward_costs,
+                backward_parents, start)
+    }
+
+    best_cost, best_edge = float("inf"), None
+    forward = True
+
+    while forward_open and backward_open:
+        if max(forward_open.peek(), backward_open.peek()) >= best_cost:
+            break
+
+        open_list, costs, other_costs, side_parents, target = sides[forward]
+        _, current = open_list.pop()
+        visit_order.append(current)
+
+        for next_cell in neighbours[current]:
+            # Going forward pays for the grid stepped onto, going backward
+            # the step being undone was onto the current grid.
+            step = step_costs[next_cell] if forward else step_costs[current]
+            new_cost = costs[current] + step
+
+            if new_cost < costs[next_cell]:
+                if open_list.push(new_cost + manhattan(next_cell, target),
+                                  next_cell):
+                    costs[next_cell] = new_cost
+                    side_parents[next_cell] = current
+
+            if new_cost + other_costs[next_cell] < best_cost:
+                best_cost = new_cost + other_costs[next_cell]
+                best_edge = ((current, next_cell) if forward else
+                             (next_cell, current))
+
+        forward = not forward
+
+    if best_edge is None:
+        return NO_CELL, parents, visit_order
+
+    goal = join_frontiers(parents, backward_parents, *best_edge)
+
+    return goal, parents, visit_order
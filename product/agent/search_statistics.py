@@ -0,0 +1,155 @@
+import math
+
+from collections import Counter
+
+""" Counters kept by the competitive computers while they search, so the work
+a search did, and how well it pruned, can be measured move by move. They are
+only a handful of integer and float updates per node, cheap enough to leave
+on all the time, and are turned into one report per move for the analysis
+output.
+"""
+
+
+class SearchStatistics:
+    """ Statistics for the searches run to choose one move. Nodes are counted
+    by ply, the number of moves made since the root of the search, so the
+    root is ply 0. Iterative deepening runs several searches for one move,
+    the counts of all of them are added together.
+
+    Attributes:
+        root_depth (int): The depth the running search started from, plies
+            are worked out from it. If no search has been started it is
+            taken from the first node recorded.
+        nodes_per_ply (Counter): The number of nodes expanded at each ply.
+        nodes_per_agent (Counter): The number of nodes expanded for each
+            agent index.
+        cutoffs_per_ply (Counter): The number of nodes alpha-beta stopped
+            searching early at each ply.
+        first_move_cutoffs (int): The cutoffs made by the first move tried,
+            the better the move ordering the closer this is to cutoffs.
+        leaf_evaluations (int): The number of times the evaluation function
+            scored a leaf of the tree.
+        deepest_ply (int): The deepest ply any node or leaf was reached at.
+        evaluation_time (float): Seconds spent in the evaluation function.
+        successor_time (float): Seconds spent generating successors.
+    """
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """ Clear the statistics, ready for the next move. """
+        self.root_depth = None
+        self.nodes_per_ply = Counter()
+        self.nodes_per_agent = Counter()
+        self.cutoffs_per_ply = Counter()
+        self.first_move_cutoffs = 0
+        self.leaf_evaluations = 0
+        self.deepest_ply = 0
+        self.evaluation_time = 0.0
+        self.successor_time = 0.0
+
+    def begin_search(self, depth) -> None:
+        """ Start counting a search from the root at the given depth. """
+        self.root_depth = depth
+
+    def get_ply(self, depth) -> int:
+        """ Turn the depth left to search into the ply of the node. """
+        if self.root_depth is None:
+            self.root_depth = depth
+
+        ply = self.root_depth - depth
+        if ply > self.deepest_ply:
+            self.deepest_ply = ply
+
+        return ply
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.nodes_per_ply.values())
+
+    @property
+    def cutoffs(self) -> int:
+        return sum(self.cutoffs_per_ply.values())
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        """ The share of cutoffs made by the first move tried, or 0 if there
+        were no cutoffs. """
+        cutoffs = self.cutoffs
+        if not cutoffs:
+            return 0.0
+
+        return self.first_move_cutoffs / cutoffs
+
+    @property
+    def effective_branching_factor(self) -> float:
+        """ The branching factor a uniform tree as deep as the search would
+        need to hold every node and leaf visited, N ** (1 / d). The lower it
+        is the more of the tree was pruned or found in the transposition
+        table. """
+        visited = self.nodes + self.leaf_evaluations
+        if not self.deepest_ply or not visited:
+            return 0.0
+
+        return visited ** (1 / self.deepest_ply)
+
+    def record_node(self, depth, agent_index) -> None:
+        self.nodes_per_ply[self.get_ply(depth)] += 1
+        self.nodes_per_agent[agent_index] += 1
+
+    def record_leaf(self, depth, elapsed) -> None:
+        """ Record a leaf scored by the evaluation function in elapsed
+        seconds. """
+        self.get_ply(depth)
+        self.leaf_evaluations += 1
+        self.evaluation_time += elapsed
+
+    def record_cutoff(self, depth, move_number) -> None:
+        """ Record a cutoff made by the move_number-th move tried, counting
+        from 0, at a node with the given depth left to search. """
+        self.cutoffs_per_ply[self.get_ply(depth)] += 1
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+
+    def merge(self, other) -> None:
+        """ Add in the statistics of a search of part of the same tree,
+        counted from the same root depth. """
+        self.nodes_per_ply.update(other.nodes_per_ply)
+        self.nodes_per_agent.update(other.nodes_per_agent)
+        self.cutoffs_per_ply.update(other.cutoffs_per_ply)
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.leaf_evaluations += other.leaf_evaluations
+        self.deepest_ply = max(self.deepest_ply, other.deepest_ply)
+        self.evaluation_time += other.evaluation_time
+        self.successor_time += other.successor_time
+
+    def report(self) -> dict:
+        """ The statistics as a dict that can be written out as JSON. Lists
+        are indexed by ply or agent index. """
+        def per_key(counter) -> list:
+            size = max(counter, default=-1) + 1
+            return [counter[key] for key in range(size)]
+
+        return {
+            "nodes": self.nodes,
+            "nodes_per_ply": per_key(self.nodes_per_ply),
+            "nodes_per_agent": per_key(self.nodes_per_agent),
+            "effective_branching_factor": round(
+                self.effective_branching_factor, 3
+            ),
+            "cutoffs": self.cutoffs,
+            "cutoffs_per_ply": per_key(self.cutoffs_per_ply),
+            "first_move_cutoff_rate": round(self.first_move_cutoff_rate, 3),
+            "leaf_evaluations": self.leaf_evaluations,
+            "evaluation_ms": round(self.evaluation_time * 1000, 3),
+            "successor_ms": round(self.successor_time * 1000, 3)
+        }
+
+
+def json_value(value):
+    """ JSON has no infinity, win and lose values are written as the strings
+    "inf" and "-inf" instead. """
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+
+    return value
@@ -0,0 +1,222 @@
+import random
+
+import constants as C
+
+""" Transposition table for the competitive computers. The game tree reaches
+the same positions through many move orders, the table remembers what a
+position was worth so its subtree is only searched once.
+
+Positions are keyed with Zobrist hashing: every feature of a position (the
+player on a cell, the n-th enemy on a cell, a diamond on a cell, the agent to
+move, ...) has its own random 64 bit number, and a position's key is the XOR
+of the numbers of its features.
+"""
+
+# What the value stored for a position means. Alpha-beta only learns a bound
+# on the value of a position when it prunes.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class ZobristHasher:
+    """ Builds the Zobrist key of a game tree node.
+
+    Attributes:
+        cell_count (int): The number of cells the tables cover.
+        _random (Random): Source of the random numbers, seeded so the keys
+            are the same on every run.
+        _player (list of int): The number for the player on each cell.
+        _enemies (list of list of int): The numbers for the n-th enemy on
+            each cell, a table is added for every new enemy slot.
+        _diamonds (list of int): The number for a diamond on each cell.
+        _features (dict): The numbers of the remaining features, created the
+            first time each one is seen.
+        _diamond_keys (dict): Maps a (diamond cells, mask) pair to its part
+            of the key, the diamonds hardly ever change during a search.
+
+    Args:
+        cell_count (int): The number of cells in the grid graph.
+        seed (int): Seed for the random numbers.
+    """
+    def __init__(self, cell_count, seed=0) -> None:
+        self.cell_count = cell_count
+        self._random = random.Random(seed)
+
+        self._player = self._new_table()
+        self._enemies = []
+        self._diamonds = self._new_table()
+        self._features = {}
+        self._diamond_keys = {}
+
+    def _new_table(self) -> list:
+        return [self._random.getrandbits(64) for _ in range(self.cell_count)]
+
+    def _feature(self, feature) -> int:
+        number = self._features.get(feature)
+
+        if number is None:
+            number = self._features[feature] = self._random.getrandbits(64)
+
+        return number
+
+    def get_key(self, state, diamond_cells, agent_index, player_action,
+                enemy_action) -> int:
+        """ Return the key of a game tree node. The previous actions are part
+        of the key, as they limit the moves the agents are allowed to make.
+
+        Args:
+            state (GameState): The state of the node.
+            diamond_cells (tuple of int): The cells the diamond bits of the
+                state refer to.
+            agent_index (int): The agent to move.
+            player_action (str): The last action of the main agent.
+            enemy_action (str): The last action of an enemy.
+
+        Returns:
+            int: The 64 bit key.
+        """
+        key = self._player[state.player]
+
+        for enemy_id, cell in enumerate(state.enemies):
+            if enemy_id == len(self._enemies):
+                self._enemies.append(self._new_table())
+            key ^= self._enemies[enemy_id][cell]
+
+        diamond_key = self._diamond_keys.get((diamond_cells, state.diamonds))
+
+        if diamond_key is None:
+            diamond_key = 0
+            for bit, cell in enumerate(diamond_cells):
+                if state.diamonds >> bit & 1:
+                    diamond_key ^= self._diamonds[cell]
+            self._diamond_keys[(diamond_cells, state.diamonds)] = diamond_key
+
+        return (
+            key ^ diamond_key ^
+            self._feature(("count", state.diamond_count)) ^
+            self._feature(("agent", agent_index)) ^
+            self._feature(("player", player_action)) ^
+            self._feature(("enemy", enemy_action))
+        )
+
+
+class TranspositionTable:
+    """ Fixed size table of searched game tree nodes. Each key has one slot,
+    picked by the low bits of the key.
+
+    When two nodes want the same slot the new one replaces the old one if the
+    old one was stored by an earlier search, or was not searched as deep.
+    Entries from earlier searches are still used while they stay in the
+    table, so the table carries over between the moves of a game.
+
+    Attributes:
+        size (int): The number of slots, a power of two.
+        generation (int): Counts the searches the table has been used for.
+        probes (int): The number of lookups made in the current search.
+        hits (int): The number of lookups in the current search that gave
+            back a usable value.
+        nodes_saved (int): The nodes the hits of the current search did not
+            have to expand again.
+        _slots (list): The entries, each a (key, depth, value, bound,
+            action, nodes, generation) tuple or None.
+
+    Args:
+        size (int): The number of slots, rounded up to a power of two.
+    """
+    def __init__(self, size=C.TRANSPOSITION_TABLE_SIZE) -> None:
+        self.size = 1 << max(size - 1, 0).bit_length()
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.nodes_saved = 0
+        self._slots = [None] * self.size
+
+    def new_search(self) -> None:
+        """ Start a new search. Entries of earlier searches are kept, but
+        lose their place to any entry of this one. """
+        self.generation += 1
+        self.probes = 0
+        self.hits = 0
+        self.nodes_saved = 0
+
+    def clear(self) -> None:
+        """ Remove every entry and reset the counters. """
+        self._slots = [None] * self.size
+        self.probes = 0
+        self.hits = 0
+        self.nodes_saved = 0
+
+    def lookup(self, key, depth, alpha=None, beta=None):
+        """ Look up a node that is about to be searched to the given depth.
+
+        Args:
+            key (int): The Zobrist key of the node.
+            depth (int): The depth the node will be searched to.
+            alpha (float): The alpha value of the search, None without
+                alpha-beta pruning.
+            beta (float): The beta value of the search.
+
+        Returns:
+            tuple: The (value, action) the search would return, or None if
+                the table cannot answer for this node.
+        """
+        self.probes += 1
+        entry = self._slots[key & (self.size - 1)]
+
+        if entry is None or entry[0] != key or entry[1] < depth:
+            return None
+
+        _, _, value, bound, action, nodes, _ = entry
+
+        # A bound is only an answer if it is already outside the window.
+        if (bound == EXACT or
+                (bound == LOWER_BOUND and beta is not None and
+                 value >= beta) or
+                (bound == UPPER_BOUND and alpha is not None and
+                 value <= alpha)):
+            self.hits += 1
+            self.nodes_saved += nodes
+            return (value, action)
+
+        return None
+
+    def get_action(self, key):
+        """ Return the best action stored for a node whatever depth it was
+        searched to, or None. Used to order moves when the stored value
+        cannot answer the search. """
+        entry = self._slots[key & (self.size - 1)]
+
+        if entry is None or entry[0] != key:
+            return None
+
+        return entry[4]
+
+    def store(self, key, depth, value, action, nodes, alpha=None,
+              beta=None) -> None:
+        """ Store the result of searching a node.
+
+        Args:
+            key (int): The Zobrist key of the node.
+            depth (int): The depth the node was searched to.
+            value (float): The value the search returned.
+            action (str): The action the search returned.
+            nodes (int): The number of nodes the search expanded.
+            alpha (float): The alpha value the node was searched with, None
+                without alpha-beta pruning.
+            beta (float): The beta value the node was searched with.
+        """
+        if alpha is not None and value <= alpha:
+            bound = UPPER_BOUND
+        elif beta is not None and value >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+
+        index = key & (self.size - 1)
+        entry = self._slots[index]
+
+        if (entry is None or entry[6] != self.generation or
+                entry[1] <= depth):
+            self._slots[index] = (key, depth, value, bound, action, nodes,
+                                  self.generation)
@@ -2,8 +2,13 @@ import random
 import time
 
 from agent.computer import Computer
-from collections import deque
-from queue import PriorityQueue
+from agent.search_kernels import (
+    breadth_first_search,
+    bidirectional_breadth_first_search,
+    depth_first_search,
+    best_first_search
+)
+from grid_graph import NO_CELL
 
 
 class RandomComputer(Computer):
@@ -95,38 +100,64 @@ class BFSComputer(Computer):
     def generate_path(self) -> list:
         """ This function uses bfs search to find the path to the diamond. """
 
-        start = self.character.get_player_grid_coordinates()
-        queue = deque([start])
-        visited = []
-        # This will contain the all the potential paths, bfs has looked into
-        search_path_history = {start: None}
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
 
-        while queue:
-            current = queue.popleft()
-            visited.append(current)
-            if self._walkable_maze_matrix[current[0]][current[1]] == 2:
+        goal, search_path_history, visited = breadth_first_search(
+            grid,
+            start,
+            grid.diamond_cells
+        )
 
-                self._visited_grids = visited
+        if goal == NO_CELL:
+            return None
 
-                if self.perform_analysis:
-                    self.tracker.total_nodes_visited += len(visited)
-                    print(f"The number of visited nodes is: {len(visited)}")
+        self._visited_grids = visited
 
-                return self.reconstruct_path(search_path_history, current)
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            print(f"The number of visited nodes is: {len(visited)}")
 
-            # Loop through all 4 directions the computer can take
-            for direction in self._directions:
-                next_grid = (current[0] + direction[0],
-                             current[1] + direction[1])
+        return self.reconstruct_path(search_path_history, goal)
 
-                # Check if the next grid we are looking at is
-                # walkable and not visited.
-                if (self._walkable_maze_matrix[next_grid[0]][next_grid[1]]
-                        != 0 and next_grid not in visited):
-                    queue.append(next_grid)
-                    search_path_history[next_grid] = current
 
-        return None
+class BidirectionalBFSComputer(Computer):
+    """ This class will control the character and do a bfs from the player
+    and from the diamonds at the same time, until the two searches meet. """
+    def __init__(self, character, walkable_maze, **kwargs):
+        super().__init__(
+            character,
+            walkable_maze,
+            **kwargs
+        )
+
+    def generate_path(self) -> list:
+        """ This function uses bidirectional bfs search to find the path to
+        the diamond. """
+
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
+
+        goal, search_path_history, visited = (
+            bidirectional_breadth_first_search(
+                grid,
+                start,
+                grid.diamond_cells
+            )
+        )
+
+        if goal == NO_CELL:
+            return None
+
+        # Holds the grids expanded from both ends, so the highlighter shows
+        # the two searches growing towards each other.
+        self._visited_grids = visited
+
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            print(f"The number of visited nodes is: {len(visited)}")
+
+        return self.reconstruct_path(search_path_history, goal)
 
 
 class DFSComputer(Computer):
@@ -140,36 +171,26 @@ class DFSComputer(Computer):
     def generate_path(self) -> list:
         """ This function uses dfs search to find the path to the diamond. """
 
-        start = self.character.get_player_grid_coordinates()
-        stack = [start]
-        visited = []
-        # We will use this dict to go to generate the final path when
-        # the goal is found.
-        search_path_history = {start: None}
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
 
-        while stack:
-            current = stack.pop()
-            visited.append(current)
+        goal, search_path_history, visited = depth_first_search(
+            grid,
+            start,
+            grid.diamond_cells
+        )
 
-            # When we reach the goal state we can end the algorithm
-            if self._walkable_maze_matrix[current[0]][current[1]] == 2:
-                self._visited_grids = visited
-                if self.perform_analysis:
-                    self.tracker.total_nodes_visited += len(visited)
-                    print(f"The number of visited nodes is: {len(visited)}")
+        # When we reach the goal state we can end the algorithm
+        if goal == NO_CELL:
+            return None
 
-                return self.reconstruct_path(search_path_history, current)
+        self._visited_grids = visited
 
-            # Loop through the neighbours of the current vertex and add to
-            # the stack if its not been visited or out of bounds.
-            for direction in self._directions:
-                next_grid = (current[0] + direction[0],
-                             current[1] + direction[1])
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            print(f"The number of visited nodes is: {len(visited)}")
 
-                if (self._walkable_maze_matrix[next_grid[0]][next_grid[1]]
-                        != 0 and next_grid not in visited):
-                    stack.append(next_grid)
-                    search_path_history[next_grid] = current
+        return self.reconstruct_path(search_path_history, goal)
 
 
 class UCSComputer(Computer):
@@ -186,78 +207,22 @@ class UCSComputer(Computer):
     def generate_path(self) -> list:
         """ This function uses ucs search to find the path to the diamond. """
 
-        start = self.character.get_player_grid_coordinates()
-        fringe = PriorityQueue()
-        # This dict records the lowest cost currently seen for any
-        # vertex encountered.
-        costs = {start: 0}
-        # We will use this dict to go to generate the final path when
-        # the goal is found.
-        came_from = {start: None}
-        # I have coded this algo such that a visited list is not needed but
-        # we still want to use it for showing which grids were visited on
-        # the maze game.
-        visited = []
-
-        # The fringe will record the (cost, position) of the grids
-        fringe.put((0, start))
-
-        while not fringe.empty():
-            cost, current = fringe.get()
-            visited.append(current)
-
-            # When we found the diamond we can stop the algorithm
-            if current == (self.diamond_grid_y, self.diamond_grid_x):
-                self._visited_grids = visited
-                if self.perform_analysis:
-                    self.tracker.total_nodes_visited += len(visited)
-                    print(f"The number of visited nodes is: {len(came_from)}")
-
-                return self.reconstruct_path(came_from, current)
-
-            # Loop through the neighbours of the current vertex and add to
-            # the fringe if its not been recorded in the costs dict, or if it
-            # has been recorded then see if it can grant as a lower path cost.
-            for neighbour in self.get_neighbour(current, cost):
-                new_cost, neighbour_pos = neighbour
-
-                if (neighbour_pos in came_from and
-                   came_from[current] == neighbour_pos):
-                    continue
-
-                if ((neighbour_pos not in costs) or
-                        (new_cost < costs[neighbour_pos])):
-                    costs[neighbour_pos] = new_cost
-                    came_from[neighbour_pos] = current
-                    fringe.put((new_cost, neighbour_pos))
-
-    def get_neighbour(self, current, cost) -> list:
-        """ Get the neighbours and its costs from a grid/vertex. """
-
-        neighbours = []
-
-        # Loop through all the neighbours
-        for direction in self._directions:
-            new_cost = 0
-            neighbour = (current[0] + direction[0], current[1] + direction[1])
-
-            # Get the type of grid the neighbour is
-            neighbour_grid_value = (
-                self._walkable_maze_matrix[neighbour[0]][neighbour[1]]
-            )
+        grid = self._grid
+        start = grid.to_index(self.character.get_player_grid_coordinates())
+
+        goal, came_from, visited = best_first_search(
+            grid,
+            start,
+            grid.to_index((self.diamond_grid_y, self.diamond_grid_x))
+        )
 
-            # If the neighbour is a wall or floor then skip
-            if (neighbour_grid_value == 0):
-                continue
+        if goal == NO_CELL:
+            return None
 
-            # Check if the neighbour is a empty space or a ladder
-            if (neighbour_grid_value == 1 or neighbour_grid_value == 3):
-                new_cost = cost + 1
-            # Check if the neighbour is a slow tile
-            elif (neighbour_grid_value == 4):
-                new_cost = cost + 3
+        self._visited_grids = visited
 
-            neighbours.append((new_cost, neighbour))
+        if self.perform_analysis:
+            self.tracker.total_nodes_visited += len(visited)
+            print(f"The number of visited nodes is: {len(visited)}")
 
-        # sort neighbour from low to high using the cost value
-        return sorted(neighbours, key=lambda x: x[0])
+        return self.reconstruct_path(came_from, goal)
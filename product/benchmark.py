@@ -0,0 +1,590 @@
+import os
+import argparse
+import json
+import pickle
+import random
+import time
+
+from queue import PriorityQueue
+
+# The benchmarks never open a window, so use the dummy video driver before
+# pygame gets imported by the world.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+import constants as C  # noqa: E402
+
+from world import World  # noqa: E402
+from grid_graph import NO_CELL  # noqa: E402
+from platform_graph import PlatformGraph  # noqa: E402
+from agent.competitive_computer import (  # noqa: E402
+    AlphaBetaComputer,
+    ExpectimaxComputer,
+    MinimaxComputer
+)
+from agent.mcts_computer import MCTSComputer  # noqa: E402
+from agent.search_kernels import (  # noqa: E402
+    best_first_search,
+    bidirectional_a_star_search,
+    bidirectional_breadth_first_search,
+    breadth_first_search,
+    jump_point_search
+)
+
+""" Micro benchmarks for the search code. These are run by hand, for
+example:
+
+    python benchmark.py search --maze maze/maze_12 --repeat 20
+    python benchmark.py expansions --maze maze/maze_12
+    python benchmark.py competitive --maze maze/maze_10 --depth 12
+    python benchmark.py mcts --maze maze/maze_10 --iterations 500
+    python benchmark.py expectimax --maze maze/maze_10 --depth 8
+    python benchmark.py enemy-search --maze maze/maze_10 --enemies 3 6 10
+"""
+
+
+def load_world(maze_path) -> World:
+    """ Load a maze from the maze directory into a World, without showing a
+    window. """
+    pygame.init()
+    pygame.display.set_mode((1, 1), 0, 32)
+
+    with open(maze_path, 'rb') as file:
+        return World(pickle.load(file))
+
+
+def priority_queue_search(grid, start, goal) -> int:
+    """ The uniform cost search loop from before the heap based open list,
+    kept here as the baseline. It uses queue.PriorityQueue, sorts a new
+    neighbour list for every expanded grid and never skips stale entries.
+
+    Returns:
+        int: The number of grids expanded.
+    """
+    fringe = PriorityQueue()
+    costs = {start: 0}
+    came_from = {start: NO_CELL}
+    expanded = 0
+
+    fringe.put((0, start))
+
+    while not fringe.empty():
+        cost, current = fringe.get()
+        expanded += 1
+
+        if current == goal:
+            return expanded
+
+        neighbours = []
+        for neighbour in grid.neighbours[current]:
+            if grid.diamond_cells[neighbour]:
+                new_cost = 0
+            else:
+                new_cost = cost + grid.step_cost_list[neighbour]
+            neighbours.append((new_cost, neighbour))
+
+        for new_cost, neighbour in sorted(neighbours, key=lambda x: x[0]):
+            if came_from[current] == neighbour:
+                continue
+
+            if neighbour not in costs or new_cost < costs[neighbour]:
+                costs[neighbour] = new_cost
+                came_from[neighbour] = current
+                fringe.put((new_cost, neighbour))
+
+    return expanded
+
+
+def heap_search(grid, start, goal) -> int:
+    """ Uniform cost search using the shared heap based kernel.
+
+    Returns:
+        int: The number of grids expanded.
+    """
+    return len(best_first_search(grid, start, goal)[2])
+
+
+def benchmark_search(args) -> None:
+    """ Search from every walkable grid in the maze to the diamond, and
+    report the number of grids expanded per second for the old and new open
+    lists. """
+    world = load_world(args.maze)
+    grid = world.get_grid_graph()
+
+    goal = grid.diamond_cells.index(1)
+    starts = [
+        cell for cell in range(grid.get_cell_count())
+        if grid.is_walkable(cell) and cell != goal
+    ]
+
+    print(f"Maze: {args.maze}, {len(starts)} start grids, "
+          f"{args.repeat} repeats")
+
+    for name, search in (("PriorityQueue", priority_queue_search),
+                         ("heapq OpenList", heap_search)):
+        expanded = 0
+        start_time = time.perf_counter()
+
+        for _ in range(args.repeat):
+            for start in starts:
+                expanded += search(grid, start, goal)
+
+        elapsed = time.perf_counter() - start_time
+
+        print(f"{name:>16}: {expanded} expansions in {elapsed:.3f}s, "
+              f"{expanded / elapsed:,.0f} expansions/sec")
+
+
+def benchmark_expansions(args) -> None:
+    """ Search from every walkable grid in the maze to the diamond, and
+    report the total number of grids each algorithm expanded. """
+    world = load_world(args.maze)
+    grid = world.get_grid_graph()
+
+    goal = grid.diamond_cells.index(1)
+    goal_y, goal_x = grid.to_coord(goal)
+    starts = [
+        cell for cell in range(grid.get_cell_count())
+        if grid.is_walkable(cell) and cell != goal
+    ]
+
+    def manhattan(cell):
+        """ The heuristic AStarComputer uses. """
+        cell_y, cell_x = grid.to_coord(cell)
+        vertical_diff = abs(cell_y - goal_y)
+        return vertical_diff * 5 + abs(cell_x - goal_x)
+
+    platform_graph = PlatformGraph.for_grid(grid)
+
+    # Each search returns the grids it expanded.
+    searches = (
+        ("BFS", lambda start: breadth_first_search(
+            grid, start, grid.diamond_cells)[2]),
+        ("Bidirectional BFS", lambda start: (
+            bidirectional_breadth_first_search(
+                grid, start, grid.diamond_cells)[2])),
+        ("A*", lambda start: best_first_search(
+            grid, start, goal, heuristic=manhattan)[2]),
+        ("Bidirectional A*", lambda start: bidirectional_a_star_search(
+            grid, start, goal)[2]),
+        ("Jump point", lambda start: jump_point_search(
+            grid, start, goal)[2]),
+        ("Platform graph", lambda start: platform_graph.find_path(
+            start, goal)[1])
+    )
+
+    print(f"Maze: {args.maze}, {len(starts)} start grids")
+
+    for name, search in searches:
+        expanded = sum(len(search(start)) for start in starts)
+        print(f"{name:>17}: {expanded} grids expanded, "
+              f"{expanded / len(starts):.1f} per search")
+
+
+def benchmark_competitive(args) -> None:
+    """ Compare the game tree searched by minimax, by alpha-beta trying
+    moves in the order the maze gives them and by alpha-beta with move
+    ordering. Each computer plays the same short game, with the enemies
+    making random moves, so the history heuristic carries over between
+    moves the way it does in a real game. The transposition table is off so
+    only the pruning is measured.
+    """
+    world = load_world(args.maze)
+    matrix = world.get_walkable_maze_matrix()
+
+    walkable = [
+        (y, x) for y, row in enumerate(matrix) for x, grid in enumerate(row)
+        if grid != C.NON_WALKABLE_GRID
+    ]
+
+    searches = (
+        ("minimax", MinimaxComputer, False),
+        ("alpha-beta", AlphaBetaComputer, False),
+        ("ordered alpha-beta", AlphaBetaComputer, True)
+    )
+
+    print(f"Maze: {args.maze}, depth {args.depth}, {args.enemies} enemies, "
+          f"{args.moves} moves")
+
+    for name, computer_type, use_move_ordering in searches:
+        # Agent 0 is the main agent.
+        computer = computer_type(None, matrix, agent_type=0,
+                                 num_characters=args.enemies + 1)
+        computer.use_transposition_table = False
+        computer.use_move_ordering = use_move_ordering
+
+        rng = random.Random(args.seed)
+        cells = rng.sample(walkable, args.enemies + 3)
+        state = {
+            "main_agent": cells[0],
+            "enemies": cells[1:args.enemies + 1],
+            "diamond_coords": cells[args.enemies + 1:],
+            "diamond_count": 0
+        }
+
+        nodes = cutoffs = first_move_cutoffs = 0
+        start_time = time.perf_counter()
+
+        for _ in range(args.moves):
+            computer.nodes_expanded = 0
+            computer.search_statistics.reset()
+
+            move_start = time.perf_counter()
+            value, action = computer.search_to_depth(
+                computer.to_game_state(state), args.depth
+            )
+
+            if args.report:
+                print(json.dumps(computer.get_search_report(
+                    value, action, time.perf_counter() - move_start
+                )))
+
+            statistics = computer.search_statistics
+            nodes += computer.nodes_expanded
+            cutoffs += statistics.cutoffs
+            first_move_cutoffs += statistics.first_move_cutoffs
+
+            if action is None:
+                break
+
+            state = computer.generate_successor(state, 0, action)
+            for enemy_id, enemy in enumerate(state["enemies"]):
+                actions = computer.legal_movements(enemy, None)
+                if actions:
+                    state = computer.generate_successor(
+                        state, enemy_id + 1, rng.choice(actions)
+                    )
+
+            if state["win"] or state["lose"]:
+                break
+
+        elapsed = time.perf_counter() - start_time
+        rate = first_move_cutoffs / cutoffs if cutoffs else 0.0
+
+        print(f"{name:>18}: {nodes} nodes, {elapsed:.2f}s, {cutoffs} "
+              f"cutoffs, {rate:.0%} on the first move")
+
+
+def benchmark_mcts(args) -> None:
+    """ Compare Monte Carlo tree search rebuilding its tree for every move
+    with it carrying the subtree of the moves played over to the next one.
+    Each computer plays the same short game against enemies that step
+    towards the main agent, which are the replies the tree explores most.
+    """
+    world = load_world(args.maze)
+    matrix = world.get_walkable_maze_matrix()
+
+    walkable = [
+        (y, x) for y, row in enumerate(matrix) for x, grid in enumerate(row)
+        if grid != C.NON_WALKABLE_GRID
+    ]
+
+    print(f"Maze: {args.maze}, {args.iterations} iterations, "
+          f"{args.enemies} enemies, {args.moves} moves")
+
+    for name, use_tree_reuse in (("rebuilt", False), ("reused", True)):
+        # Agent 0 is the main agent.
+        computer = MCTSComputer(None, matrix, agent_type=0,
+                                num_characters=args.enemies + 1,
+                                mcts_iterations=args.iterations,
+                                seed=args.seed)
+        computer.use_tree_reuse = use_tree_reuse
+        computer.stop_thread = False
+
+        rng = random.Random(args.seed)
+        cells = rng.sample(walkable, args.enemies + 3)
+        state = {
+            "main_agent": cells[0],
+            "enemies": cells[1:args.enemies + 1],
+            "diamond_coords": cells[args.enemies + 1:],
+            "diamond_count": 0
+        }
+
+        iterations = reused_moves = moves = 0
+        search_time = 0.0
+
+        for _ in range(args.moves):
+            move_start = time.perf_counter()
+            _, action = computer.choose_action(
+                computer.to_game_state(state)
+            )
+            search_time += time.perf_counter() - move_start
+
+            iterations += computer.iterations
+            reused_moves += computer.reused_visits > 0
+            moves += 1
+
+            if action is None:
+                break
+
+            state = computer.generate_successor(state, 0, action)
+            for enemy_id, enemy in enumerate(state["enemies"]):
+                actions = computer.legal_movements(enemy, None)
+                if actions:
+                    action = min(actions, key=lambda action: (
+                        computer.generate_bfs_dist(
+                            computer.simulate_movement(enemy, action),
+                            state["main_agent"]
+                        )
+                    ))
+                    state = computer.generate_successor(
+                        state, enemy_id + 1, action
+                    )
+
+            if state["win"] or state["lose"]:
+                break
+
+        print(f"{name:>8}: {search_time / moves * 1000:.1f}ms per move, "
+              f"{iterations} iterations, tree reused on {reused_moves} of "
+              f"{moves} moves")
+
+
+def benchmark_expectimax(args) -> None:
+    """ Compare exact expectimax with Star1 pruning and with sampling the
+    enemy moves, on the same random positions. Decisions are scored with
+    the exact value of every root move: a search agrees when it picks the
+    move exact expectimax picks, and its regret is how much lower the exact
+    value of its move is than the best. The transposition table is off so
+    only the chance nodes are measured.
+    """
+    world = load_world(args.maze)
+    matrix = world.get_walkable_maze_matrix()
+
+    walkable = [
+        (y, x) for y, row in enumerate(matrix) for x, grid in enumerate(row)
+        if grid != C.NON_WALKABLE_GRID
+    ]
+
+    searches = (
+        ("exact", False, None),
+        ("star1", True, None),
+        (f"{args.samples} samples", True, args.samples)
+    )
+
+    computers = []
+    for name, use_chance_pruning, chance_samples in searches:
+        # Agent 0 is the main agent.
+        computer = ExpectimaxComputer(None, matrix, agent_type=0,
+                                      num_characters=args.enemies + 1,
+                                      chance_samples=chance_samples,
+                                      seed=args.seed)
+        computer.use_transposition_table = False
+        computer.use_chance_pruning = use_chance_pruning
+        computer.stop_thread = False
+        computers.append(computer)
+
+    exact = computers[0]
+
+    print(f"Maze: {args.maze}, depth {args.depth}, {args.enemies} enemies, "
+          f"{args.positions} positions")
+
+    rng = random.Random(args.seed)
+    totals = [[0, 0.0, 0, 0.0] for _ in searches]
+
+    for _ in range(args.positions):
+        cells = rng.sample(walkable, args.enemies + args.diamonds + 1)
+        state = {
+            "main_agent": cells[0],
+            "enemies": cells[1:args.enemies + 1],
+            "diamond_coords": cells[args.enemies + 1:],
+            "diamond_count": 0
+        }
+
+        exact.to_game_state(state)
+        values = {
+            action: exact.search_root_move(state, args.depth, 0, action,
+                                           None)[0]
+            for action in exact.legal_movements(state["main_agent"], None)
+        }
+        best_value = max(values.values(), default=0)
+
+        for total, computer in zip(totals, computers):
+            computer.nodes_expanded = 0
+
+            start_time = time.perf_counter()
+            _, action = computer.search_to_depth(
+                computer.to_game_state(state), args.depth
+            )
+
+            total[0] += computer.nodes_expanded
+            total[1] += time.perf_counter() - start_time
+            total[2] += values.get(action, best_value) == best_value
+            total[3] += best_value - values.get(action, best_value)
+
+    for search, total in zip(searches, totals):
+        name, nodes, elapsed, agreed, regret = search[0], *total
+        print(f"{name:>10}: {nodes} nodes, {elapsed:.2f}s, best move on "
+              f"{agreed}/{args.positions} positions, mean regret "
+              f"{regret / args.positions:.3f}")
+
+
+def benchmark_enemy_search(args) -> None:
+    """ Compare alpha-beta searching against every enemy in turn (paranoid)
+    with best-reply search, on the same short games against enemies making
+    random moves. Each search first looks the same number of main agent
+    moves ahead, which paranoid search takes a round of every enemy's moves
+    per main agent move for and best-reply search a single enemy move. Then
+    each search gets the same time budget per move, and the main agent moves
+    it saw ahead in that time are counted. The transposition table is off so
+    only the tree searched is measured.
+    """
+    world = load_world(args.maze)
+    matrix = world.get_walkable_maze_matrix()
+
+    walkable = [
+        (y, x) for y, row in enumerate(matrix) for x, grid in enumerate(row)
+        if grid != C.NON_WALKABLE_GRID
+    ]
+
+    print(f"Maze: {args.maze}, {args.rounds} main agent moves ahead or "
+          f"{args.move_time_ms}ms a move, {args.moves} moves")
+
+    for enemy_count in args.enemies:
+        print(f"{enemy_count} enemies")
+
+        for enemy_search in C.ENEMY_SEARCHES:
+            # Plies from one main agent move to its next.
+            round_plies = 2 if enemy_search == "best-reply" else (
+                enemy_count + 1
+            )
+
+            totals = []
+            for move_time_ms in (None, args.move_time_ms):
+                # Agent 0 is the main agent.
+                computer = AlphaBetaComputer(None, matrix, agent_type=0,
+                                             num_characters=enemy_count + 1,
+                                             enemy_search=enemy_search,
+                                             move_time_ms=move_time_ms,
+                                             depth_limit=(args.rounds *
+                                                          round_plies))
+                computer.use_transposition_table = False
+                computer.stop_thread = False
+
+                rng = random.Random(args.seed)
+                cells = rng.sample(walkable, enemy_count + 1)
+                state = {
+                    "main_agent": cells[0],
+                    "enemies": cells[1:],
+                    "diamond_coords": world.get_diamond_coords(),
+                    "diamond_count": 0
+                }
+
+                nodes = moves = moves_seen = 0
+                search_time = 0.0
+
+                for _ in range(args.moves):
+                    computer.nodes_expanded = 0
+
+                    move_start = time.perf_counter()
+                    _, action = computer.choose_action(
+                        computer.to_game_state(state)
+                    )
+                    search_time += time.perf_counter() - move_start
+
+                    nodes += computer.nodes_expanded
+                    moves_seen += -(-computer.search_depth // round_plies)
+                    moves += 1
+
+                    if action is None:
+                        break
+
+                    state = computer.generate_successor(state, 0, action)
+                    for enemy_id, enemy in enumerate(state["enemies"]):
+                        actions = computer.legal_movements(enemy, None)
+                        if actions:
+                            state = computer.generate_successor(
+                                state, enemy_id + 1, rng.choice(actions)
+                            )
+
+                    if state["win"] or state["lose"]:
+                        break
+
+                totals.append((nodes / moves, search_time / moves * 1000,
+                               moves_seen / moves))
+
+            (nodes, elapsed, _), (_, _, moves_seen) = totals
+            print(f"{enemy_search:>12}: {nodes:.0f} nodes, {elapsed:.1f}ms "
+                  f"a move, {moves_seen:.1f} main agent moves seen in "
+                  f"{args.move_time_ms}ms")
+
+
+def process_args():
+    """ Parse the benchmark the user asked for. """
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Compare open list implementations for uniform cost search."
+    )
+    search_parser.add_argument("--maze", default="maze/maze_12")
+    search_parser.add_argument("--repeat", type=int, default=20)
+    search_parser.set_defaults(run=benchmark_search)
+
+    expansions_parser = subparsers.add_parser(
+        "expansions",
+        help="Compare the grids expanded by each search."
+    )
+    expansions_parser.add_argument("--maze", default="maze/maze_12")
+    expansions_parser.set_defaults(run=benchmark_expansions)
+
+    competitive_parser = subparsers.add_parser(
+        "competitive",
+        help="Compare the nodes searched by minimax and alpha-beta."
+    )
+    competitive_parser.add_argument("--maze", default="maze/maze_10")
+    competitive_parser.add_argument("--depth", type=int, default=12)
+    competitive_parser.add_argument("--enemies", type=int, default=3)
+    competitive_parser.add_argument("--moves", type=int, default=20)
+    competitive_parser.add_argument("--seed", type=int, default=0)
+    competitive_parser.add_argument(
+        "--report",
+        action="store_true",
+        help="Print the search report of every move as a JSON line."
+    )
+    competitive_parser.set_defaults(run=benchmark_competitive)
+
+    mcts_parser = subparsers.add_parser(
+        "mcts",
+        help="Compare rebuilding and reusing the Monte Carlo search tree."
+    )
+    mcts_parser.add_argument("--maze", default="maze/maze_10")
+    mcts_parser.add_argument("--iterations", type=int, default=500)
+    mcts_parser.add_argument("--enemies", type=int, default=3)
+    mcts_parser.add_argument("--moves", type=int, default=30)
+    mcts_parser.add_argument("--seed", type=int, default=0)
+    mcts_parser.set_defaults(run=benchmark_mcts)
+
+    expectimax_parser = subparsers.add_parser(
+        "expectimax",
+        help="Compare exact, pruned and sampled expectimax."
+    )
+    expectimax_parser.add_argument("--maze", default="maze/maze_10")
+    expectimax_parser.add_argument("--depth", type=int, default=8)
+    expectimax_parser.add_argument("--enemies", type=int, default=3)
+    expectimax_parser.add_argument("--diamonds", type=int, default=3)
+    expectimax_parser.add_argument("--positions", type=int, default=20)
+    expectimax_parser.add_argument("--samples", type=int, default=4)
+    expectimax_parser.add_argument("--seed", type=int, default=0)
+    expectimax_parser.set_defaults(run=benchmark_expectimax)
+
+    enemy_search_parser = subparsers.add_parser(
+        "enemy-search",
+        help="Compare paranoid and best-reply search against many enemies."
+    )
+    enemy_search_parser.add_argument("--maze", default="maze/maze_10")
+    enemy_search_parser.add_argument("--enemies", type=int, nargs="+",
+                                     default=[3, 6, 10])
+    enemy_search_parser.add_argument("--rounds", type=int, default=2)
+    enemy_search_parser.add_argument("--move-time-ms", type=int, default=50)
+    enemy_search_parser.add_argument("--moves", type=int, default=10)
+    enemy_search_parser.add_argument("--seed", type=int, default=0)
+    enemy_search_parser.set_defaults(run=benchmark_enemy_search)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = process_args()
+    args.run(args)
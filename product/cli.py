@@ -21,6 +21,12 @@ def explain_algo(algo: str) -> None:
             "at the present depth prior to moving on to nodes at the next "
             "depth level."
         )
+    elif algo == "bibfs":
+        print(
+            "EXPLANATION: Bidirectional BFS runs one BFS from the player and "
+            "one from the diamond, and stops once the two searches meet in "
+            "the middle."
+        )
     elif algo == "ucs":
         print(
             "EXPLANATION: Uniform Cost Search (UCS) is a search algorithm "
@@ -31,11 +37,34 @@ def explain_algo(algo: str) -> None:
             "EXPLANATION: A* is a graph traversal and pathfinding algorithm "
             "that is efficient and finds the shortest path."
         )
+    elif algo == "biastar":
+        print(
+            "EXPLANATION: Bidirectional A* searches from the player and "
+            "from the diamond in turn, and stops once no path can be "
+            "cheaper than the best place the two searches have met."
+        )
     elif algo == "greedy":
         print(
             "EXPLANATION: Greedy Best-First Search algorithm selects the "
             "path that appears to be the best at the moment."
         )
+    elif algo == "dstar":
+        print(
+            "EXPLANATION: D* Lite is an incremental version of A* that "
+            "reuses its previous search, and only repairs the parts that "
+            "change as the agent moves or the maze changes."
+        )
+    elif algo == "jps":
+        print(
+            "EXPLANATION: Jump Point Search is A* which jumps straight "
+            "along corridors, only stopping where the path can branch."
+        )
+    elif algo == "platform":
+        print(
+            "EXPLANATION: Platform graph search shrinks every corridor and "
+            "ladder into a single weighted edge, then runs A* over the "
+            "ladder ends, junctions and diamonds that are left."
+        )
     elif algo == "minimax":
         print(
             "EXPLANATION: Minimax algorithm is used in decision-making and "
@@ -53,6 +82,13 @@ def explain_algo(algo: str) -> None:
             "EXPLANATION: Expectimax is a decision-making algorithm used in "
             "game theory that considers the expected utility of actions."
         )
+    elif algo == "mcts":
+        print(
+            "EXPLANATION: Monte Carlo tree search grows a game tree towards "
+            "the moves that have worked best so far, scoring each new move "
+            "with the evaluation function. Random rollouts are only played "
+            "on from new moves when MCTS_ROLLOUT_DEPTH is above 0."
+        )
 
 
 def process_args() -> dict:
@@ -96,6 +132,68 @@ def process_args() -> dict:
              "pathfinding (only applicable to A*)."
     )
 
+    parser.add_argument(
+        "--multi-target",
+        action="store_true",
+        help="Search towards every diamond at once and go to the one that is "
+             "cheapest to reach (only applicable to greedy)."
+    )
+
+    parser.add_argument(
+        "--move-time-ms",
+        type=int,
+        default=None,
+        help="Give the competitive algorithms this many milliseconds to "
+             "choose each move, searching deeper until the time runs out "
+             f"(only applicable to {C.COMPETITIVE_ALGOS})."
+    )
+
+    parser.add_argument(
+        "--mcts-iterations",
+        type=int,
+        default=None,
+        help="The number of iterations Monte Carlo tree search runs for "
+             "each move, when it is not given --move-time-ms (only "
+             "applicable to mcts)."
+    )
+
+    parser.add_argument(
+        "--chance-samples",
+        type=int,
+        default=None,
+        help="Average expectimax chance nodes over this many randomly drawn "
+             "joint moves of the random enemies, instead of over every move "
+             "(only applicable to expectimax)."
+    )
+
+    parser.add_argument(
+        "--plan-horizon",
+        type=int,
+        default=None,
+        help="Make up to this many moves from the principal variation of "
+             "one search while the enemies move as expected, 1 searches "
+             f"for every move (only applicable to {C.PLAN_ALGOS})."
+    )
+
+    parser.add_argument(
+        "--enemy-search",
+        choices=C.ENEMY_SEARCHES,
+        default=None,
+        help="How the main agent searches against the enemies: paranoid "
+             "has every enemy move in turn, best-reply only the one enemy "
+             "move worst for the main agent, which sees further with many "
+             f"enemies (only applicable to {C.BEST_REPLY_ALGOS})."
+    )
+
+    parser.add_argument(
+        "--search-workers",
+        type=int,
+        default=None,
+        help="Search the root moves of the competitive algorithms on this "
+             "many worker processes "
+             f"(only applicable to {C.ROOT_PARALLEL_ALGOS})."
+    )
+
     # define the algo flag
     parser.add_argument(
         "--highlight",
@@ -182,6 +280,52 @@ def process_args() -> dict:
         parser.error("--weighted is only applicable when using the "
                      "A* algorithm.")
 
+    if args.multi_target and args.algo != "greedy":
+        parser.error("--multi-target is only applicable when using the "
+                     "greedy algorithm.")
+
+    if (args.move_time_ms is not None and
+       args.algo not in C.COMPETITIVE_ALGOS):
+        parser.error("--move-time-ms is only applicable when using the "
+                     f"following algos: {C.COMPETITIVE_ALGOS}")
+
+    if args.move_time_ms is not None and args.move_time_ms <= 0:
+        parser.error("--move-time-ms must be greater than zero.")
+
+    if args.mcts_iterations is not None and args.algo != "mcts":
+        parser.error("--mcts-iterations is only applicable when using the "
+                     "mcts algorithm.")
+
+    if args.mcts_iterations is not None and args.mcts_iterations <= 0:
+        parser.error("--mcts-iterations must be greater than zero.")
+
+    if args.chance_samples is not None and args.algo != "expectimax":
+        parser.error("--chance-samples is only applicable when using the "
+                     "expectimax algorithm.")
+
+    if args.chance_samples is not None and args.chance_samples <= 0:
+        parser.error("--chance-samples must be greater than zero.")
+
+    if args.plan_horizon is not None and args.algo not in C.PLAN_ALGOS:
+        parser.error("--plan-horizon is only applicable when using the "
+                     f"following algos: {C.PLAN_ALGOS}")
+
+    if args.plan_horizon is not None and args.plan_horizon <= 0:
+        parser.error("--plan-horizon must be greater than zero.")
+
+    if (args.enemy_search is not None and
+       args.algo not in C.BEST_REPLY_ALGOS):
+        parser.error("--enemy-search is only applicable when using the "
+                     f"following algos: {C.BEST_REPLY_ALGOS}")
+
+    if (args.search_workers is not None and
+       args.algo not in C.ROOT_PARALLEL_ALGOS):
+        parser.error("--search-workers is only applicable when using the "
+                     f"following algos: {C.ROOT_PARALLEL_ALGOS}")
+
+    if args.search_workers is not None and args.search_workers <= 0:
+        parser.error("--search-workers must be greater than zero.")
+
     if args.algo not in C.HIGHLIGHT_ALGOS and args.highlight:
         parser.error(C.ERROR_HIGHLIGHT_COMPATIBILITY)
 
@@ -212,6 +356,13 @@ def process_args() -> dict:
         "algo": args.algo,
         "enable_highlighter": args.highlight,
         "weighted": args.weighted,
+        "multi_target": args.multi_target,
+        "move_time_ms": args.move_time_ms,
+        "search_workers": args.search_workers,
+        "mcts_iterations": args.mcts_iterations,
+        "plan_horizon": args.plan_horizon,
+        "chance_samples": args.chance_samples,
+        "enemy_search": args.enemy_search,
         "filled": filled,
         "enemy_count": args.enemy_count,
         "is_comp": is_competitive,
@@ -29,8 +29,54 @@ GAME_OVER = (
 #                               GAME CONSTANTS                              #
 ##############################################################################
 
-# Max enemies allowed in the game
-MAX_ENEMIES = 3
+# Max enemies allowed in the game. The competitive enemies are searched for
+# together, so adding one only adds a ply to the one search.
+MAX_ENEMIES = 10
+
+# How long, in seconds, an enemy that cannot move waits before asking the
+# enemy planner for a move again.
+STUCK_ENEMY_WAIT = 0.1
+
+# Where the main character starts, in pixels.
+PLAYER_START_POSITION = (350, 300)
+
+# The depth the competitive computers search to when they are not given a
+# time budget per move.
+COMPETITIVE_SEARCH_DEPTH = 3
+
+# The most moves a competitive computer makes from the principal variation
+# of one search, while the other agents keep to it, before searching again.
+# 1 searches for every move.
+PLAN_HORIZON = 4
+
+# How much worse than any other score expectimax scores a loss, and how
+# much better a win. Its evaluation has to stay finite for chance nodes to
+# be pruned.
+EXPECTIMAX_OUTCOME_MARGIN = 10
+
+# The deepest an iterative deepening search will go, however much of its
+# time budget is left.
+MAX_COMPETITIVE_SEARCH_DEPTH = 64
+
+# The number of iterations Monte Carlo tree search runs for each move when
+# it is not given a time budget.
+MCTS_ITERATIONS = 500
+
+# The weight UCT gives to trying moves that have not been visited much.
+MCTS_EXPLORATION = 1.4
+
+# The number of moves played on from a new tree node before it is scored.
+# The evaluation function already looks ahead along maze distances, and
+# random moves on top of it only add noise, so by default new nodes are
+# scored straight away.
+MCTS_ROLLOUT_DEPTH = 0
+
+# The chance an enemy moves at random in a rollout, instead of towards the
+# main agent.
+MCTS_ROLLOUT_RANDOMNESS = 0.2
+
+# Scores around this size are squashed into rewards away from 0 and 1.
+MCTS_SCORE_SCALE = 10
 
 # Max time path finding algos in test can run for
 MAX_PATH_TEST_TIME = 20
@@ -82,6 +128,19 @@ large_regeneration = [
     (13, 11)
 ]
 
+# The number of generated paths kept in the path cache shared between every
+# computer.
+PATH_CACHE_SIZE = 256
+
+# The number of maze layouts the grid graphs remember the revision of. A
+# layout seen again after it has been dropped gets a new revision, which
+# only costs the paths cached for it.
+LAYOUT_REVISIONS_SIZE = 256
+
+# The number of slots in the transposition table of each competitive
+# computer, rounded up to a power of two.
+TRANSPOSITION_TABLE_SIZE = 1 << 16
+
 
 ##############################################################################
 #                                 FILE PATHS                                 #
@@ -121,12 +180,18 @@ ALGOS = [
     "random",
     "dfs",
     "bfs",
+    "bibfs",
     "ucs",
     "astar",
+    "biastar",
     "greedy",
+    "dstar",
+    "jps",
+    "platform",
     "minimax",
     "alphabeta",
     "expectimax",
+    "mcts",
 ]
 
 # Algorithms which are intended to work with at least one enemy agent
@@ -135,19 +200,54 @@ COMPETITIVE_ALGOS = [
     "minimax",
     "alphabeta",
     "expectimax",
+    "mcts",
+]
+
+# Competitive algorithms which can search their root moves on several
+# worker processes.
+ROOT_PARALLEL_ALGOS = [
+    "minimax",
+    "expectimax",
+]
+
+# The ways the main agent can search against several enemies. paranoid
+# searches every enemy moving in turn, best-reply only the one enemy move
+# worst for the main agent between two of its own moves.
+ENEMY_SEARCHES = [
+    "paranoid",
+    "best-reply",
+]
+
+# Competitive algorithms which can search with best-reply.
+BEST_REPLY_ALGOS = [
+    "minimax",
+    "alphabeta",
+]
+
+# Competitive algorithms which follow the principal variation of a search
+# for several moves.
+PLAN_ALGOS = [
+    "minimax",
+    "alphabeta",
 ]
 
 HIGHLIGHT_ALGOS = [
     "dfs",
     "bfs",
+    "bibfs",
     "ucs",
     "astar",
-    "greedy"
+    "biastar",
+    "greedy",
+    "dstar",
+    "jps",
+    "platform"
 ]
 
 # Algorithms that are compatible with diamond filled mazes.
 FILLED_COMPETITIVE_ALGOS = [
-    "greedy", "random", "astar", "minimax", "alphabeta", "expectimax"
+    "greedy", "random", "astar", "minimax", "alphabeta", "expectimax",
+    "mcts"
 ]
 
 ERROR_COMP_NON_FILLED = (
@@ -0,0 +1,476 @@
+import hashlib
+import weakref
+import itertools
+import numpy as np
+
+from collections import OrderedDict, deque
+
+import constants as C
+
+# Sentinel used when a cell index does not exist, for example the parent of
+# the start cell in a search.
+NO_CELL = -1
+
+# Stored in the distance table for pairs of cells that cannot reach each
+# other. This is the largest value a uint16 can hold.
+UNREACHABLE = np.iinfo(np.uint16).max
+
+# The cost of stepping onto each grid type, walls are never entered so they
+# are left as zero.
+STEP_COSTS = {
+    C.WALKABLE_GRID: 1,
+    C.DIAMOND_GRID: 1,
+    C.LADDER_GRID: 1,
+    C.SLOW_GRID: 3
+}
+
+# The moves of the competitive computers, numbered in the order they have
+# always been listed in. A move mask holds the bit 1 << number of every
+# legal move.
+ACTIONS = ("LEFT", "RIGHT", "DOWN", "UP")
+ACTION_BITS = {action: 1 << number for number, action in enumerate(ACTIONS)}
+ALL_ACTIONS = (1 << len(ACTIONS)) - 1
+
+# The (grid_y, grid_x) step each move makes.
+ACTION_DIRECTIONS = {
+    "LEFT": (0, -1),
+    "RIGHT": (0, 1),
+    "DOWN": (1, 0),
+    "UP": (-1, 0)
+}
+
+# The moves allowed after each move, the search never walks straight back
+# the way it came. Moving left is always allowed.
+FOLLOW_MASKS = {
+    "LEFT": ALL_ACTIONS & ~ACTION_BITS["RIGHT"],
+    "DOWN": ALL_ACTIONS & ~ACTION_BITS["UP"],
+    "UP": ALL_ACTIONS & ~ACTION_BITS["DOWN"]
+}
+
+# The moves in every move mask, in ACTIONS order.
+MASK_ACTIONS = tuple(
+    tuple(action for action in ACTIONS if mask & ACTION_BITS[action])
+    for mask in range(ALL_ACTIONS + 1)
+)
+
+
+class GridGraph:
+    """ This class compiles the walkable maze matrix into flat arrays, so the
+    search algorithms can work with integer cell indices instead of tuples
+    and nested list lookups.
+
+    A cell (grid_y, grid_x) is stored at index grid_y * cols + grid_x.
+
+    Attributes:
+        _walkable_maze_matrix (list of list): The matrix the graph was
+            compiled from.
+        rows (int): The number of rows in the maze.
+        cols (int): The number of columns in the maze.
+        revision (int): Identifies the contents of the walkable matrix. It
+            changes whenever the matrix changes, and a matrix which goes
+            back to a layout seen before gets that layout's revision back,
+            so anything cached against a revision can be reused.
+        cell_types (ndarray): Flat int8 array holding the grid type of every
+            cell.
+        step_costs (ndarray): Flat int32 array holding the cost of stepping
+            onto every cell, non-walkable cells have a cost of 0.
+        indptr (ndarray): CSR row pointer, the neighbours of cell i are stored
+            in indices[indptr[i]:indptr[i + 1]].
+        indices (ndarray): CSR column indices holding the walkable neighbours
+            of every cell.
+        neighbours (list of tuple): Python copy of the CSR neighbour list,
+            the search loops use this as it is quicker to index from python.
+        cell_type_list (list): Python copy of cell_types.
+        diamond_cells (bytearray): Holds a 1 for every cell with a diamond
+            in it, searches use this as their goal test.
+        step_cost_list (list): Python copy of step_costs.
+        walkable_cells (ndarray): The cell index of every walkable cell, in
+            increasing order. Row i of the distance table belongs to
+            walkable_cells[i].
+        walkable_rank (list): Maps a cell index to its position in
+            walkable_cells, or NO_CELL for walls.
+        move_masks (list of int): The ACTIONS the competitive computers can
+            make from every cell, as a move mask.
+        action_offsets (dict): Maps each of the ACTIONS to the change in
+            cell index it makes.
+        _distance_table (ndarray): uint16 matrix holding the number of steps
+            between every pair of walkable cells, built the first time it is
+            asked for. None until then.
+        _distance_walkable (ndarray): The walkable mask the distance table
+            was built from, the table is only thrown away when this changes.
+        _jump_table (list of list): For every cell and direction, the jump
+            point reached by walking that way. None until it is asked for.
+
+    Args:
+        walkable_maze_matrix (list of list): The walkable maze matrix
+            generated by the World class.
+    """
+
+    # One graph is shared between every user of the same walkable matrix, so
+    # the world can recompile it for everyone when the maze changes.
+    _shared_graphs = weakref.WeakValueDictionary()
+
+    # Revisions are handed out from one counter for every graph, so two
+    # different layouts never share a revision. Layouts are remembered by a
+    # digest, least recently seen first.
+    _revision_counter = itertools.count(1)
+    _layout_revisions = OrderedDict()
+
+    # right, down, left, up. This matches the order the computer classes
+    # have always expanded neighbours in.
+    DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+    def __init__(self, walkable_maze_matrix) -> None:
+        self._walkable_maze_matrix = walkable_maze_matrix
+        self.rows = len(walkable_maze_matrix)
+        self.cols = len(walkable_maze_matrix[0])
+        self.revision = 0
+
+        self.action_offsets = {
+            action: grid_y * self.cols + grid_x
+            for action, (grid_y, grid_x) in ACTION_DIRECTIONS.items()
+        }
+
+        self._distance_table = None
+        self._distance_walkable = None
+        self._jump_table = None
+
+        self.refresh()
+
+    @classmethod
+    def for_matrix(cls, walkable_maze_matrix):
+        """ Return the graph compiled for this walkable matrix, compiling a
+        new one if no one has done so yet.
+
+        Args:
+            walkable_maze_matrix (list of list): The walkable maze matrix.
+
+        Returns:
+            GridGraph: The graph shared by every user of the matrix.
+        """
+        grid_graph = cls._shared_graphs.get(id(walkable_maze_matrix))
+
+        if grid_graph is None:
+            grid_graph = cls(walkable_maze_matrix)
+            cls._shared_graphs[id(walkable_maze_matrix)] = grid_graph
+
+        return grid_graph
+
+    def refresh(self) -> None:
+        """ Recompile the arrays from the walkable matrix. This must be called
+        whenever the walkable matrix is modified. """
+        cell_types = np.array(
+            self._walkable_maze_matrix,
+            dtype=np.int8
+        ).ravel()
+
+        step_costs = np.zeros(cell_types.shape, dtype=np.int32)
+        for grid_type, cost in STEP_COSTS.items():
+            step_costs[cell_types == grid_type] = cost
+
+        walkable = cell_types != C.NON_WALKABLE_GRID
+        grid_y, grid_x = np.divmod(
+            np.arange(cell_types.size, dtype=np.int32),
+            self.cols
+        )
+
+        # Column d of this table holds the neighbour in direction d, or
+        # NO_CELL when the neighbour is out of bounds or not walkable.
+        neighbour_table = np.full(
+            (cell_types.size, len(self.DIRECTIONS)),
+            NO_CELL,
+            dtype=np.int32
+        )
+
+        for direction_index, direction in enumerate(self.DIRECTIONS):
+            next_y = grid_y + direction[0]
+            next_x = grid_x + direction[1]
+
+            in_bounds = ((next_y >= 0) & (next_y < self.rows) &
+                         (next_x >= 0) & (next_x < self.cols))
+
+            next_index = np.where(in_bounds, next_y * self.cols + next_x, 0)
+            is_neighbour = in_bounds & walkable[next_index]
+
+            neighbour_table[is_neighbour, direction_index] = (
+                next_index[is_neighbour]
+            )
+
+        has_neighbour = neighbour_table != NO_CELL
+
+        indptr = np.zeros(cell_types.size + 1, dtype=np.int32)
+        np.cumsum(has_neighbour.sum(axis=1), out=indptr[1:])
+
+        # Boolean indexing walks the table row by row, so every cell keeps
+        # its neighbours in DIRECTIONS order.
+        indices = neighbour_table[has_neighbour]
+
+        index_list = indices.tolist()
+        indptr_list = indptr.tolist()
+
+        self.cell_types = cell_types
+        self.step_costs = step_costs
+        self.indptr = indptr
+        self.indices = indices
+        self.cell_type_list = cell_types.tolist()
+        self.diamond_cells = bytearray(
+            (cell_types == C.DIAMOND_GRID).tobytes()
+        )
+        self.step_cost_list = step_costs.tolist()
+        self.neighbours = [
+            tuple(index_list[indptr_list[i]:indptr_list[i + 1]])
+            for i in range(cell_types.size)
+        ]
+
+        self.walkable_cells = np.flatnonzero(walkable).astype(np.int32)
+        walkable_rank = np.full(cell_types.size, NO_CELL, dtype=np.int32)
+        walkable_rank[self.walkable_cells] = np.arange(
+            self.walkable_cells.size,
+            dtype=np.int32
+        )
+        self.walkable_rank = walkable_rank.tolist()
+
+        # Agents walk left and right onto any walkable grid, and only climb
+        # up or down onto ladders. The outer ring of the maze is never
+        # stepped onto.
+        ladder = cell_types == C.LADDER_GRID
+        move_masks = np.zeros(cell_types.size, dtype=np.int32)
+
+        for action, target_types in (("LEFT", walkable), ("RIGHT", walkable),
+                                     ("DOWN", ladder), ("UP", ladder)):
+            step_y, step_x = ACTION_DIRECTIONS[action]
+
+            if step_x:
+                next_x = grid_x + step_x
+                inside = (next_x > 0) & (next_x < self.cols - 1)
+            else:
+                next_y = grid_y + step_y
+                inside = (next_y > 0) & (next_y < self.rows - 1)
+
+            next_index = np.where(
+                inside,
+                np.arange(cell_types.size) + self.action_offsets[action],
+                0
+            )
+            move_masks[inside & target_types[next_index]] |= (
+                ACTION_BITS[action]
+            )
+
+        self.move_masks = move_masks.tolist()
+
+        # Distances only depend on which grids can be walked on, so picking
+        # up or moving a diamond keeps the table.
+        if (self._distance_walkable is None or
+                not np.array_equal(self._distance_walkable, walkable)):
+            self._distance_table = None
+            self._distance_walkable = walkable
+
+        # Diamonds are jump points, so any change can move them.
+        self._jump_table = None
+
+        self.revision = self.get_layout_revision(cell_types)
+
+    def get_layout_revision(self, cell_types) -> int:
+        """ Return the revision of a layout of cell types, handing out a
+        new one the first time the layout is seen. Only the most recently
+        seen layouts are remembered.
+
+        Args:
+            cell_types (ndarray): The cell type of every cell.
+
+        Returns:
+            int: The revision of the layout.
+        """
+        layout = hashlib.blake2b(
+            f"{self.rows}x{self.cols}:".encode() + cell_types.tobytes()
+        ).digest()
+        revisions = GridGraph._layout_revisions
+
+        revision = revisions.get(layout)
+        if revision is None:
+            revision = next(self._revision_counter)
+            revisions[layout] = revision
+
+            while len(revisions) > C.LAYOUT_REVISIONS_SIZE:
+                revisions.popitem(last=False)
+        else:
+            revisions.move_to_end(layout)
+
+        return revision
+
+    def to_index(self, coord) -> int:
+        """ Convert a (grid_y, grid_x) coord into a flat cell index. """
+        return coord[0] * self.cols + coord[1]
+
+    def to_coord(self, index) -> tuple:
+        """ Convert a flat cell index into a (grid_y, grid_x) coord. """
+        return divmod(index, self.cols)
+
+    def is_walkable(self, index) -> bool:
+        """ Check if the cell at the given index can be stood on. """
+        return self.cell_type_list[index] != C.NON_WALKABLE_GRID
+
+    def get_cell_count(self) -> int:
+        """ Return the number of cells in the maze. """
+        return self.rows * self.cols
+
+    def get_distance_table(self):
+        """ Return the all pairs shortest path table, building it on the
+        first call. Entry [i, j] is the number of steps from walkable_cells[i]
+        to walkable_cells[j], or UNREACHABLE.
+
+        The table is built with one breadth first search per walkable cell,
+        so it costs O(V * E) once and every lookup after that is O(1).
+
+        Returns:
+            ndarray: The uint16 distance table.
+        """
+        if self._distance_table is None:
+            self._distance_table = self._build_distance_table()
+
+        return self._distance_table
+
+    def use_distance_table(self, table) -> None:
+        """ Use a distance table built somewhere else instead of building
+        one, such as the read-only copy a search worker process shares with
+        the process that built it. It is dropped like any other table once
+        the walkable grids change. """
+        self._distance_table = table
+
+    def get_distance(self, start, goal):
+        """ Return the number of steps between two cells.
+
+        Args:
+            start (int): The cell index to start from.
+            goal (int): The cell index to reach.
+
+        Returns:
+            int: The number of steps, or UNREACHABLE if there is no path or
+                either cell is a wall.
+        """
+        start_rank = self.walkable_rank[start]
+        goal_rank = self.walkable_rank[goal]
+
+        if start_rank == NO_CELL or goal_rank == NO_CELL:
+            return UNREACHABLE
+
+        return int(self.get_distance_table()[start_rank, goal_rank])
+
+    def is_jump_point(self, index) -> bool:
+        """ Check if a search has to stop at a cell. A cell can be skipped
+        over if its only neighbours are the grids either side of it in a
+        straight line, as there is no choice to make there. This covers
+        plain corridors, runs of slow tiles and ladder shafts, the jump
+        table adds up their step costs. Diamonds, junctions and dead ends
+        are jump points. """
+        if self.cell_type_list[index] in (C.DIAMOND_GRID,
+                                          C.NON_WALKABLE_GRID):
+            return True
+
+        neighbours = self.neighbours[index]
+
+        return (len(neighbours) != 2 or
+                neighbours[0] - index != index - neighbours[1])
+
+    def get_jump_table(self) -> list:
+        """ Return the jump table, building it on the first call after the
+        maze changes.
+
+        Entry [cell][d] is a (jump_point, cost) tuple for walking from the
+        cell in DIRECTIONS[d] until the first jump point, where cost is the
+        total step cost of the walk. It is None when the next grid in that
+        direction cannot be walked on.
+
+        Returns:
+            list of list: The jump table.
+        """
+        if self._jump_table is None:
+            self._jump_table = self._build_jump_table()
+
+        return self._jump_table
+
+    def _build_jump_table(self) -> list:
+        """ Fill the jump table one direction at a time. Cells are visited
+        starting from the far end of each direction, so the entry for the
+        next cell along is always ready and every entry costs O(1). """
+        cell_count = self.get_cell_count()
+        step_costs = self.step_cost_list
+        neighbour_sets = [set(n) for n in self.neighbours]
+        jump_point = [self.is_jump_point(i) for i in range(cell_count)]
+
+        table = [[None] * len(self.DIRECTIONS) for _ in range(cell_count)]
+
+        for direction_index, (step_y, step_x) in enumerate(self.DIRECTIONS):
+            offset = step_y * self.cols + step_x
+
+            # Walking right or down needs the cells furthest right or down
+            # filled in first.
+            order = range(cell_count)
+            if offset > 0:
+                order = reversed(order)
+
+            for cell in order:
+                next_cell = cell + offset
+
+                # Walls also list the walkable grids next to them, but they
+                # are never stood on so they get no entries.
+                if (not self.is_walkable(cell) or
+                        next_cell not in neighbour_sets[cell]):
+                    continue
+
+                if jump_point[next_cell]:
+                    table[cell][direction_index] = (
+                        next_cell,
+                        step_costs[next_cell]
+                    )
+                else:
+                    landing, cost = table[next_cell][direction_index]
+                    table[cell][direction_index] = (
+                        landing,
+                        cost + step_costs[next_cell]
+                    )
+
+        return table
+
+    def _build_distance_table(self):
+        """ Run a breadth first search from every walkable cell and store the
+        results in a uint16 matrix. """
+        walkable_count = self.walkable_cells.size
+
+        # Paths can be as long as the number of walkable cells, so they must
+        # stay below the value used for unreachable pairs.
+        if walkable_count >= UNREACHABLE:
+            raise ValueError(
+                f"Maze has {walkable_count} walkable grids, the distance "
+                f"table supports at most {UNREACHABLE - 1}."
+            )
+
+        neighbours = self.neighbours
+        walkable_rank = self.walkable_rank
+
+        table = np.full(
+            (walkable_count, walkable_count),
+            UNREACHABLE,
+            dtype=np.uint16
+        )
+
+        for source_rank, source in enumerate(self.walkable_cells.tolist()):
+            row = [UNREACHABLE] * walkable_count
+            row[source_rank] = 0
+
+            queue = deque([source])
+
+            while queue:
+                current = queue.popleft()
+                next_dist = row[walkable_rank[current]] + 1
+
+                for next_cell in neighbours[current]:
+                    next_rank = walkable_rank[next_cell]
+
+                    if row[next_rank] == UNREACHABLE:
+                        row[next_rank] = next_dist
+                        queue.append(next_cell)
+
+            table[source_rank] = row
+
+        return table
@@ -5,6 +5,7 @@ import os
 
 from world import World
 from agent.computer import get_agent_types
+from agent.enemy_planner import EnemyPlanner, PlannedEnemyComputer
 from characters.character import get_character_types
 from text import Text
 from lock import visited_and_path_data_flag
@@ -19,7 +20,32 @@ clock = pygame.time.Clock()
 pygame.display.set_caption("Maze Game")
 
 
-def create_characters(config, maze_array) -> list:
+def get_enemy_positions(world, enemy_count) -> list:
+    """ The x, y positions the enemies start at. The first three always
+    start in the same places, any more start on the grids furthest along the
+    maze from the player and the enemies before them. """
+    enemy_positions = [
+        (500, 100),
+        (700, 200),
+        (100, 300)
+    ][:enemy_count]
+
+    # A character placed at x, y stands on grid (y / size - 1, x / size - 1).
+    occupied = [
+        (y // C.TILE_SIZE - 1, x // C.TILE_SIZE - 1)
+        for x, y in [C.PLAYER_START_POSITION] + enemy_positions
+    ]
+
+    for grid_y, grid_x in world.get_spawn_grids(
+            enemy_count - len(enemy_positions), occupied):
+        enemy_positions.append(
+            ((grid_x + 1) * C.TILE_SIZE, (grid_y + 1) * C.TILE_SIZE)
+        )
+
+    return enemy_positions
+
+
+def create_characters(config, maze_array, enemy_positions) -> list:
     """ Initialise all the characters that will be used in the game """
     character_list = []
 
@@ -29,7 +55,7 @@ def create_characters(config, maze_array) -> list:
         C.game_values["character_height"],
         maze_array,
         is_controlled_by_computer=True if config["algo"] else False,
-        x=350, y=300,
+        x=C.PLAYER_START_POSITION[0], y=C.PLAYER_START_POSITION[1],
         in_filled_maze=config["filled"]
     )
 
@@ -57,15 +83,8 @@ def create_characters(config, maze_array) -> list:
 
     character_list.append(player)
 
-    enemy_positions = [
-        (500, 100),
-        (700, 200),
-        (100, 300)
-    ]
-
     # Now create the enemies
-    for enemy_index in range(config["enemy_count"]):
-        x, y = enemy_positions[enemy_index]
+    for x, y in enemy_positions:
 
         enemy = get_character_types()["enemy"](
             C.game_values["character_width"],
@@ -121,7 +140,11 @@ def setup_game(config) -> dict:
     # Generate the maze
     world = World(maze_array)
 
-    character_list = create_characters(config, maze_array)
+    character_list = create_characters(
+        config,
+        maze_array,
+        get_enemy_positions(world, config["enemy_count"])
+    )
 
     player = character_list[0]
 
@@ -163,6 +186,13 @@ def setup_game(config) -> dict:
             diamond=world.get_diamond_group().sprites()[0],
             diamond_list=world.get_diamond_group(),
             is_weighted=config["weighted"],
+            multi_target=config["multi_target"],
+            move_time_ms=config["move_time_ms"],
+            search_workers=config["search_workers"],
+            mcts_iterations=config["mcts_iterations"],
+            plan_horizon=config["plan_horizon"],
+            chance_samples=config["chance_samples"],
+            enemy_search=config["enemy_search"],
             enemy_list=character_list[1:] if len(character_list) > 1 else [],
             state=state,
             agent_type=0,  # 0 is the main agent
@@ -171,18 +201,38 @@ def setup_game(config) -> dict:
 
     enemy_computers = []
 
-    enemy_algo = "random"
+    # Competitive enemies share one planner, which searches for all their
+    # moves at once.
+    planner = None
     if is_comp:
-        enemy_algo = config["algo"]
-
-    for enemy_index, enemy in enumerate(character_list[1:]):
-        enemy_computer = get_agent_types()[enemy_algo](
-            enemy,
+        planner = EnemyPlanner(
+            get_agent_types()[config["algo"]],
             world.get_walkable_maze_matrix(),
+            len(enemy_list),
             state=state,
-            agent_type=enemy_index + 1,  # 1 is the first enemy
-            num_characters=len(character_list)
+            move_time_ms=config["move_time_ms"],
+            mcts_iterations=config["mcts_iterations"],
+            chance_samples=config["chance_samples"]
         )
+
+    for enemy_index, enemy in enumerate(character_list[1:]):
+        if is_comp:
+            enemy_computer = PlannedEnemyComputer(
+                enemy,
+                world.get_walkable_maze_matrix(),
+                planner=planner,
+                state=state,
+                agent_type=enemy_index + 1,  # 1 is the first enemy
+                num_characters=len(character_list)
+            )
+        else:
+            enemy_computer = get_agent_types()["random"](
+                enemy,
+                world.get_walkable_maze_matrix(),
+                state=state,
+                agent_type=enemy_index + 1,
+                num_characters=len(character_list)
+            )
         enemy_computers.append(enemy_computer)
 
     return {
@@ -328,6 +378,8 @@ def start_game_agent(
                     computer.tracker.print_analytics()
                     game_over = 1
                     computer.stop_path_find_algo_thread()
+                    for enemy_computer in enemy_computers:
+                        enemy_computer.stop_path_find_algo_thread()
             else:
                 world.clear_diamond(remove_diamond_pos[0],
                                     remove_diamond_pos[1])
@@ -339,6 +391,8 @@ def start_game_agent(
                     computer.tracker.print_analytics()
                     game_over = 1
                     computer.stop_path_find_algo_thread()
+                    for enemy_computer in enemy_computers:
+                        enemy_computer.stop_path_find_algo_thread()
 
             player.set_is_diamond_found_to_false()
             diamond_positions = world.get_diamond_group()
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+import constants as C
+
+""" Least recently used cache of generated paths, shared between every
+computer. Keys include the revision of the walkable matrix, so a path is
+never handed out for a maze that has changed since it was found. Entries for
+old revisions are never asked for again and fall off the end of the cache.
+"""
+
+
+class PathCache:
+    """ LRU cache mapping (algorithm, start cell, goal cell, revision) keys to
+    the path and visited grids an algorithm generated.
+
+    Attributes:
+        max_size (int): The most entries the cache will hold before it
+            starts dropping the least recently used ones.
+        hits (int): The number of lookups that found an entry.
+        misses (int): The number of lookups that found nothing.
+        _entries (OrderedDict): The cached entries, least recently used
+            first.
+
+    Args:
+        max_size (int): The most entries the cache will hold.
+    """
+    def __init__(self, max_size=C.PATH_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        """ Look up a key, marking it as the most recently used.
+
+        Args:
+            key (tuple): (algorithm, start cell, goal cell, revision).
+
+        Returns:
+            tuple: The (path, visited) entry stored for the key, or None if
+                there is no entry.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+
+        return entry
+
+    def put(self, key, path, visited) -> None:
+        """ Store the result of a search, dropping the least recently used
+        entry if the cache is full.
+
+        Args:
+            key (tuple): (algorithm, start cell, goal cell, revision).
+            path (list of tuple): The path the algorithm generated.
+            visited (array of int): The cells the algorithm visited.
+        """
+        self._entries[key] = (list(path), visited)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """ Remove every entry and reset the counters. """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# The cache used by every computer unless it is given its own.
+shared_path_cache = PathCache()
@@ -0,0 +1,331 @@
+import weakref
+import itertools
+import numpy as np
+
+from array import array
+
+import constants as C
+
+from grid_graph import NO_CELL
+from agent.search_kernels import OpenList
+
+
+class PlatformGraph:
+    """ This class contracts the grid graph down to the grids where a path
+    can branch. Every run of grids with exactly two neighbours (a stretch of
+    corridor or a ladder shaft) becomes a single weighted edge, so a search
+    only has to look at ladder ends, junctions, dead ends and diamonds.
+
+    Picking up or placing a diamond only splits or merges the edge the
+    diamond is on, the rest of the graph is left alone. Any other change to
+    the maze rebuilds the graph.
+
+    Attributes:
+        grid (GridGraph): The grid graph this graph was contracted from.
+        nodes (set): The cell indices of every node.
+        edges (dict): Maps an edge id to a (node_1, cells, node_2) tuple,
+            where cells is the tuple of grids walked from node_1 to node_2.
+        node_edges (dict): Maps a node to the set of edge ids touching it.
+        cell_edge (dict): Maps every grid inside an edge to its edge id.
+        _edge_ids (count): Hands out new edge ids.
+        _cell_types (ndarray): The grid types the graph was built for.
+        _revision (int): The grid revision the graph was built for.
+
+    Args:
+        grid (GridGraph): The grid graph to contract.
+    """
+
+    # One graph is shared between every user of the same grid graph.
+    _shared_graphs = weakref.WeakValueDictionary()
+
+    def __init__(self, grid) -> None:
+        self.grid = grid
+        self.rebuild()
+
+    @classmethod
+    def for_grid(cls, grid):
+        """ Return the platform graph for this grid graph, contracting it if
+        no one has done so yet. """
+        platform_graph = cls._shared_graphs.get(id(grid))
+
+        if platform_graph is None or platform_graph.grid is not grid:
+            platform_graph = cls(grid)
+            cls._shared_graphs[id(grid)] = platform_graph
+
+        return platform_graph
+
+    def is_node(self, cell) -> bool:
+        """ Check if a grid has to be kept as a node. Grids that are not
+        diamonds and have two neighbours can be folded into an edge. """
+        return (self.grid.cell_type_list[cell] == C.DIAMOND_GRID or
+                len(self.grid.neighbours[cell]) != 2)
+
+    def rebuild(self) -> None:
+        """ Contract the whole grid graph from scratch. """
+        grid = self.grid
+
+        self.nodes = set()
+        self.edges = {}
+        self.node_edges = {}
+        self.cell_edge = {}
+        self._edge_ids = itertools.count()
+        self._cell_types = grid.cell_types.copy()
+        self._revision = grid.revision
+
+        walkable = [
+            cell for cell in range(grid.get_cell_count())
+            if grid.is_walkable(cell)
+        ]
+
+        for cell in walkable:
+            if self.is_node(cell):
+                self._add_node(cell)
+
+        for node in list(self.nodes):
+            for neighbour in grid.neighbours[node]:
+                self._trace_edge(node, neighbour)
+
+        # Whatever is left is a ring of corridor with no branches in it, one
+        # grid of the ring has to become a node for the ring to be reached.
+        for cell in walkable:
+            if cell not in self.nodes and cell not in self.cell_edge:
+                self._add_node(cell)
+                for neighbour in grid.neighbours[cell]:
+                    self._trace_edge(cell, neighbour)
+
+    def sync(self) -> None:
+        """ Bring the graph up to date with the grid graph. Grids that have
+        only gained or lost a diamond are patched locally, anything else
+        rebuilds the graph. """
+        grid = self.grid
+
+        if grid.revision == self._revision:
+            return
+
+        changed = np.flatnonzero(grid.cell_types != self._cell_types)
+        diamond_flips = (C.WALKABLE_GRID, C.DIAMOND_GRID)
+
+        if not all(self._cell_types[cell] in diamond_flips and
+                   grid.cell_types[cell] in diamond_flips
+                   for cell in changed):
+            self.rebuild()
+            return
+
+        for cell in changed.tolist():
+            if grid.cell_type_list[cell] == C.DIAMOND_GRID:
+                self._split_edge(cell)
+            else:
+                self._merge_edges(cell)
+
+        self._cell_types = grid.cell_types.copy()
+        self._revision = grid.revision
+
+    def find_path(self, start, goal) -> tuple:
+        """ A* over the contracted graph from start to goal. The start and
+        goal do not have to be nodes, if they are inside an edge they are
+        joined to the ends of that edge for this search only.
+
+        Args:
+            start (int): The cell index to start from.
+            goal (int): The cell index to reach.
+
+        Returns:
+            tuple: (path, visit_order). The path is every cell index from
+                start to goal, or None if the goal cannot be reached.
+                visit_order holds the nodes expanded.
+        """
+        self.sync()
+
+        grid = self.grid
+        goal_y, goal_x = grid.to_coord(goal)
+        visit_order = array("i")
+
+        costs = {start: 0}
+        came_from = {start: (NO_CELL, ())}
+
+        open_list = OpenList(grid.get_cell_count())
+        open_list.push(0, start)
+
+        while open_list:
+            _, current = open_list.pop()
+            visit_order.append(current)
+
+            if current == goal:
+                return self._expand_path(came_from, goal), visit_order
+
+            for next_node, cost, cells in self._get_arcs(current, goal):
+                new_cost = costs[current] + cost
+
+                if new_cost < costs.get(next_node, float("inf")):
+                    next_y, next_x = grid.to_coord(next_node)
+                    heuristic = abs(next_y - goal_y) + abs(next_x - goal_x)
+
+                    if open_list.push(new_cost + heuristic, next_node):
+                        costs[next_node] = new_cost
+                        came_from[next_node] = (current, cells)
+
+        return None, visit_order
+
+    def _get_arcs(self, cell, goal) -> list:
+        """ Return the (next_node, cost, cells) arcs out of a cell, where
+        cells are the grids walked over on the way to next_node. Arcs to the
+        goal are added when it sits inside an edge next to the cell. """
+        arcs = []
+
+        if cell in self.nodes:
+            for edge_id in self.node_edges[cell]:
+                arcs.extend(self._walk_edge(edge_id, cell))
+        else:
+            # The start is inside an edge, walk out to both of its ends.
+            edge_id = self.cell_edge[cell]
+            arcs.extend(self._walk_edge(edge_id, cell))
+
+        step_costs = self.grid.step_cost_list
+        goal_edge = self.cell_edge.get(goal)
+
+        # A goal inside an edge is not a node, so stop on it part way
+        # along any arc that walks over it.
+        if goal_edge is not None:
+            for index, (next_node, cost, cells) in enumerate(arcs):
+                if goal in cells:
+                    cells = cells[:cells.index(goal)]
+                    cost = sum(step_costs[c] for c in cells) + step_costs[goal]
+                    arcs[index] = (goal, cost, cells)
+
+        return arcs
+
+    def _walk_edge(self, edge_id, cell) -> list:
+        """ Return the arcs from a cell along an edge to its ends. The cell
+        is either one end of the edge or a grid inside it. """
+        step_costs = self.grid.step_cost_list
+        node_1, cells, node_2 = self.edges[edge_id]
+
+        if cell == node_1:
+            runs = [(node_2, cells)]
+        elif cell == node_2:
+            runs = [(node_1, cells[::-1])]
+        else:
+            index = cells.index(cell)
+            runs = [
+                (node_1, cells[:index][::-1]),
+                (node_2, cells[index + 1:])
+            ]
+
+        # An edge which loops back to the same node is walked both ways.
+        if node_1 == node_2 == cell:
+            runs.append((node_1, cells[::-1]))
+
+        return [
+            (end, sum(step_costs[c] for c in run) + step_costs[end], run)
+            for end, run in runs
+        ]
+
+    def _expand_path(self, came_from, goal) -> list:
+        """ Follow the arcs back from the goal, putting back the grids each
+        arc walked over. """
+        path = []
+        current = goal
+
+        while current != NO_CELL:
+            parent, cells = came_from[current]
+            path.append(current)
+            path.extend(reversed(cells))
+            current = parent
+
+        path.reverse()
+
+        return path
+
+    def _add_node(self, cell) -> None:
+        self.nodes.add(cell)
+        self.node_edges.setdefault(cell, set())
+
+    def _add_edge(self, node_1, cells, node_2) -> None:
+        edge_id = next(self._edge_ids)
+
+        self.edges[edge_id] = (node_1, tuple(cells), node_2)
+        self.node_edges[node_1].add(edge_id)
+        self.node_edges[node_2].add(edge_id)
+
+        for cell in cells:
+            self.cell_edge[cell] = edge_id
+
+    def _remove_edge(self, edge_id) -> tuple:
+        node_1, cells, node_2 = self.edges.pop(edge_id)
+
+        self.node_edges[node_1].discard(edge_id)
+        self.node_edges[node_2].discard(edge_id)
+
+        for cell in cells:
+            del self.cell_edge[cell]
+
+        return node_1, cells, node_2
+
+    def _trace_edge(self, node, first) -> None:
+        """ Walk from a node through first until the next node, and add the
+        edge walked unless it has already been added from its other end. """
+        neighbours = self.grid.neighbours
+
+        if first in self.cell_edge:
+            return
+
+        # Two nodes next to each other share an edge with no grids in it,
+        # only add it from the lower cell.
+        if first in self.nodes:
+            if node < first:
+                self._add_edge(node, (), first)
+            return
+
+        cells = []
+        previous, current = node, first
+
+        while current not in self.nodes:
+            cells.append(current)
+
+            # Grids inside an edge have exactly two neighbours, carry on
+            # through the one we did not come from.
+            next_1, next_2 = neighbours[current]
+            previous, current = current, (
+                next_2 if next_1 == previous else next_1
+            )
+
+        self._add_edge(node, cells, current)
+
+    def _split_edge(self, cell) -> None:
+        """ A diamond has appeared on a grid, make it a node by splitting the
+        edge it was inside. """
+        if cell in self.nodes:
+            return
+
+        node_1, cells, node_2 = self._remove_edge(self.cell_edge[cell])
+        index = cells.index(cell)
+
+        self._add_node(cell)
+        self._add_edge(node_1, cells[:index], cell)
+        self._add_edge(cell, cells[index + 1:], node_2)
+
+    def _merge_edges(self, cell) -> None:
+        """ A diamond has gone from a grid, fold it back into one edge if it
+        has nothing else making it a node. """
+        edge_ids = self.node_edges.get(cell, set())
+
+        if self.is_node(cell) or len(edge_ids) != 2:
+            return
+
+        edge_1, edge_2 = (self._remove_edge(e) for e in list(edge_ids))
+
+        # Turn both edges round so they run from their far end to the cell
+        # and from the cell to the far end of the other.
+        if edge_1[2] != cell:
+            edge_1 = (edge_1[2], edge_1[1][::-1], edge_1[0])
+        if edge_2[0] != cell:
+            edge_2 = (edge_2[2], edge_2[1][::-1], edge_2[0])
+
+        self.nodes.discard(cell)
+        del self.node_edges[cell]
+
+        self._add_edge(
+            edge_1[0],
+            edge_1[1] + (cell,) + edge_2[1],
+            edge_2[2]
+        )
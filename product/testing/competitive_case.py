@@ -0,0 +1,75 @@
+import unittest
+import pygame
+import pickle
+
+from characters.character import get_character_types
+from world import World
+
+CHARACTER_WIDTH = 32
+CHARACTER_HEIGHT = 32
+
+
+class CompetitiveSearchTestCase(unittest.TestCase):
+    """ Set up shared by the tests of the competitive search: maze_10, the
+    main agent with three enemies, and a factory for the computers to
+    search with.
+
+    Attributes:
+        all_diamonds (bool): Put every diamond of the maze in the state,
+            rather than four of them.
+    """
+    all_diamonds = False
+
+    with open('maze/maze_10', 'rb') as file:
+        maze_map = pickle.load(file)
+
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((1, 1), 0, 32)
+
+        self.world = World(self.maze_map)
+        self.matrix = self.world.get_walkable_maze_matrix()
+
+        self.state = {
+            "main_agent": (5, 8),
+            "enemies": [(8, 26), (13, 13), (1, 11)],
+            "diamond_coords": (
+                self.world.get_diamond_coords() if self.all_diamonds
+                else [(10, 26), (13, 3), (7, 8), (13, 1)]
+            ),
+            "score": 0,
+            "win": False,
+            "lose": False,
+            "diamond_count": 0
+        }
+
+    def make_player(self):
+        """ Make a main character for a computer to control. """
+        return get_character_types()["main"](
+            CHARACTER_WIDTH,
+            CHARACTER_HEIGHT,
+            self.maze_map, True,
+            300, 300
+        )
+
+    def make_computer(self, computer_class, character=None, **kwargs):
+        """ Make a computer for the main agent, playing against every enemy
+        of the state, that searches when asked to.
+
+        Args:
+            computer_class (type): The computer class to make.
+            character (MainAnimationManager): The character it controls.
+
+        Returns:
+            Computer: The computer.
+        """
+        kwargs.setdefault("num_characters", len(self.state["enemies"]) + 1)
+        kwargs.setdefault("agent_type", 0)
+
+        computer = computer_class(character, self.matrix, **kwargs)
+        computer.stop_thread = False
+
+        return computer
+
+    def tearDown(self):
+        pygame.quit()
@@ -0,0 +1,77 @@
+import unittest
+
+from agent.competitive_computer import AlphaBetaComputer, MinimaxComputer
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestBestReply(CompetitiveSearchTestCase):
+    """ Test best-reply search moves only the most dangerous enemy between
+    two moves of the main agent, and searches a far smaller tree than
+    searching every enemy in turn. """
+
+    all_diamonds = True
+
+    def make_computer(self, computer_class=AlphaBetaComputer,
+                      enemy_search="best-reply", agent_type=0):
+        computer = super().make_computer(computer_class,
+                                         agent_type=agent_type,
+                                         enemy_search=enemy_search)
+        # Without the table the node counts only depend on the tree.
+        computer.use_transposition_table = False
+
+        return computer
+
+    def test_one_enemy_moves_between_main_agent_moves(self):
+        computer = self.make_computer()
+        state = computer.to_game_state(self.state)
+        _, action = computer.search_to_depth(state, 6)
+
+        variation = computer.principal_variation
+        self.assertEqual(len(variation), 6)
+        self.assertEqual([agent_index for agent_index, _ in variation[::2]],
+                         [0, 0, 0])
+        self.assertTrue(all(agent_index in (1, 2, 3)
+                            for agent_index, _ in variation[1::2]))
+
+        # The game never goes the way a best-reply variation expects.
+        computer.make_plan(state, action)
+        self.assertEqual(computer._plan, [])
+
+    def test_pruning_keeps_the_value(self):
+        self.state["enemies"] += self.world.get_spawn_grids(
+            7, [self.state["main_agent"]] + self.state["enemies"]
+        )
+
+        minimax = self.make_computer(MinimaxComputer)
+        alpha_beta = self.make_computer()
+
+        self.assertEqual(alpha_beta.search_to_depth(self.state, 6),
+                         minimax.search_to_depth(self.state, 6))
+        self.assertLess(alpha_beta.nodes_expanded, minimax.nodes_expanded)
+
+    def test_smaller_tree_than_paranoid(self):
+        """ Looking two moves of the main agent ahead against six enemies
+        takes a whole round of enemy moves each, or a single reply. """
+        self.state["enemies"] += self.world.get_spawn_grids(
+            3, [self.state["main_agent"]] + self.state["enemies"]
+        )
+
+        paranoid = self.make_computer(enemy_search="paranoid")
+        best_reply = self.make_computer()
+
+        paranoid.search_to_depth(self.state, 14)
+        best_reply.search_to_depth(self.state, 4)
+
+        self.assertLess(best_reply.nodes_expanded * 10,
+                        paranoid.nodes_expanded)
+
+    def test_enemies_search_every_enemy(self):
+        """ An enemy has to see the move of its own agent every round. """
+        self.assertFalse(self.make_computer(agent_type=1).best_reply_search)
+        self.assertFalse(
+            self.make_computer(enemy_search="paranoid").best_reply_search
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
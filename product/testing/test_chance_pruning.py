@@ -0,0 +1,110 @@
+import math
+import unittest
+
+from agent.competitive_computer import ExpectimaxComputer
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestChancePruning(CompetitiveSearchTestCase):
+    """ Test expectimax with a bounded evaluation, Star1 pruning and sampled
+    enemy moves against exact expectimax. """
+
+    def make_computer(self, agent_type=0, use_chance_pruning=True,
+                      chance_samples=None):
+        computer = super().make_computer(
+            ExpectimaxComputer,
+            agent_type=agent_type,
+            chance_samples=chance_samples,
+            seed=0
+        )
+        # Without the table the node counts only depend on the pruning.
+        computer.use_transposition_table = False
+        computer.use_chance_pruning = use_chance_pruning
+
+        return computer
+
+    def test_losing_is_scored_below_every_bound(self):
+        computer = self.make_computer()
+        state = computer.to_game_state(self.state)
+        caught = state._replace(player=state.enemies[0])
+
+        value = computer.evaluation_function(caught, 0, None)
+
+        self.assertTrue(math.isfinite(value))
+        self.assertEqual(value, computer.get_value_bounds(state, 8)[0])
+
+    def test_bounds_hold_for_the_leaves(self):
+        """ Every leaf two rounds down scores inside the bounds of the
+        root. """
+        computer = self.make_computer()
+        root = computer.to_game_state(self.state)
+        lower, upper = computer.get_value_bounds(root, 8)
+
+        states = [root]
+        for ply in range(8):
+            agent_index = ply % 4
+            children = []
+            for state in states:
+                cell = (state.player if agent_index == 0
+                        else state.enemies[agent_index - 1])
+                for action in computer.legal_movements(
+                        computer._grid.to_coord(cell), None):
+                    children.append(computer.generate_successor(
+                        state, agent_index, action
+                    ))
+            states = children
+
+        values = [
+            computer.evaluation_function(state, 0, None) for state in states
+        ]
+        self.assertGreaterEqual(min(values), lower)
+        self.assertLessEqual(max(values), upper)
+
+    def test_star1_keeps_the_exact_value(self):
+        for agent_type in (0, 2):
+            exact = self.make_computer(agent_type, use_chance_pruning=False)
+            pruned = self.make_computer(agent_type)
+
+            self.assertEqual(
+                pruned.search_to_depth(self.state, 12),
+                exact.search_to_depth(self.state, 12)
+            )
+            self.assertLess(pruned.nodes_expanded, exact.nodes_expanded)
+            self.assertGreater(pruned.search_statistics.cutoffs, 0)
+            self.assertEqual(exact.search_statistics.cutoffs, 0)
+
+    def test_enemy_with_no_move_stays(self):
+        """ A chance node for an enemy that cannot move is scored as the
+        enemy staying where it is, the way the sampled search has it,
+        rather than as 0. """
+        self.state["enemies"][2] = (0, 0)
+        computer = self.make_computer(use_chance_pruning=False)
+        state = computer.to_game_state(self.state)
+
+        self.assertEqual(computer.legal_movements((0, 0), None), [])
+
+        value = computer.chance_node(state, 4, None, 0, 3)[0]
+
+        self.assertEqual(value, computer.minimax(state, 3, 0)[0])
+        self.assertNotEqual(value, 0)
+
+    def test_sampled_search(self):
+        exact = self.make_computer()
+        exact.search_to_depth(self.state, 12)
+
+        results = []
+        for _ in range(2):
+            sampled = self.make_computer(chance_samples=4)
+            results.append(sampled.search_to_depth(self.state, 12))
+
+            self.assertLess(sampled.nodes_expanded,
+                            exact.nodes_expanded / 10)
+
+        # The same seed draws the same moves.
+        self.assertEqual(results[0], results[1])
+        self.assertIn(results[0][1],
+                      exact.legal_movements(self.state["main_agent"], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -79,6 +79,13 @@ class TestCli(unittest.TestCase):
         self.assertEqual(result["maze_path"], "maze/maze_12")
         self.assertEqual(result["algo"], "astar")
 
+    @patch('sys.argv', ['main', '--size', 'large', '--algo', 'dstar'])
+    def test_large_size_and_d_star_lite(self):
+        """ Test D* Lite algo is registered. """
+        result = process_args()
+        self.assertEqual(result["maze_path"], "maze/maze_12")
+        self.assertEqual(result["algo"], "dstar")
+
     @patch('sys.argv', ['main', '--size', 'large-filled', '--algo', 'greedy'])
     def test_large_size_and_greedy_algo(self):
         """ Test greedy algo is registered. """
@@ -160,6 +167,174 @@ class TestCli(unittest.TestCase):
         self.assertEqual(result["maze_path"], "maze/maze_8")
         self.assertEqual(result["algo"], "expectimax")
 
+    @patch('sys.argv', ['main', '--size', 'large-filled', '--algo', 'greedy',
+                        '--multi-target'])
+    def test_multi_target_greedy(self):
+        """ Test greedy works with the multi target flag. """
+        result = process_args()
+        self.assertEqual(result["algo"], "greedy")
+        self.assertEqual(result["multi_target"], True)
+
+    @patch('sys.argv', ['main', '--size', 'large', '--algo', 'astar',
+                        '--multi-target'])
+    def test_cli_fails_when_multi_target_set_on_non_greedy_algo(self):
+        """ Only greedy can search for every diamond at once. """
+        with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+            with self.assertRaises(SystemExit):
+                process_args()
+
+        self.assertIn("error: --multi-target is only applicable when using "
+                      "the greedy algorithm.", fake_stderr.getvalue())
+
+    @patch('sys.argv', ['main', '--size', 'large-filled', '--algo',
+                        'alphabeta', '--enemy_count', '3',
+                        '--move-time-ms', '200'])
+    def test_move_time_ms_alphabeta(self):
+        """ Test the competitive algos can be given a time per move. """
+        result = process_args()
+        self.assertEqual(result["move_time_ms"], 200)
+
+    @patch('sys.argv', ['main', '--size', 'large', '--algo', 'bfs'])
+    def test_move_time_ms_default(self):
+        result = process_args()
+        self.assertIsNone(result["move_time_ms"])
+
+    @patch('sys.argv', ['main', '--size', 'large', '--algo', 'astar',
+                        '--move-time-ms', '200'])
+    def test_cli_fails_when_move_time_ms_set_on_non_competitive_algo(self):
+        with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+            with self.assertRaises(SystemExit):
+                process_args()
+
+        self.assertIn("error: --move-time-ms is only applicable",
+                      fake_stderr.getvalue())
+
+    @patch('sys.argv', ['main', '--size', 'small-filled', '--algo',
+                        'minimax', '--enemy_count', '1',
+                        '--move-time-ms', '0'])
+    def test_cli_fails_when_move_time_ms_is_not_positive(self):
+        with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+            with self.assertRaises(SystemExit):
+                process_args()
+
+        self.assertIn("error: --move-time-ms must be greater than zero.",
+                      fake_stderr.getvalue())
+
+    @patch('sys.argv', ['main', '--size', 'large-filled', '--algo',
+                        'expectimax', '--enemy_count', '3',
+                        '--search-workers', '4'])
+    def test_search_workers_expectimax(self):
+        result = process_args()
+        self.assertEqual(result["search_workers"], 4)
+
+    @patch('sys.argv', ['main', '--size', 'large-filled', '--algo',
+                        'alphabeta', '--enemy_count', '3',
+                        '--search-workers', '4'])
+    def test_cli_fails_when_search_workers_set_on_alphabeta(self):
+        """ Alpha-beta prunes with the values of earlier root moves, so it
+        cannot search them in parallel. """
+        with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+            with self.assertRaises(SystemExit):
+                process_args()
+
+        self.assertIn("error: --search-workers is only applicable",
+                      fake_stderr.getvalue())
+
+    @patch('sys.argv', ['main', '--size', 'small-filled', '--algo',
+                        'minimax', '--enemy_count', '1',
+                        '--search-workers', '0'])
+    def test_cli_fails_when_search_workers_is_not_positive(self):
+        with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+            with self.assertRaises(SystemExit):
+                process_args()
+
+        self.assertIn("error: --search-workers must be greater than zero.",
+                      fake_stderr.getvalue())
+
+    @patch('sys.argv', ['main', '--size', 'large-filled', '--algo', 'mcts',
+                        '--enemy_count', '3', '--mcts-iterations', '200'])
+    def test_mcts_iterations(self):
+        result = process_args()
+        self.assertEqual(result["algo"], "mcts")
+        self.assertEqual(result["mcts_iterations"], 200)
+
+    @patch('sys.argv', ['main', '--size', 'large-filled', '--algo',
+                        'alphabeta', '--enemy_count', '3',
+                        '--plan-horizon', '2'])
+    def test_plan_horizon(self):
+        result = process_args()
+        self.assertEqual(result["plan_horizon"], 2)
+
+    def test_cli_fails_when_plan_horizon_is_invalid(self):
+        """ Monte Carlo tree search and expectimax do not follow plans, and
+        a plan has to hold at least the move searched for. """
+        cases = (
+            ("mcts", "2", "error: --plan-horizon is only applicable"),
+            ("expectimax", "2", "error: --plan-horizon is only applicable"),
+            ("minimax", "0",
+             "error: --plan-horizon must be greater than zero.")
+        )
+
+        for algo, horizon, message in cases:
+            with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+                with patch(
+                    'sys.argv',
+                    ['main', '--size', 'large-filled', '--algo', algo,
+                     '--enemy_count', '1', '--plan-horizon', horizon]
+                ):
+                    with self.assertRaises(SystemExit):
+                        process_args()
+
+            self.assertIn(message, fake_stderr.getvalue())
+
+    @patch('sys.argv', ['main', '--size', 'large-filled', '--algo',
+                        'expectimax', '--enemy_count', '3',
+                        '--chance-samples', '4'])
+    def test_chance_samples(self):
+        result = process_args()
+        self.assertEqual(result["chance_samples"], 4)
+
+    def test_cli_fails_when_chance_samples_is_invalid(self):
+        cases = (
+            ("minimax", "4", "error: --chance-samples is only applicable"),
+            ("expectimax", "0",
+             "error: --chance-samples must be greater than zero.")
+        )
+
+        for algo, samples, message in cases:
+            with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+                with patch(
+                    'sys.argv',
+                    ['main', '--size', 'large-filled', '--algo', algo,
+                     '--enemy_count', '1', '--chance-samples', samples]
+                ):
+                    with self.assertRaises(SystemExit):
+                        process_args()
+
+            self.assertIn(message, fake_stderr.getvalue())
+
+    def test_cli_fails_when_mcts_iterations_is_invalid(self):
+        """ The iteration budget only applies to mcts, and has to allow at
+        least one iteration. """
+        cases = (
+            ("alphabeta", "200",
+             "error: --mcts-iterations is only applicable"),
+            ("mcts", "0",
+             "error: --mcts-iterations must be greater than zero.")
+        )
+
+        for algo, iterations, message in cases:
+            with patch('sys.stderr', new_callable=io.StringIO) as fake_stderr:
+                with patch(
+                    'sys.argv',
+                    ['main', '--size', 'large-filled', '--algo', algo,
+                     '--enemy_count', '1', '--mcts-iterations', iterations]
+                ):
+                    with self.assertRaises(SystemExit):
+                        process_args()
+
+            self.assertIn(message, fake_stderr.getvalue())
+
     def test_cli_fails_when_weighted_set_on_non_a_star_algo(self):
         """ Test the cli will fail when the user inputs a non astar algorithm
         with the weighted flag. """
@@ -459,6 +634,33 @@ class TestCli(unittest.TestCase):
                 error_output
             )
 
+    @patch(
+        'sys.argv',
+        ['main', '--size', 'large-filled', '--algo', 'alphabeta',
+         '--enemy_count', '10', '--enemy-search', 'best-reply']
+    )
+    def test_cli_enemy_search(self):
+        result = process_args()
+        self.assertEqual(result["enemy_search"], "best-reply")
+
+    @patch(
+        'sys.argv',
+        ['main', '--size', 'large-filled', '--algo', 'expectimax',
+         '--enemy_count', '3', '--enemy-search', 'best-reply']
+    )
+    def test_cli_fails_on_enemy_search_with_expectimax(self):
+        """ Expectimax averages over the enemy moves, there is no worst
+        reply to pick. """
+        with patch('sys.stderr', new=io.StringIO()) as fake_stderr:
+            with self.assertRaises(SystemExit):
+                process_args()
+
+            self.assertIn(
+                "--enemy-search is only applicable when using the "
+                f"following algos: {C.BEST_REPLY_ALGOS}",
+                fake_stderr.getvalue()
+            )
+
     @patch(
         'sys.argv',
         ['main', '--size', 'small', '--algo', 'random', '--explain']
@@ -547,6 +749,26 @@ class TestCli(unittest.TestCase):
             captured_output
         )
 
+    @patch(
+        'sys.argv',
+        ['main', '--size', 'small-filled', '--algo', 'mcts', '--enemy_count',
+         '1', '--explain']
+    )
+    def test_cli_explain_mcts_algo(self):
+        """ Test CLI gives correct explanation for mcts algo. By default
+        new moves are scored by the evaluation function, not rollouts. """
+
+        with patch('sys.stdout', new=io.StringIO()) as fake_stdout:
+            main.process_args()
+            captured_output = fake_stdout.getvalue()
+
+        self.assertIn(
+            "scoring each new move with the evaluation function",
+            captured_output
+        )
+        self.assertIn("only played on from new moves when "
+                      "MCTS_ROLLOUT_DEPTH is above 0", captured_output)
+
     @patch(
         'sys.argv',
         ['main', '--size', 'small', '--algo', 'greedy', '--explain']
@@ -8,6 +8,7 @@ from agent.competitive_computer import (
     AlphaBetaComputer,
     ExpectimaxComputer
 )
+from agent.enemy_planner import EnemyPlanner, PlannedEnemyComputer
 from characters.character import get_character_types
 
 from world import World
@@ -346,3 +347,43 @@ class TestExpectimaxEnemyGUIComputer(TestCompFilledGUIComputer,
                     agent_type=enemy_index + 1
                 )
             )
+
+
+class TestPlannedEnemyGUIComputer(TestCompFilledGUIComputer,
+                                  unittest.TestCase):
+    """ This tests the enemies catch the main agent when one planner
+    searches for all their moves at once."""
+
+    def setUp(self):
+        super().setUp(pos_x=350, pos_y=300)
+        self.main_computer = AlphaBetaComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            diamond_list=self.world.get_diamond_group(),
+            is_weighted=True,
+            state=self.state,
+            is_main=True,
+            num_characters=4,
+            agent_type=0  # 0 = main agent
+        )
+
+        planner = EnemyPlanner(
+            AlphaBetaComputer,
+            self.world.get_walkable_maze_matrix(),
+            3,
+            state=self.state
+        )
+
+        self.enemy_computers = []
+        for enemy_index in range(3):
+            self.enemy_computers.append(
+                PlannedEnemyComputer(
+                    self.enemy_list[enemy_index],
+                    self.world.get_walkable_maze_matrix(),
+                    planner=planner,
+                    state=self.state,
+                    num_characters=4,
+                    # 0 is main agent, 1-3 are enemies
+                    agent_type=enemy_index + 1
+                )
+            )
@@ -334,6 +334,30 @@ class TestCompetitiveUtils(unittest.TestCase):
             ]
         )
 
+    def test_game_state_successors_leave_the_parent_alone(self):
+        """Test that successors of a compiled state are new states, and
+        that reaching the same positions by a different move order gives an
+        equal state with the same hash."""
+        state = self.minimax_computer.to_game_state(self.state)
+
+        left_then_right = self.minimax_computer.generate_successor(
+            self.minimax_computer.generate_successor(state, 1, "LEFT"),
+            2,
+            "RIGHT"
+        )
+        right_then_left = self.minimax_computer.generate_successor(
+            self.minimax_computer.generate_successor(state, 2, "RIGHT"),
+            1,
+            "LEFT"
+        )
+
+        self.assertEqual(left_then_right, right_then_left)
+        self.assertEqual(hash(left_then_right), hash(right_then_left))
+        self.assertEqual(
+            state,
+            self.minimax_computer.to_game_state(self.state)
+        )
+
     def test_alphabeta_faster_execution_than_minimax(self):
         """Test that the alphabeta algorithm will run faster than the minimax
         algorithm, on a guaranteed pruning game state."""
@@ -398,6 +422,7 @@ class TestCompetitiveUtils(unittest.TestCase):
         # temporarily remove ladders, to restrict movement only right
         self.expectimax_computer._walkable_maze_matrix[5][1] = C.WALKABLE_GRID
         self.expectimax_computer._walkable_maze_matrix[4][1] = C.WALKABLE_GRID
+        self.expectimax_computer._grid.refresh()
 
         # In this position, the enemy can only move right.
         enemy_pos = (5, 1)
@@ -413,6 +438,7 @@ class TestCompetitiveUtils(unittest.TestCase):
         # restore ladders
         self.expectimax_computer._walkable_maze_matrix[5][1] = C.LADDER_GRID
         self.expectimax_computer._walkable_maze_matrix[4][1] = C.LADDER_GRID
+        self.expectimax_computer._grid.refresh()
 
     def test_expectimax_probability_func_no_move(self):
         """Test the expectimax probability function will return an empty list
@@ -424,6 +450,7 @@ class TestCompetitiveUtils(unittest.TestCase):
         self.expectimax_computer._walkable_maze_matrix[5][2] = (
             C.NON_WALKABLE_GRID
         )
+        self.expectimax_computer._grid.refresh()
 
         # In this position, the enemy can not make a legal move.
         enemy_pos = (5, 1)
@@ -438,6 +465,7 @@ class TestCompetitiveUtils(unittest.TestCase):
         self.expectimax_computer._walkable_maze_matrix[5][1] = C.LADDER_GRID
         self.expectimax_computer._walkable_maze_matrix[4][1] = C.LADDER_GRID
         self.expectimax_computer._walkable_maze_matrix[5][2] = C.WALKABLE_GRID
+        self.expectimax_computer._grid.refresh()
 
     def tearDown(self):
         pygame.quit()
@@ -0,0 +1,144 @@
+import unittest
+import pygame
+import pickle
+
+import constants as C
+
+from world import World
+from grid_graph import GridGraph
+from agent.dstar_lite import DStarLite
+from agent.search_kernels import best_first_search
+
+
+def path_cost(grid, path) -> int:
+    """ Total cost of stepping along a path of cell indices. """
+    return sum(grid.step_cost_list[cell] for cell in path[1:])
+
+
+def ucs_cost(grid, start, goal) -> int:
+    """ Cost of the path found by a fresh uniform cost search. """
+    found, parents, _ = best_first_search(grid, start, goal)
+    path = [found]
+
+    while parents[path[-1]] != -1:
+        path.append(parents[path[-1]])
+
+    return path_cost(grid, path[::-1])
+
+
+class TestDStarLite(unittest.TestCase):
+    """ Test the incremental planner finds the same cost paths as a full
+    search, while repeating less work. """
+
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((1, 1), 0, 32)
+
+        with open('maze/maze_12', 'rb') as file:
+            world = World(pickle.load(file))
+
+        # The tests change the maze, so plan over a copy of it.
+        self.matrix = [row[:] for row in world.get_walkable_maze_matrix()]
+        self.grid = GridGraph(self.matrix)
+        self.walkable = [
+            cell for cell in range(self.grid.get_cell_count())
+            if self.grid.is_walkable(cell)
+        ]
+        self.start, self.goal = self.walkable[0], self.walkable[-1]
+
+        self.planner = DStarLite(self.grid)
+
+    def test_first_plan_is_optimal(self):
+        path, _ = self.planner.plan(self.start, self.goal)
+
+        self.assertEqual(path[0], self.start)
+        self.assertEqual(path[-1], self.goal)
+        self.assertEqual(
+            path_cost(self.grid, path),
+            ucs_cost(self.grid, self.start, self.goal)
+        )
+
+    def test_replanning_with_no_changes_expands_nothing(self):
+        first_path, _ = self.planner.plan(self.start, self.goal)
+        path, visited = self.planner.plan(self.start, self.goal)
+
+        self.assertEqual(path, first_path)
+        self.assertEqual(len(visited), 0)
+
+    def test_advancing_start_along_path(self):
+        """ Moving along the planned path should keep the rest of the path
+        and need no new expansions. """
+        first_path, _ = self.planner.plan(self.start, self.goal)
+        path, visited = self.planner.plan(first_path[3], self.goal)
+
+        self.assertEqual(path, first_path[3:])
+        self.assertEqual(len(visited), 0)
+
+    def test_blocked_path_is_repaired(self):
+        """ Putting a wall on the path should give a path as cheap as a fresh
+        search, while expanding fewer grids than the fresh search. """
+        first_path, _ = self.planner.plan(self.start, self.goal)
+
+        blocked = first_path[len(first_path) // 2]
+        blocked_y, blocked_x = self.grid.to_coord(blocked)
+        self.matrix[blocked_y][blocked_x] = C.NON_WALKABLE_GRID
+        self.grid.refresh()
+
+        path, visited = self.planner.plan(self.start, self.goal)
+        fresh_path, fresh_visited = DStarLite(self.grid).plan(
+            self.start,
+            self.goal
+        )
+
+        self.assertNotIn(blocked, path)
+        self.assertEqual(
+            path_cost(self.grid, path),
+            path_cost(self.grid, fresh_path)
+        )
+        self.assertLess(len(visited), len(fresh_visited))
+
+    def test_diamond_flip_needs_no_repair(self):
+        """ A diamond being picked up does not change any step costs. """
+        self.planner.plan(self.start, self.goal)
+
+        diamond_y, diamond_x = self.grid.to_coord(self.walkable[5])
+        self.matrix[diamond_y][diamond_x] = C.DIAMOND_GRID
+        self.grid.refresh()
+        self.matrix[diamond_y][diamond_x] = C.WALKABLE_GRID
+        self.grid.refresh()
+
+        _, visited = self.planner.plan(self.start, self.goal)
+
+        self.assertEqual(len(visited), 0)
+
+    def test_new_goal_starts_a_new_search(self):
+        self.planner.plan(self.start, self.goal)
+
+        new_goal = self.walkable[len(self.walkable) // 2]
+        path, _ = self.planner.plan(self.start, new_goal)
+
+        self.assertEqual(path[-1], new_goal)
+        self.assertEqual(
+            path_cost(self.grid, path),
+            ucs_cost(self.grid, self.start, new_goal)
+        )
+
+    def test_unreachable_goal_returns_none(self):
+        """ Walling off the goal should make the planner give up. """
+        self.planner.plan(self.start, self.goal)
+
+        for neighbour in self.grid.neighbours[self.goal]:
+            neighbour_y, neighbour_x = self.grid.to_coord(neighbour)
+            self.matrix[neighbour_y][neighbour_x] = C.NON_WALKABLE_GRID
+        self.grid.refresh()
+
+        path, _ = self.planner.plan(self.start, self.goal)
+
+        self.assertIsNone(path)
+
+    def tearDown(self):
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
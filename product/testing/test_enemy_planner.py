@@ -0,0 +1,146 @@
+import unittest
+
+from agent.competitive_computer import AlphaBetaComputer, ExpectimaxComputer
+from agent.enemy_planner import EnemyPlanner, PlannedEnemyComputer
+from agent.mcts_computer import MCTSComputer
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestEnemyPlanner(CompetitiveSearchTestCase):
+    """ Test one planner search hands every enemy its move, and the enemies
+    only search again once the game leaves the moves behind. """
+
+    all_diamonds = True
+
+    def setUp(self):
+        super().setUp()
+
+        self.enemies = [(1, 9), (3, 13), (5, 1)]
+        self.state["main_agent"] = (5, 6)
+        self.state["enemies"] = self.enemies
+
+    def make_planner(self, computer_class=AlphaBetaComputer, **kwargs):
+        return EnemyPlanner(
+            computer_class,
+            self.matrix,
+            len(self.state["enemies"]),
+            state=self.state,
+            **kwargs
+        )
+
+    def request_every_move(self, planner) -> list:
+        return [
+            planner.request_move(enemy_index, coord)
+            for enemy_index, coord in enumerate(self.state["enemies"], 1)
+        ]
+
+    def test_one_search_moves_every_enemy(self):
+        planner = self.make_planner()
+        actions = self.request_every_move(planner)
+
+        self.assertEqual(planner.searches, 1)
+
+        # Every enemy moves the way the joint search has it move, looking
+        # one round past the last enemy.
+        computer = planner.computer
+        self.assertEqual(computer.search_depth, 5)
+        self.assertEqual(
+            computer.principal_variation[:3],
+            [(1, actions[0]), (2, actions[1]), (3, actions[2])]
+        )
+
+        for coord, action in zip(self.state["enemies"], actions):
+            self.assertIn(action, computer.legal_movements(coord, None))
+
+    def test_search_again_once_an_enemy_is_elsewhere(self):
+        planner = self.make_planner()
+        planner.request_move(1, self.enemies[0])
+
+        # The second enemy did not make it to the grid it was expected on.
+        planner.request_move(2, (5, 8))
+        self.assertEqual(planner.searches, 2)
+
+        # The first enemy is searched for from where it was sent.
+        grid = planner.computer._grid
+        self.assertEqual(planner._moves[1][0], planner._targets[1])
+        self.assertNotEqual(planner._targets[1],
+                            grid.to_index(self.enemies[0]))
+
+    def test_joint_expectimax_minimizes_for_every_enemy(self):
+        planner = self.make_planner(ExpectimaxComputer)
+        computer = planner.computer
+
+        self.assertFalse(computer.controls_agent(0))
+        self.assertTrue(all(computer.controls_agent(enemy_index)
+                            for enemy_index in range(1, 4)))
+
+        self.request_every_move(planner)
+        self.assertEqual(planner.searches, 1)
+        self.assertEqual(
+            [agent_index for agent_index, _ in
+             computer.principal_variation[:4]],
+            [1, 2, 3, 0]
+        )
+
+    def test_enemies_the_search_did_not_reach_chase(self):
+        """ A short search leaves the later enemies to step towards the
+        main agent. """
+        planner = self.make_planner(MCTSComputer, mcts_iterations=1)
+        actions = self.request_every_move(planner)
+
+        self.assertEqual(planner.searches, 1)
+        self.assertEqual(len(planner.computer.principal_variation), 1)
+
+        state = planner.computer.to_game_state(self.state)
+        self.assertEqual(actions[1:],
+                         [planner.chase(state, 2), planner.chase(state, 3)])
+        # The main agent is further along the same floor.
+        self.assertEqual(actions[2], "RIGHT")
+
+    def test_enemy_that_cannot_move_keeps_its_move(self):
+        """ An enemy with no move asks again straight away, which does not
+        search again until the game changes. """
+        planner = self.make_planner()
+        cell = planner.computer._grid.to_index(self.enemies[0])
+        planner._moves[1] = (cell, None)
+        planner._searched_state = planner.state
+
+        for _ in range(3):
+            self.assertIsNone(planner.request_move(1, self.enemies[0]))
+        self.assertEqual(planner.searches, 0)
+
+        planner.update_state({**self.state, "main_agent": (5, 7)})
+        self.assertIsNone(planner.request_move(1, self.enemies[0]))
+        self.assertIsNotNone(planner.request_move(1, self.enemies[0]))
+        self.assertEqual(planner.searches, 1)
+
+    def test_stopping_an_enemy_stops_the_planner(self):
+        planner = self.make_planner()
+        enemy_computer = self.make_computer(PlannedEnemyComputer,
+                                            planner=planner,
+                                            state=self.state,
+                                            agent_type=1)
+
+        enemy_computer.stop_path_find_algo_thread()
+
+        self.assertTrue(planner.computer.stop_thread)
+        self.assertIsNone(planner.request_move(1, self.enemies[0]))
+        self.assertEqual(planner.searches, 0)
+
+    def test_ten_enemies(self):
+        grids = self.world.get_spawn_grids(7, [(5, 6)] + self.enemies)
+        self.state["enemies"] = self.enemies + grids
+
+        planner = self.make_planner()
+        actions = self.request_every_move(planner)
+
+        self.assertEqual(planner.searches, 1)
+        self.assertEqual(planner.computer.search_depth, 12)
+        self.assertEqual(
+            planner.computer.principal_variation[:10],
+            list(zip(range(1, 11), actions))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+from grid_graph import GridGraph
+from agent.game_state import GameState, compile_state, state_to_dict
+
+# Two floors joined by a ladder on the left and on the right, with diamonds
+# on both floors.
+walkable_maze_matrix = [
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 3, 1, 2, 1, 3, 0],
+    [0, 3, 0, 0, 0, 3, 0],
+    [0, 3, 1, 2, 1, 3, 0],
+    [0, 0, 0, 0, 0, 0, 0]
+]
+
+
+class TestGameState(unittest.TestCase):
+    """ Test game state dicts compile into compact states and back. """
+
+    def setUp(self):
+        self.grid = GridGraph([row[:] for row in walkable_maze_matrix])
+        self.state = {
+            "main_agent": (3, 1),
+            "enemies": [(1, 5), (3, 5)],
+            "diamond_coords": [(1, 3), (3, 3)],
+            "score": 0,
+            "win": False,
+            "lose": False,
+            "diamond_count": 0
+        }
+
+    def test_compile_and_back(self):
+        game_state, diamond_cells = compile_state(self.state, self.grid)
+
+        self.assertEqual(game_state.player, self.grid.to_index((3, 1)))
+        self.assertEqual(
+            diamond_cells,
+            (self.grid.to_index((1, 3)), self.grid.to_index((3, 3)))
+        )
+        self.assertEqual(game_state.diamonds, 0b11)
+        self.assertEqual(
+            state_to_dict(game_state, self.grid, diamond_cells),
+            self.state
+        )
+
+    def test_states_are_hashable_values(self):
+        """ Two states for the same positions are equal however they were
+        made, so they can be used as dict keys. """
+        game_state, _ = compile_state(self.state, self.grid)
+        same_state = GameState(
+            self.grid.to_index((3, 1)),
+            (self.grid.to_index((1, 5)), self.grid.to_index((3, 5))),
+            0b11
+        )
+
+        self.assertEqual({game_state: 1}[same_state], 1)
+
+    def test_win_and_lose(self):
+        """ Clearing every diamond is a win even if an enemy is on the
+        player, as it was for the game state dicts. """
+        game_state, _ = compile_state(self.state, self.grid)
+        caught = game_state._replace(player=game_state.enemies[0])
+
+        self.assertFalse(game_state.win or game_state.lose)
+        self.assertTrue(caught.lose)
+        self.assertTrue(caught._replace(diamonds=0).win)
+        self.assertFalse(caught._replace(diamonds=0).lose)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+import unittest
+import pygame
+import pickle
+import numpy as np
+
+import constants as C
+
+from world import World
+from grid_graph import (
+    ACTION_BITS,
+    ALL_ACTIONS,
+    FOLLOW_MASKS,
+    MASK_ACTIONS,
+    GridGraph,
+    UNREACHABLE
+)
+
+# A tiny maze with a ladder, a slow tile and a diamond on the bottom floor.
+walkable_maze_matrix = [
+    [0, 0, 0, 0, 0, 0],
+    [0, 1, 1, 3, 1, 0],
+    [0, 0, 0, 3, 0, 0],
+    [0, 1, 4, 1, 2, 0],
+    [0, 0, 0, 0, 0, 0]
+]
+
+
+class TestGridGraph(unittest.TestCase):
+    """ Test the compiled grid graph matches the walkable matrix it was built
+    from. """
+
+    def setUp(self):
+        self.matrix = [row[:] for row in walkable_maze_matrix]
+        self.grid = GridGraph(self.matrix)
+
+    def test_index_and_coord_conversion(self):
+        """ A coord should survive a round trip through its cell index. """
+        index = self.grid.to_index((3, 4))
+
+        self.assertEqual(index, 3 * 6 + 4)
+        self.assertEqual(self.grid.to_coord(index), (3, 4))
+
+    def test_cell_types_match_matrix(self):
+        """ The flat cell type array should hold the matrix row by row. """
+        self.assertEqual(
+            self.grid.cell_types.tolist(),
+            [cell for row in self.matrix for cell in row]
+        )
+
+    def test_slow_tiles_cost_three(self):
+        """ Stepping onto a slow tile costs 3, other walkable grids cost 1
+        and walls cost nothing as they are never entered. """
+        self.assertEqual(self.grid.step_costs[self.grid.to_index((3, 2))], 3)
+        self.assertEqual(self.grid.step_costs[self.grid.to_index((3, 1))], 1)
+        self.assertEqual(self.grid.step_costs[self.grid.to_index((2, 3))], 1)
+        self.assertEqual(self.grid.step_costs[self.grid.to_index((3, 4))], 1)
+        self.assertEqual(self.grid.step_costs[self.grid.to_index((0, 0))], 0)
+
+    def test_neighbours_are_in_direction_order(self):
+        """ The ladder grid at (2, 3) can reach the grid below and above it,
+        right and left are walls. """
+        neighbours = self.grid.neighbours[self.grid.to_index((2, 3))]
+
+        self.assertEqual(
+            [self.grid.to_coord(i) for i in neighbours],
+            [(3, 3), (1, 3)]
+        )
+
+    def get_moves(self, coord, prev_action=None) -> tuple:
+        mask = self.grid.move_masks[self.grid.to_index(coord)]
+
+        return MASK_ACTIONS[mask & FOLLOW_MASKS.get(prev_action, ALL_ACTIONS)]
+
+    def test_move_masks(self):
+        """ Agents walk onto any walkable grid left and right, climb only
+        onto ladders and never step onto the outer ring. """
+        self.assertEqual(self.get_moves((1, 3)), ("LEFT", "RIGHT", "DOWN"))
+        self.assertEqual(self.get_moves((2, 3)), ("UP",))
+        self.assertEqual(self.get_moves((3, 3)), ("LEFT", "RIGHT", "UP"))
+        self.assertEqual(self.get_moves((1, 1)), ("RIGHT",))
+        self.assertEqual(self.get_moves((0, 0)), ())
+
+        self.assertEqual(
+            self.grid.action_offsets,
+            {"LEFT": -1, "RIGHT": 1, "DOWN": 6, "UP": -6}
+        )
+
+    def test_moves_never_walk_straight_back(self):
+        """ Only going back left is allowed. """
+        self.assertEqual(self.get_moves((1, 3), "LEFT"), ("LEFT", "DOWN"))
+        self.assertEqual(self.get_moves((1, 3), "RIGHT"),
+                         ("LEFT", "RIGHT", "DOWN"))
+        self.assertEqual(self.get_moves((3, 3), "DOWN"), ("LEFT", "RIGHT"))
+        self.assertEqual(self.get_moves((2, 3), "DOWN"), ())
+
+    def test_refresh_recompiles_move_masks(self):
+        self.matrix[1][2] = 0
+        self.grid.refresh()
+
+        self.assertEqual(self.get_moves((1, 3)), ("RIGHT", "DOWN"))
+        self.assertFalse(
+            self.grid.move_masks[self.grid.to_index((1, 1))] &
+            ACTION_BITS["RIGHT"]
+        )
+
+    def test_csr_arrays_match_neighbour_list(self):
+        """ The CSR arrays and the python neighbour list should agree for
+        every cell. """
+        for index in range(self.grid.get_cell_count()):
+            start, end = self.grid.indptr[index], self.grid.indptr[index + 1]
+            self.assertEqual(
+                tuple(self.grid.indices[start:end].tolist()),
+                self.grid.neighbours[index]
+            )
+
+    def test_refresh_picks_up_matrix_changes(self):
+        """ After refreshing, a removed grid should no longer be a neighbour
+        and the revision should change. """
+        revision = self.grid.revision
+        self.matrix[3][4] = C.NON_WALKABLE_GRID
+
+        self.grid.refresh()
+
+        self.assertNotEqual(self.grid.revision, revision)
+        self.assertNotIn(
+            self.grid.to_index((3, 4)),
+            self.grid.neighbours[self.grid.to_index((3, 3))]
+        )
+
+    def test_revision_comes_back_with_layout(self):
+        """ Moving the diamond away and back should give back the revision of
+        the original layout, so cached results for it can be reused. """
+        revision = self.grid.revision
+
+        self.matrix[3][4] = C.WALKABLE_GRID
+        self.matrix[3][1] = C.DIAMOND_GRID
+        self.grid.refresh()
+
+        self.assertNotEqual(self.grid.revision, revision)
+
+        self.matrix[3][4] = C.DIAMOND_GRID
+        self.matrix[3][1] = C.WALKABLE_GRID
+        self.grid.refresh()
+
+        self.assertEqual(self.grid.revision, revision)
+
+    def test_layout_revisions_are_bounded(self):
+        """ Only the most recently seen layouts keep their revision, a
+        dropped layout gets a new one. """
+        revision = self.grid.revision
+
+        for y in range(1, C.LAYOUT_REVISIONS_SIZE + 2):
+            self.grid.get_layout_revision(np.array([y]))
+
+        self.assertLessEqual(len(GridGraph._layout_revisions),
+                             C.LAYOUT_REVISIONS_SIZE)
+        self.grid.refresh()
+        self.assertGreater(self.grid.revision, revision)
+
+    def test_graph_is_shared_per_matrix(self):
+        """ Asking for the graph of the same matrix twice should give the
+        same object. """
+        self.assertIs(
+            GridGraph.for_matrix(self.matrix),
+            GridGraph.for_matrix(self.matrix)
+        )
+
+    def test_distance_table_holds_shortest_paths(self):
+        """ The walk from the top left grid to the diamond goes right to the
+        ladder, down it and then right again. """
+        start = self.grid.to_index((1, 1))
+        diamond = self.grid.to_index((3, 4))
+
+        self.assertEqual(self.grid.get_distance(start, diamond), 5)
+        self.assertEqual(self.grid.get_distance(diamond, start), 5)
+        self.assertEqual(self.grid.get_distance(start, start), 0)
+        self.assertEqual(
+            self.grid.get_distance_table().shape,
+            (len(self.grid.walkable_cells), len(self.grid.walkable_cells))
+        )
+
+    def test_distance_to_cut_off_grid_is_unreachable(self):
+        """ Walls and grids which cannot be reached have no distance. """
+        self.matrix[2][3] = C.NON_WALKABLE_GRID
+        self.grid.refresh()
+
+        start = self.grid.to_index((1, 1))
+
+        self.assertEqual(
+            self.grid.get_distance(start, self.grid.to_index((3, 4))),
+            UNREACHABLE
+        )
+        self.assertEqual(
+            self.grid.get_distance(start, self.grid.to_index((0, 0))),
+            UNREACHABLE
+        )
+
+    def test_distance_table_only_rebuilt_when_walls_change(self):
+        """ Moving a diamond does not change any distances, so the table
+        should be kept. Adding a wall should throw it away. """
+        table = self.grid.get_distance_table()
+
+        self.matrix[3][4] = C.WALKABLE_GRID
+        self.matrix[3][1] = C.DIAMOND_GRID
+        self.grid.refresh()
+
+        self.assertIs(self.grid.get_distance_table(), table)
+
+        self.matrix[1][2] = C.NON_WALKABLE_GRID
+        self.grid.refresh()
+
+        self.assertIsNot(self.grid.get_distance_table(), table)
+
+
+class TestWorldGridGraph(unittest.TestCase):
+    """ Test the world keeps its grid graph in sync with the walkable
+    matrix. """
+
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((1, 1), 0, 32)
+
+        with open('maze/maze_5', 'rb') as file:
+            self.world = World(pickle.load(file))
+
+    def test_world_and_computers_share_graph(self):
+        """ Anyone asking for the graph of the world's matrix should get the
+        world's own graph. """
+        self.assertIs(
+            self.world.get_grid_graph(),
+            GridGraph.for_matrix(self.world.get_walkable_maze_matrix())
+        )
+
+    def test_clear_diamond_refreshes_graph(self):
+        """ Clearing a diamond should be reflected in the graph. """
+        grid = self.world.get_grid_graph()
+        diamond = self.world.get_diamond_group().sprites()[0]
+        index = grid.to_index((diamond.grid_y, diamond.grid_x))
+
+        self.assertEqual(grid.cell_type_list[index], C.DIAMOND_GRID)
+
+        diamond.kill()
+        self.world.clear_diamond(diamond.grid_x, diamond.grid_y)
+
+        self.assertEqual(grid.cell_type_list[index], C.WALKABLE_GRID)
+
+    def tearDown(self):
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
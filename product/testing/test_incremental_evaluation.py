@@ -0,0 +1,82 @@
+import unittest
+import random
+
+from agent.competitive_computer import (
+    MinimaxComputer,
+    AlphaBetaComputer,
+    ExpectimaxComputer
+)
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestIncrementalEvaluation(CompetitiveSearchTestCase):
+    """ Test the evaluation terms carried down the search give exactly the
+    scores of evaluating each state from scratch. """
+
+    all_diamonds = True
+
+    def make_computer(self, computer_class, use_incremental_evaluation):
+        computer = super().make_computer(computer_class)
+        computer.use_incremental_evaluation = use_incremental_evaluation
+        computer.use_transposition_table = False
+
+        return computer
+
+    def test_terms_follow_the_moves(self):
+        """ A random game, with every agent moving in turn, scores the same
+        with and without the terms at every step. """
+        computer = self.make_computer(AlphaBetaComputer, True)
+        state = computer.to_game_state(self.state)
+        rng = random.Random(0)
+
+        self.assertIsNotNone(state.enemy_terms)
+
+        for move in range(2000):
+            agent_index = move % 4
+            cell = (state.player if agent_index == 0
+                    else state.enemies[agent_index - 1])
+            actions = computer.legal_cell_moves(cell, None)
+
+            if actions:
+                state = computer.generate_successor(state, agent_index,
+                                                    rng.choice(actions))
+
+            scratch = state._replace(enemy_terms=None)
+            self.assertEqual(
+                repr(computer.evaluation_function(state, 0, None)),
+                repr(computer.evaluation_function(scratch, 0, None))
+            )
+
+        self.assertGreater(state.diamond_count, 0)
+
+    def test_player_on_a_wall(self):
+        """ A wall reaches nothing, the terms say so as the distance table
+        does. """
+        computer = self.make_computer(AlphaBetaComputer, True)
+        state = computer.to_game_state(self.state)
+        wall = computer._grid.to_index((0, 0))
+        scratch = state._replace(player=wall, enemy_terms=None)
+
+        state = computer.add_evaluation_terms(scratch)
+
+        self.assertEqual(computer.evaluation_function(state, 0, None),
+                         computer.evaluation_function(scratch, 0, None))
+
+    def test_search_is_unchanged(self):
+        for computer_class in (MinimaxComputer, AlphaBetaComputer,
+                               ExpectimaxComputer):
+            incremental = self.make_computer(computer_class, True)
+            scratch = self.make_computer(computer_class, False)
+
+            self.assertEqual(incremental.search_to_depth(self.state, 8),
+                             scratch.search_to_depth(self.state, 8))
+            self.assertEqual(incremental.principal_variation,
+                             scratch.principal_variation)
+            self.assertEqual(incremental.nodes_expanded,
+                             scratch.nodes_expanded)
+
+        self.assertIsNone(scratch.to_game_state(self.state).enemy_terms)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -90,6 +90,45 @@ class TestSmallMazeEnvironment(TestMazeEnvironment, unittest.TestCase):
                           (5, 7), (5, 8), (5, 10), (5, 11), (5, 12), (5, 13),
                           (5, 14)], self.world.get_walkable_locations())
 
+    def test_small_get_spawn_grids(self):
+        """ Check get_spawn_grids() spreads the grids out along the maze,
+        away from the grids already taken and off the ladders. """
+        matrix = self.world.get_walkable_maze_matrix()
+        grids = self.world.get_spawn_grids(6, [(5, 6), (1, 9)])
+
+        self.assertEqual(len(set(grids)), 6)
+        self.assertNotIn((5, 6), grids)
+        self.assertNotIn((1, 9), grids)
+
+        for grid_y, grid_x in grids:
+            self.assertIn(matrix[grid_y][grid_x], (1, 2, 4))
+
+        # The first grid is the one furthest along the maze from both.
+        graph = self.world.get_grid_graph()
+        taken = [graph.to_index((5, 6)), graph.to_index((1, 9))]
+        furthest = max(
+            min(graph.get_distance(graph.to_index(coord), cell)
+                for cell in taken)
+            for coord in self.world.get_walkable_locations(False)
+        )
+        self.assertEqual(
+            min(graph.get_distance(graph.to_index(grids[0]), cell)
+                for cell in taken),
+            furthest
+        )
+
+    def test_small_get_spawn_grids_runs_out(self):
+        """ Check get_spawn_grids() picks every free grid once, and no
+        more, when asked for more grids than there are. """
+        occupied = [(5, 6), (1, 9)]
+        grids = self.world.get_spawn_grids(1000, occupied)
+
+        self.assertLess(len(grids), 1000)
+        self.assertEqual(len(set(grids)), len(grids))
+        self.assertFalse(set(grids) & set(occupied))
+        self.assertEqual(self.world.get_spawn_grids(len(grids) + 1, occupied),
+                         grids)
+
 
 class TestMidMazeEnvironment(TestMazeEnvironment, unittest.TestCase):
     """ This class will test functions and attributes for the medium maze
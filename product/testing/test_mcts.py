@@ -0,0 +1,114 @@
+import unittest
+
+from agent.computer import get_agent_types
+from agent.mcts_computer import MCTSComputer
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestMCTSComputer(CompetitiveSearchTestCase):
+    """ Test the Monte Carlo tree search keeps to its budget and picks legal
+    moves. """
+
+    def make_computer(self, agent_type=0, **kwargs):
+        return super().make_computer(MCTSComputer, agent_type=agent_type,
+                                     seed=0, **kwargs)
+
+    def test_mcts_is_registered(self):
+        self.assertIs(get_agent_types()["mcts"], MCTSComputer)
+
+    def test_iteration_budget(self):
+        computer = self.make_computer(mcts_iterations=50)
+        value, action = computer.choose_action(
+            computer.to_game_state(self.state)
+        )
+
+        self.assertEqual(computer.iterations, 50)
+        self.assertIn(action,
+                      computer.legal_movements(self.state["main_agent"],
+                                               None))
+        self.assertTrue(0 <= value <= 1)
+        # Every iteration expands a node until the tree runs out of moves.
+        self.assertEqual(computer.nodes_expanded, 50)
+        self.assertEqual(computer.principal_variation[0], (0, action))
+
+    def test_seeded_searches_agree(self):
+        actions = []
+        for _ in range(2):
+            computer = self.make_computer(mcts_iterations=50)
+            actions.append(computer.choose_action(
+                computer.to_game_state(self.state)
+            ))
+            actions.append(computer.principal_variation)
+
+        self.assertEqual(actions[:2], actions[2:])
+
+    def test_time_budget(self):
+        """ With a time budget the search runs until it is spent, whatever
+        the iteration count. """
+        computer = self.make_computer(mcts_iterations=1, move_time_ms=50)
+        computer.choose_action(computer.to_game_state(self.state))
+
+        self.assertGreater(computer.iterations, 1)
+
+    def play_first_round(self, computer):
+        """ Search from the test state, then play the first move of every
+        agent along the principal variation. """
+        state = computer.to_game_state(self.state)
+        computer.choose_action(state)
+
+        for agent_index, action in computer.principal_variation[:4]:
+            state = computer.generate_successor(state, agent_index, action)
+
+        return state
+
+    def test_tree_is_reused_along_the_moves_played(self):
+        computer = self.make_computer(mcts_iterations=200)
+        state = self.play_first_round(computer)
+
+        computer.search_statistics.reset()
+        computer.choose_action(state)
+
+        self.assertGreater(computer.reused_visits, 0)
+        self.assertEqual(computer.iterations, 200 - computer.reused_visits)
+        # Plies are counted from the new root.
+        self.assertEqual(
+            sum(computer.search_statistics.report()["nodes_per_ply"]),
+            computer.iterations
+        )
+
+    def test_tree_is_rebuilt_when_the_state_was_not_reached(self):
+        computer = self.make_computer(mcts_iterations=200)
+        self.play_first_round(computer)
+
+        # The agents never move in the tree without the main agent moving.
+        state = computer.to_game_state(self.state)
+        computer.choose_action(state._replace(enemies=state.enemies[::-1]))
+
+        self.assertEqual(computer.reused_visits, 0)
+        self.assertEqual(computer.iterations, 200)
+
+    def test_tree_is_rebuilt_once_a_diamond_is_collected(self):
+        computer = self.make_computer(mcts_iterations=200)
+        state = self.play_first_round(computer)
+
+        self.state["diamond_coords"].pop()
+        computer.to_game_state(self.state)
+        computer.choose_action(state._replace(diamonds=0b111))
+
+        self.assertEqual(computer.reused_visits, 0)
+        self.assertEqual(computer.iterations, 200)
+
+    def test_enemy_searches_from_its_own_side(self):
+        computer = self.make_computer(agent_type=2, mcts_iterations=20)
+        _, action = computer.choose_action(
+            computer.to_game_state(self.state)
+        )
+
+        self.assertEqual(computer.principal_variation[0], (2, action))
+        self.assertIn(action,
+                      computer.legal_movements(self.state["enemies"][1],
+                                               None))
+
+
+if __name__ == '__main__':
+    unittest.main()
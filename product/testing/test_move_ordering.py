@@ -0,0 +1,152 @@
+import unittest
+import json
+
+from agent.competitive_computer import MinimaxComputer, AlphaBetaComputer
+from agent.search_statistics import SearchStatistics, json_value
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestSearchStatistics(unittest.TestCase):
+
+    def test_first_move_cutoff_rate(self):
+        statistics = SearchStatistics()
+        self.assertEqual(statistics.first_move_cutoff_rate, 0)
+
+        for move_number in (0, 0, 0, 2):
+            statistics.record_cutoff(1, move_number)
+
+        self.assertEqual(statistics.cutoffs, 4)
+        self.assertEqual(statistics.first_move_cutoff_rate, 0.75)
+
+        statistics.reset()
+        self.assertEqual(statistics.cutoffs, 0)
+
+    def test_depths_are_counted_as_plies(self):
+        """ The depth left to search counts down from the root, plies
+        count up from it. """
+        statistics = SearchStatistics()
+        statistics.begin_search(3)
+
+        statistics.record_node(3, 0)
+        statistics.record_node(2, 1)
+        statistics.record_node(2, 1)
+        statistics.record_cutoff(2, 1)
+        statistics.record_leaf(1, 0.5)
+
+        report = statistics.report()
+
+        self.assertEqual(report["nodes_per_ply"], [1, 2])
+        self.assertEqual(report["nodes_per_agent"], [1, 2])
+        self.assertEqual(report["cutoffs_per_ply"], [0, 1])
+        self.assertEqual(report["evaluation_ms"], 500)
+        # Four nodes and leaves visited over two plies.
+        self.assertEqual(report["effective_branching_factor"], 2)
+
+    def test_infinite_values_are_written_as_strings(self):
+        self.assertEqual(json_value(float("-inf")), "-inf")
+        self.assertEqual(json_value(1.5), 1.5)
+
+
+class TestMoveOrdering(CompetitiveSearchTestCase):
+    """ Test alpha-beta tries the moves most likely to cut off first, and
+    that it still finds the same value as minimax. """
+
+    def make_computer(self, computer_class, use_move_ordering):
+        computer = super().make_computer(computer_class)
+        computer.use_transposition_table = False
+        computer.use_move_ordering = use_move_ordering
+
+        return computer
+
+    def test_table_move_comes_first(self):
+        computer = self.make_computer(AlphaBetaComputer, True)
+        computer.use_transposition_table = True
+        state = computer.to_game_state(self.state)
+        actions = computer.legal_movements(self.state["main_agent"], None)
+
+        # The table move is tried before a killer move.
+        key = computer.get_transposition_key(state, 0, None, None)
+        computer.record_cutoff(state, 4, 0, actions[0], 1)
+        computer.transposition_table.store(key, 1, 0, actions[-1], 1)
+
+        self.assertEqual(
+            computer.order_moves(actions, state, 4, 0, None, None),
+            [actions[-1]] + actions[:-1]
+        )
+
+    def test_killer_moves_are_kept_per_depth(self):
+        computer = self.make_computer(AlphaBetaComputer, True)
+        state = computer.to_game_state(self.state)
+        actions = computer.legal_movements(self.state["main_agent"], None)
+
+        computer.record_cutoff(state, 4, 0, actions[-1], 1)
+
+        self.assertEqual(
+            computer.order_moves(actions, state, 4, 0, None, None)[0],
+            actions[-1]
+        )
+        self.assertEqual(computer._killers, {4: [actions[-1]]})
+        self.assertEqual(computer._history[(0, state.player, actions[-1])],
+                         16)
+        self.assertEqual(computer.search_statistics.cutoffs, 1)
+        self.assertEqual(computer.search_statistics.first_move_cutoffs, 0)
+
+    def test_without_ordering_moves_keep_their_order(self):
+        computer = self.make_computer(AlphaBetaComputer, False)
+        state = computer.to_game_state(self.state)
+        actions = computer.legal_movements(self.state["main_agent"], None)
+
+        self.assertEqual(
+            computer.order_moves(actions, state, 4, 0, None, None),
+            actions
+        )
+
+    def test_ordering_keeps_the_value_and_prunes_more(self):
+        minimax = self.make_computer(MinimaxComputer, False)
+        unordered = self.make_computer(AlphaBetaComputer, False)
+        ordered = self.make_computer(AlphaBetaComputer, True)
+
+        value, _ = minimax.minimax(self.state, depth=8, agent_index=0)
+
+        self.assertEqual(
+            unordered.minimax(self.state, depth=8, agent_index=0)[0], value
+        )
+        self.assertEqual(
+            ordered.minimax(self.state, depth=8, agent_index=0)[0], value
+        )
+        self.assertLessEqual(ordered.nodes_expanded,
+                             unordered.nodes_expanded)
+        self.assertLess(ordered.nodes_expanded, minimax.nodes_expanded)
+
+        statistics = ordered.search_statistics
+        self.assertGreater(statistics.cutoffs, 0)
+        self.assertEqual(statistics.nodes,
+                         ordered.nodes_expanded)
+
+    def test_search_report(self):
+        """ The report is plain JSON, and the principal variation starts
+        with the move the search chose and goes as deep as the search. """
+        computer = self.make_computer(AlphaBetaComputer, True)
+
+        value, action = computer.search_to_depth(self.state, 8)
+        report = json.loads(json.dumps(
+            computer.get_search_report(value, action, 0.1),
+            allow_nan=False
+        ))
+
+        self.assertEqual(report["depth"], 8)
+        self.assertEqual(report["principal_variation"][0], [0, action])
+        self.assertEqual(len(report["principal_variation"]), 8)
+        self.assertEqual(
+            [agent for agent, _ in report["principal_variation"][:4]],
+            [0, 1, 2, 3]
+        )
+        self.assertEqual(len(report["nodes_per_ply"]), 8)
+        self.assertEqual(sum(report["nodes_per_agent"]),
+                         computer.nodes_expanded)
+        self.assertGreater(report["leaf_evaluations"], 0)
+        self.assertEqual(report["search_ms"], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
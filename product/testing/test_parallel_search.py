@@ -0,0 +1,63 @@
+import unittest
+
+from agent.competitive_computer import MinimaxComputer, ExpectimaxComputer
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestRootParallelSearch(CompetitiveSearchTestCase):
+    """ Test searching the root moves on worker processes picks the same move
+    as searching them one after another. """
+
+    def setUp(self):
+        super().setUp()
+        self.computers = []
+
+    def make_computer(self, computer_class, agent_type, search_workers):
+        computer = super().make_computer(computer_class,
+                                         agent_type=agent_type,
+                                         search_workers=search_workers)
+        # Without the table the values are exactly those of a plain search.
+        computer.use_transposition_table = False
+        self.computers.append(computer)
+
+        return computer
+
+    def test_parallel_search_matches_serial_search(self):
+        for computer_class in (MinimaxComputer, ExpectimaxComputer):
+            for agent_type in (0, 2):
+                serial = self.make_computer(computer_class, agent_type, None)
+                parallel = self.make_computer(computer_class, agent_type, 2)
+
+                self.assertEqual(parallel.search_to_depth(self.state, 8),
+                                 serial.search_to_depth(self.state, 8))
+                self.assertEqual(parallel.nodes_expanded,
+                                 serial.nodes_expanded)
+                self.assertEqual(parallel.principal_variation,
+                                 serial.principal_variation)
+                self.assertEqual(
+                    parallel.search_statistics.nodes_per_ply,
+                    serial.search_statistics.nodes_per_ply
+                )
+
+    def test_iterative_deepening_on_workers(self):
+        """ The workers give up when the time for the move runs out, and
+        the deepest search that finished is used. """
+        computer = self.make_computer(MinimaxComputer, 0, 2)
+        computer.move_time_ms = 200
+
+        _, action = computer.iterative_deepening(
+            computer.to_game_state(self.state)
+        )
+
+        self.assertGreaterEqual(computer.search_depth, 1)
+        self.assertIn(action, ["LEFT", "RIGHT", "UP", "DOWN"])
+        self.assertIsNone(computer._deadline)
+
+    def tearDown(self):
+        for computer in self.computers:
+            computer.close_search_pool()
+        super().tearDown()
+
+
+if __name__ == '__main__':
+    unittest.main()
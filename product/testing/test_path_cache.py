@@ -0,0 +1,145 @@
+import unittest
+import pygame
+import pickle
+
+import constants as C
+
+from agent.uninformed_computer import BFSComputer
+from agent.informed_computer import AStarComputer
+from characters.character import get_character_types
+from path_cache import PathCache
+from world import World
+from constants import player_sprite_file_paths
+
+CHARACTER_WIDTH = 32
+CHARACTER_HEIGHT = 32
+
+
+class TestPathCache(unittest.TestCase):
+    """ Test the LRU behaviour of the path cache on its own. """
+
+    def test_hits_and_misses_are_counted(self):
+        cache = PathCache(max_size=2)
+
+        self.assertIsNone(cache.get(("bfs", 1, 2, 1)))
+        cache.put(("bfs", 1, 2, 1), [(0, 1), (0, 2)], [1, 2])
+
+        self.assertEqual(cache.get(("bfs", 1, 2, 1)), ([(0, 1), (0, 2)],
+                                                       [1, 2]))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_entry_is_dropped(self):
+        """ Reading the first entry makes the second one the oldest, so it
+        is the one dropped when a third entry is added. """
+        cache = PathCache(max_size=2)
+        cache.put("first", [], [])
+        cache.put("second", [], [])
+        cache.get("first")
+        cache.put("third", [], [])
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+        self.assertIsNotNone(cache.get("third"))
+
+
+class TestComputerPathCache(unittest.TestCase):
+    """ Test the computers use the path cache, and that a changed maze never
+    gets a stale path. """
+
+    with open('maze/maze_1', 'rb') as file:
+        maze_map = pickle.load(file)
+
+    def setUp(self):
+        pygame.init()
+        pygame.display.set_mode((1, 1), 0, 32)
+
+        self.player = get_character_types()["main"](
+            CHARACTER_WIDTH,
+            CHARACTER_HEIGHT,
+            self.maze_map, True,
+            300, 300
+        )
+        self.player.set_char_animation("idle",
+                                       player_sprite_file_paths["idle"], 4)
+
+        self.world = World(self.maze_map)
+        self.cache = PathCache()
+
+        self.computer = BFSComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            perform_analysis=True,
+            path_cache=self.cache
+        )
+        self.computer.stop_thread = True
+
+    def test_repeated_search_is_a_hit(self):
+        path = self.computer.get_path()
+
+        other = BFSComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            perform_analysis=True,
+            path_cache=self.cache
+        )
+        other.stop_thread = True
+
+        self.assertEqual(other.get_path(), path)
+        self.assertEqual(self.computer.tracker.path_cache_misses, 1)
+        self.assertEqual(other.tracker.path_cache_hits, 1)
+        self.assertEqual(other.tracker.total_path_length, len(path))
+
+    def test_replanning_the_same_path_is_counted_once(self):
+        """ While an enemy is in the way the computer keeps asking for the
+        path it is already following, which is not a new path. """
+        path = self.computer.get_path()
+
+        for _ in range(3):
+            self.assertEqual(self.computer.get_path(), path)
+
+        self.assertEqual(self.cache.hits, 3)
+        self.assertEqual(self.computer.tracker.path_cache_hits, 0)
+        self.assertEqual(self.computer.tracker.total_path_length, len(path))
+
+    def test_changed_maze_is_a_miss(self):
+        """ Blocking a grid on the path changes the revision, so the next
+        search must not reuse the old path. """
+        path = self.computer.get_path()
+
+        blocked_y, blocked_x = path[len(path) // 2]
+        matrix = self.world.get_walkable_maze_matrix()
+        old_value = matrix[blocked_y][blocked_x]
+        matrix[blocked_y][blocked_x] = C.NON_WALKABLE_GRID
+        self.world.get_grid_graph().refresh()
+
+        self.computer.get_path()
+
+        self.assertEqual(self.computer.tracker.path_cache_misses, 2)
+        self.assertEqual(self.computer.tracker.path_cache_hits, 0)
+
+        matrix[blocked_y][blocked_x] = old_value
+        self.world.get_grid_graph().refresh()
+
+    def test_algorithms_do_not_share_entries(self):
+        """ A* searching the same start and goal should not get the BFS
+        path back. """
+        self.computer.get_path()
+
+        a_star = AStarComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            diamond=self.world.get_diamond_group().sprites()[0],
+            path_cache=self.cache
+        )
+        a_star.stop_thread = True
+        a_star.get_path()
+
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def tearDown(self):
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
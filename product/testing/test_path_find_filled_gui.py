@@ -152,6 +152,20 @@ class TestGreedyGUIComputer(TestFilledGUIComputer, unittest.TestCase):
         )
 
 
+class TestGreedyMultiTargetGUIComputer(TestFilledGUIComputer,
+                                       unittest.TestCase):
+    """ This tests the greedy search algo in multi target mode in a filled
+    maze environment. """
+    def setUp(self):
+        super().setUp(pos_x=100, pos_y=100)
+        self.computer = GreedyComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            diamond_list=self.world.get_diamond_group(),
+            multi_target=True
+        )
+
+
 class TestAStarFilledGUIComputer(TestFilledGUIComputer, unittest.TestCase):
     """ This tests the A* search algo in a filled maze environment. """
     def setUp(self):
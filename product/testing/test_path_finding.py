@@ -2,8 +2,19 @@ import unittest
 import pygame
 import pickle
 
-from agent.uninformed_computer import DFSComputer, BFSComputer, UCSComputer
-from agent.informed_computer import AStarComputer
+from agent.uninformed_computer import (
+    DFSComputer,
+    BFSComputer,
+    BidirectionalBFSComputer,
+    UCSComputer
+)
+from agent.informed_computer import (
+    AStarComputer,
+    BidirectionalAStarComputer,
+    DStarLiteComputer,
+    JumpPointComputer,
+    PlatformGraphComputer
+)
 from characters.character import get_character_types
 
 from world import World
@@ -106,6 +117,62 @@ class TestComputerSmallMaze(TestComputer, unittest.TestCase):
                           (3, 9), (3, 10), (3, 11), (3, 12), (3, 13), (3, 14)])
         computer.stop_thread = True
 
+    def test_bidirectional_bfs_can_find_path_in_small_maze(self):
+        computer = BidirectionalBFSComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix()
+        )
+        computer.stop_thread = True
+        path = computer.generate_path()
+        self.assertEqual(path,
+                         [(5, 5), (5, 6), (5, 7), (5, 8), (5, 9), (4, 9),
+                          (3, 9), (3, 10), (3, 11), (3, 12), (3, 13), (3, 14)])
+
+    def test_bidirectional_a_star_can_find_path_in_small_maze(self):
+        computer = BidirectionalAStarComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            diamond=self.diamond
+        )
+        computer.stop_thread = True
+        path = computer.generate_path()
+        self.assertEqual(path,
+                         [(5, 5), (5, 6), (5, 7), (5, 8), (5, 9), (4, 9),
+                          (3, 9), (3, 10), (3, 11), (3, 12), (3, 13), (3, 14)])
+
+    def test_jps_can_find_path_in_small_maze(self):
+        computer = JumpPointComputer(self.player,
+                                     self.world.get_walkable_maze_matrix(),
+                                     diamond=self.diamond)
+        computer.stop_thread = True
+        path = computer.generate_path()
+        self.assertEqual(path,
+                         [(5, 5), (5, 6), (5, 7), (5, 8), (5, 9), (4, 9),
+                          (3, 9), (3, 10), (3, 11), (3, 12), (3, 13), (3, 14)])
+
+    def test_platform_graph_can_find_path_in_small_maze(self):
+        computer = PlatformGraphComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            diamond=self.diamond
+        )
+        computer.stop_thread = True
+        path = computer.generate_path()
+        self.assertEqual(path,
+                         [(5, 5), (5, 6), (5, 7), (5, 8), (5, 9), (4, 9),
+                          (3, 9), (3, 10), (3, 11), (3, 12), (3, 13), (3, 14)])
+
+    def test_d_star_lite_can_find_path_in_small_maze(self):
+        computer = DStarLiteComputer(self.player,
+                                     self.world.get_walkable_maze_matrix(),
+                                     diamond=self.diamond)
+        computer.stop_thread = True
+        path = computer.generate_path()
+        self.assertEqual(path,
+                         [(5, 5), (5, 6), (5, 7), (5, 8), (5, 9), (4, 9),
+                          (3, 9), (3, 10), (3, 11), (3, 12), (3, 13), (3, 14)])
+        computer.stop_thread = True
+
 
 class TestComputerMidMaze(TestComputer, unittest.TestCase):
     """ Test path finding algorithms can work on a mid size maze. """
@@ -122,9 +189,9 @@ class TestComputerMidMaze(TestComputer, unittest.TestCase):
         path = computer.generate_path()
         computer.stop_thread = True
         self.assertEqual(path,
-                         [(5, 6), (5, 7), (5, 8), (5, 9), (6, 9), (7, 9),
-                          (7, 10), (7, 11), (7, 12), (7, 13), (7, 14),
-                          (7, 15), (7, 16), (7, 17), (7, 18)])
+                         [(5, 6), (5, 7), (5, 8), (5, 9), (5, 10), (5, 11),
+                          (5, 12), (5, 13), (5, 14), (5, 15), (5, 16),
+                          (5, 17), (6, 17), (7, 17), (7, 18)])
         computer.stop_thread = True
 
     def test_dfs_can_find_path_in_mid_maze(self):
@@ -241,6 +308,55 @@ class TestComputerLargeMaze(TestComputer, unittest.TestCase):
 
         computer.stop_thread = True
 
+    def test_bidirectional_searches_in_large_maze(self):
+        """ Both bidirectional searches should find a path as short as the
+        one way searches, while expanding fewer grids. """
+        bfs = BFSComputer(self.player, self.world.get_walkable_maze_matrix())
+        bfs.stop_thread = True
+        bfs_path = bfs.generate_path()
+
+        for computer in (
+            BidirectionalBFSComputer(
+                self.player,
+                self.world.get_walkable_maze_matrix()
+            ),
+            BidirectionalAStarComputer(
+                self.player,
+                self.world.get_walkable_maze_matrix(),
+                diamond=self.diamond
+            )
+        ):
+            computer.stop_thread = True
+            path = computer.generate_path()
+
+            self.assertEqual(path[0], (11, 9))
+            self.assertEqual(path[-1], (7, 18))
+            self.assertEqual(len(path), len(bfs_path))
+            self.assertLess(
+                len(computer.get_visited_grids_and_path_to_goal()[0]),
+                len(bfs.get_visited_grids_and_path_to_goal()[0])
+            )
+
+    def test_jps_can_find_path_in_large_maze(self):
+        """ Jump point search finds a cheaper path than A* here, by going
+        left to the ladder instead of right. """
+        computer = JumpPointComputer(
+            self.player,
+            self.world.get_walkable_maze_matrix(),
+            diamond=self.diamond
+        )
+
+        computer.stop_thread = True
+        path = computer.generate_path()
+
+        self.assertEqual(
+            path,
+            [(11, 9), (11, 8), (11, 7), (11, 6), (11, 5), (11, 4), (10, 4),
+             (9, 4), (9, 5), (9, 6), (9, 7), (9, 8), (9, 9), (8, 9), (7, 9),
+             (7, 10), (7, 11), (7, 12), (7, 13), (7, 14), (7, 15), (7, 16),
+             (7, 17), (7, 18)]
+        )
+
 
 class TestExtraUCSPathFinding(TestComputer, unittest.TestCase):
     """ Test to see if the UCS algorithm will actually choose the most
@@ -389,12 +505,12 @@ class TestVisitedGrids(TestComputer, unittest.TestCase):
                           (3, 11), (7, 13), (9, 11), (9, 7), (7, 5),
                           (3, 9), (1, 7), (1, 1), (5, 16), (3, 14),
                           (3, 10), (7, 14), (9, 12), (9, 6), (7, 4),
-                          (3, 10), (1, 8), (5, 17), (3, 15), (7, 15),
-                          (9, 13), (9, 5), (7, 3), (1, 9), (5, 18),
-                          (6, 17), (3, 16), (7, 16), (9, 14), (9, 4),
-                          (7, 2), (1, 10), (5, 19), (7, 17), (3, 17),
-                          (7, 17), (9, 15), (10, 4), (9, 3), (7, 1),
-                          (1, 11), (5, 20), (7, 18)])
+                          (1, 8), (5, 17), (3, 15), (7, 15), (9, 13),
+                          (9, 5), (7, 3), (1, 9), (5, 18), (6, 17),
+                          (3, 16), (7, 16), (9, 14), (9, 4), (7, 2),
+                          (1, 10), (5, 19), (7, 17), (3, 17), (9, 15),
+                          (10, 4), (9, 3), (7, 1), (1, 11), (5, 20),
+                          (7, 18)])
         computer.stop_thread = True
 
     def test_get_visited_grids_on_ucs(self):
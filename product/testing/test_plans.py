@@ -0,0 +1,114 @@
+import unittest
+
+from agent.competitive_computer import AlphaBetaComputer
+from agent.game_state import state_to_dict
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestPlans(CompetitiveSearchTestCase):
+    """ Test the competitive computers follow the principal variation of a
+    search while the game goes the way it expected, and search again once
+    it does not. """
+
+    def setUp(self):
+        super().setUp()
+        self.player = self.make_player()
+
+    def make_computer(self, num_characters=4, plan_horizon=None):
+        return super().make_computer(
+            AlphaBetaComputer,
+            self.player,
+            num_characters=num_characters,
+            state=self.state,
+            plan_horizon=plan_horizon
+        )
+
+    def search_and_plan(self, computer, depth):
+        state = computer.to_game_state(self.state)
+        _, action = computer.search_to_depth(state, depth)
+        computer.make_plan(state, action)
+
+        return state
+
+    def test_plan_holds_the_later_moves_of_the_agent(self):
+        computer = self.make_computer()
+        state = self.search_and_plan(computer, 12)
+        variation = computer.principal_variation
+
+        # The agent moves again at plies 4 and 8 of the variation.
+        self.assertEqual([action for _, action in computer._plan],
+                         [variation[4][1], variation[8][1]])
+
+        for agent_index, action in variation[:4]:
+            state = computer.generate_successor(state, agent_index, action)
+
+        self.assertEqual(computer._plan[0][0], state)
+        self.assertEqual(computer.follow_plan(state), (state, variation[4][1]))
+        self.assertEqual(computer.searches_avoided, 1)
+        self.assertEqual(len(computer._plan), 1)
+
+    def test_plan_horizon(self):
+        computer = self.make_computer(plan_horizon=2)
+        self.search_and_plan(computer, 12)
+        self.assertEqual(len(computer._plan), 1)
+
+        computer = self.make_computer(plan_horizon=1)
+        self.search_and_plan(computer, 12)
+        self.assertEqual(computer._plan, [])
+
+    def test_no_plan_from_a_variation_of_another_move(self):
+        computer = self.make_computer()
+        state = self.search_and_plan(computer, 12)
+        action = computer.principal_variation[0][1]
+
+        computer.make_plan(state, "UP" if action != "UP" else "DOWN")
+        self.assertEqual(computer._plan, [])
+
+    def test_plan_is_given_up_when_an_enemy_moves_elsewhere(self):
+        computer = self.make_computer()
+        self.search_and_plan(computer, 12)
+
+        expected = computer._plan[0][0]
+        state = expected._replace(enemies=expected.enemies[::-1])
+
+        self.assertIsNone(computer.follow_plan(state))
+        self.assertEqual(computer._plan, [])
+        self.assertEqual(computer.plans_invalidated, 1)
+        self.assertEqual(computer.searches_avoided, 0)
+
+    def test_plan_is_given_up_once_a_diamond_is_taken(self):
+        computer = self.make_computer()
+        self.search_and_plan(computer, 12)
+
+        expected = computer._plan[0][0]
+        self.state["diamond_coords"].pop()
+        computer.to_game_state(self.state)
+
+        self.assertIsNone(computer.follow_plan(expected))
+        self.assertEqual(computer.plans_invalidated, 1)
+
+    def test_generate_path_skips_the_search_while_on_plan(self):
+        """ With one enemy the default depth reaches the next move of the
+        main agent, so every other move comes from the plan. """
+        self.state["enemies"] = [(8, 26)]
+        computer = self.make_computer(num_characters=2)
+
+        computer.generate_path()
+        nodes = computer.nodes_expanded
+        expected, action = computer._plan[0]
+
+        computer.update_state(state_to_dict(expected, computer._grid,
+                                            computer._diamond_cells))
+        computer.generate_path()
+
+        self.assertEqual(computer._prev_action, action)
+        self.assertEqual(computer.nodes_expanded, nodes)
+        self.assertEqual(computer.searches_avoided, 1)
+
+        # The plan is used up, so the next move is searched for.
+        computer.generate_path()
+        self.assertGreater(computer.nodes_expanded, nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+import constants as C
+
+from grid_graph import GridGraph
+from platform_graph import PlatformGraph
+from agent.search_kernels import nearest_goal_search
+
+# Two floors joined by a ladder on the left and on the right, with a diamond
+# in the middle of the bottom floor and a slow tile on the top floor.
+walkable_maze_matrix = [
+    [0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 3, 1, 4, 1, 1, 3, 0],
+    [0, 3, 0, 0, 0, 0, 3, 0],
+    [0, 3, 1, 1, 2, 1, 3, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0]
+]
+
+
+def edge_summary(platform_graph) -> list:
+    """ The edges of a graph as sorted (node, node, cells) tuples, so two
+    graphs can be compared whatever their edge ids are. """
+    summary = []
+
+    for node_1, cells, node_2 in platform_graph.edges.values():
+        if node_1 > node_2:
+            node_1, cells, node_2 = node_2, cells[::-1], node_1
+        summary.append((node_1, node_2, cells))
+
+    return sorted(summary)
+
+
+class TestPlatformGraph(unittest.TestCase):
+    """ Test the contracted graph keeps only the grids where a path can
+    branch, and stays exact as diamonds come and go. """
+
+    def setUp(self):
+        self.matrix = [row[:] for row in walkable_maze_matrix]
+        self.grid = GridGraph(self.matrix)
+        self.platform_graph = PlatformGraph(self.grid)
+
+    def test_only_corners_and_diamonds_are_nodes(self):
+        """ Every grid is in a single loop, so only the diamond has to be a
+        node. The rest of the loop is one edge from the diamond back to
+        itself. """
+        self.assertEqual(
+            self.platform_graph.nodes,
+            {self.grid.to_index((3, 4))}
+        )
+        self.assertEqual(len(self.platform_graph.edges), 1)
+
+    def test_path_matches_dijkstra(self):
+        """ The top floor has a slow tile, so the cheapest way from the top
+        left to the bottom right goes down the left ladder. """
+        grid = self.grid
+        start, goal = grid.to_index((1, 2)), grid.to_index((3, 5))
+
+        path, visited = self.platform_graph.find_path(start, goal)
+
+        goal_cells = bytearray(grid.get_cell_count())
+        goal_cells[goal] = 1
+        _, _, dijkstra_visited = nearest_goal_search(grid, start,
+                                                     goal_cells)
+        cost = sum(grid.step_cost_list[cell] for cell in path[1:])
+
+        self.assertEqual(path[0], start)
+        self.assertEqual(path[-1], goal)
+        self.assertEqual(cost, 7)
+        self.assertIn(grid.to_index((2, 1)), path)
+        self.assertLess(len(visited), len(dijkstra_visited))
+
+    def test_start_and_goal_inside_the_same_edge(self):
+        grid = self.grid
+        start, goal = grid.to_index((1, 2)), grid.to_index((1, 5))
+
+        path, _ = self.platform_graph.find_path(start, goal)
+
+        self.assertEqual(
+            [grid.to_coord(cell) for cell in path],
+            [(1, 2), (1, 3), (1, 4), (1, 5)]
+        )
+
+    def test_diamond_changes_are_patched_locally(self):
+        """ Moving the diamond should split and merge edges, and leave the
+        graph the same as one built from scratch. """
+        self.matrix[3][4] = C.WALKABLE_GRID
+        self.matrix[1][4] = C.DIAMOND_GRID
+        self.grid.refresh()
+        self.platform_graph.sync()
+
+        rebuilt = PlatformGraph(self.grid)
+
+        self.assertEqual(self.platform_graph.nodes, rebuilt.nodes)
+        self.assertEqual(
+            edge_summary(self.platform_graph),
+            edge_summary(rebuilt)
+        )
+
+    def test_wall_change_rebuilds(self):
+        """ Blocking the top floor splits the loop, so both ends of the gap
+        become dead ends. """
+        self.matrix[1][4] = C.NON_WALKABLE_GRID
+        self.grid.refresh()
+        self.platform_graph.sync()
+
+        self.assertEqual(
+            self.platform_graph.nodes,
+            {self.grid.to_index(coord) for coord in ((1, 3), (1, 5), (3, 4))}
+        )
+
+        path, _ = self.platform_graph.find_path(
+            self.grid.to_index((1, 3)),
+            self.grid.to_index((1, 5))
+        )
+
+        self.assertEqual(len(path), 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,380 @@
+import unittest
+
+import constants as C
+
+from grid_graph import GridGraph, NO_CELL
+from agent.search_kernels import (
+    breadth_first_search,
+    depth_first_search,
+    best_first_search,
+    nearest_goal_search,
+    jump_point_search,
+    fill_jump_path,
+    bidirectional_breadth_first_search,
+    bidirectional_a_star_search,
+    OpenList
+)
+
+# Two floors joined by a ladder on the left and on the right, with a diamond
+# in the middle of the bottom floor.
+walkable_maze_matrix = [
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 3, 1, 1, 1, 3, 0],
+    [0, 3, 0, 0, 0, 3, 0],
+    [0, 3, 1, 2, 1, 3, 0],
+    [0, 0, 0, 0, 0, 0, 0]
+]
+
+
+def open_maze(size) -> list:
+    """ Build a square maze where every grid inside the border walls is
+    walkable, with a diamond in the bottom right corner. """
+    matrix = [[C.WALKABLE_GRID] * size for _ in range(size)]
+
+    for i in range(size):
+        matrix[0][i] = matrix[-1][i] = C.NON_WALKABLE_GRID
+        matrix[i][0] = matrix[i][-1] = C.NON_WALKABLE_GRID
+
+    matrix[size - 2][size - 2] = C.DIAMOND_GRID
+
+    return matrix
+
+
+def trace(grid, parents, goal) -> list:
+    """ Follow the parent array back from the goal to the start. """
+    path = []
+
+    while goal != NO_CELL:
+        path.append(grid.to_coord(goal))
+        goal = parents[goal]
+
+    return path[::-1]
+
+
+class TestSearchKernels(unittest.TestCase):
+    """ Test the bitmap based search kernels. """
+
+    def setUp(self):
+        self.grid = GridGraph([row[:] for row in walkable_maze_matrix])
+        self.start = self.grid.to_index((1, 3))
+
+    def test_bfs_finds_shortest_path(self):
+        goal, parents, _ = breadth_first_search(
+            self.grid,
+            self.start,
+            self.grid.diamond_cells
+        )
+
+        self.assertEqual(goal, self.grid.to_index((3, 3)))
+        self.assertEqual(
+            trace(self.grid, parents, goal),
+            [(1, 3), (1, 4), (1, 5), (2, 5), (3, 5), (3, 4), (3, 3)]
+        )
+
+    def test_dfs_finds_a_path(self):
+        goal, parents, visit_order = depth_first_search(
+            self.grid,
+            self.start,
+            self.grid.diamond_cells
+        )
+
+        path = trace(self.grid, parents, goal)
+
+        self.assertEqual(path[0], (1, 3))
+        self.assertEqual(path[-1], (3, 3))
+        self.assertEqual(len(visit_order), len(set(visit_order)))
+
+    def test_no_goal_returns_no_cell(self):
+        """ When no goal can be reached every reachable grid is visited
+        exactly once. """
+        goal, _, visit_order = breadth_first_search(
+            self.grid,
+            self.start,
+            bytearray(self.grid.get_cell_count())
+        )
+
+        self.assertEqual(goal, NO_CELL)
+        self.assertEqual(len(visit_order), 12)
+        self.assertEqual(len(visit_order), len(set(visit_order)))
+
+    def test_kernels_visit_each_cell_once_in_open_maze(self):
+        """ In an open maze every grid has many neighbours that reach it, the
+        kernels should still only visit it once. """
+        grid = GridGraph(open_maze(120))
+        start = grid.to_index((1, 1))
+
+        for kernel in (breadth_first_search, depth_first_search):
+            goal, _, visit_order = kernel(grid, start, grid.diamond_cells)
+
+            self.assertEqual(goal, grid.to_index((118, 118)))
+            self.assertEqual(len(visit_order), len(set(visit_order)))
+            self.assertLessEqual(len(visit_order), 118 * 118)
+
+
+class TestOpenList(unittest.TestCase):
+    """ Test the heap based open list used by UCS and A*. """
+
+    def test_stale_entries_are_skipped(self):
+        """ Pushing a cheaper priority for a cell should replace the old
+        entry, so the cell only comes off the list once. """
+        open_list = OpenList(4)
+        open_list.push(5, 2)
+        open_list.push(3, 1)
+        open_list.push(1, 2)
+
+        self.assertEqual(open_list.pop(), (1, 2))
+        self.assertEqual(open_list.pop(), (3, 1))
+        self.assertFalse(open_list)
+
+    def test_ties_are_broken_by_cell_index(self):
+        open_list = OpenList(4)
+        open_list.push(2, 3)
+        open_list.push(2, 0)
+
+        self.assertEqual(open_list.pop(), (2, 0))
+        self.assertEqual(open_list.pop(), (2, 3))
+
+    def test_closed_cells_are_not_pushed_again(self):
+        open_list = OpenList(4)
+        open_list.push(2, 1)
+        open_list.pop()
+
+        self.assertFalse(open_list.push(0, 1))
+        self.assertFalse(open_list)
+
+
+class TestBestFirstSearch(unittest.TestCase):
+    """ Test the shared UCS/A* kernel. """
+
+    def test_slow_tiles_are_avoided(self):
+        """ The direct route along the bottom floor crosses three slow tiles
+        and costs 10, going round over the ladders costs 8. """
+        grid = GridGraph([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 3, 1, 1, 1, 3, 0],
+            [0, 3, 0, 0, 0, 3, 0],
+            [0, 3, 4, 4, 4, 1, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        goal = grid.to_index((3, 5))
+
+        found, parents, _ = best_first_search(
+            grid,
+            grid.to_index((3, 1)),
+            goal
+        )
+
+        path = trace(grid, parents, found)
+
+        self.assertEqual(found, goal)
+        self.assertIn((1, 3), path)
+        self.assertEqual(
+            sum(grid.step_cost_list[grid.to_index(c)] for c in path[1:]),
+            8
+        )
+
+
+class TestNearestGoalSearch(unittest.TestCase):
+    """ Test the multi target Dijkstra search finds the diamond that is
+    really the nearest, not the one that looks nearest. """
+
+    def setUp(self):
+        # The top diamond is 2 grids away by manhattan distance but 6 steps
+        # away round the ladder, the right diamond is 4 steps away.
+        self.matrix = [
+            [0, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 3, 1, 2, 0, 0, 0, 0, 0],
+            [0, 3, 0, 0, 0, 0, 0, 0, 0],
+            [0, 3, 1, 1, 1, 1, 1, 2, 0],
+            [0, 0, 0, 0, 0, 0, 0, 0, 0]
+        ]
+
+    def test_nearest_diamond_by_steps_is_chosen(self):
+        grid = GridGraph(self.matrix)
+
+        goal, parents, _ = nearest_goal_search(
+            grid,
+            grid.to_index((3, 3)),
+            grid.diamond_cells
+        )
+
+        self.assertEqual(goal, grid.to_index((3, 7)))
+        self.assertEqual(
+            trace(grid, parents, goal),
+            [(3, 3), (3, 4), (3, 5), (3, 6), (3, 7)]
+        )
+
+    def test_slow_tiles_count_towards_distance(self):
+        """ Two slow tiles make the right diamond cost 8, so the top diamond
+        at a cost of 6 is now the nearest. """
+        self.matrix[3][4] = self.matrix[3][5] = C.SLOW_GRID
+        grid = GridGraph(self.matrix)
+
+        goal, parents, _ = nearest_goal_search(
+            grid,
+            grid.to_index((3, 3)),
+            grid.diamond_cells
+        )
+
+        self.assertEqual(goal, grid.to_index((1, 3)))
+        self.assertEqual(len(trace(grid, parents, goal)), 7)
+
+
+class TestJumpPointSearch(unittest.TestCase):
+    """ Test jump point search finds the cheapest path while only stopping
+    where the path can branch. """
+
+    def setUp(self):
+        self.grid = GridGraph([row[:] for row in walkable_maze_matrix])
+
+    def test_jump_table_crosses_corridor(self):
+        """ From the top left ladder the top floor is one jump to the right
+        hand ladder. """
+        grid = self.grid
+        landing, cost = grid.get_jump_table()[grid.to_index((1, 1))][0]
+
+        self.assertEqual(landing, grid.to_index((1, 5)))
+        self.assertEqual(cost, 4)
+        self.assertFalse(grid.is_jump_point(grid.to_index((1, 3))))
+        self.assertTrue(grid.is_jump_point(grid.to_index((3, 3))))
+
+    def test_goal_in_the_middle_of_a_jump(self):
+        """ The goal is not a jump point, the search has to stop on it
+        rather than jump over it. Both ladders are as cheap, ties go to the
+        left one. """
+        grid = self.grid
+        goal = grid.to_index((1, 3))
+
+        found, parents, visit_order = jump_point_search(
+            grid,
+            grid.to_index((3, 3)),
+            goal
+        )
+
+        path = [grid.to_coord(c) for c in fill_jump_path(grid, parents, found)]
+
+        self.assertEqual(found, goal)
+        self.assertEqual(
+            path,
+            [(3, 3), (3, 2), (3, 1), (2, 1), (1, 1), (1, 2), (1, 3)]
+        )
+        self.assertLess(len(visit_order), len(path))
+
+    def test_path_is_as_cheap_as_dijkstra(self):
+        """ Walking slow tiles is part of the jump cost, so the path found
+        should cost the same as a full Dijkstra search. """
+        matrix = open_maze(12)
+        matrix[5] = [0] + [C.SLOW_GRID] * 10 + [0]
+        grid = GridGraph(matrix)
+
+        for start in (grid.to_index((1, 1)), grid.to_index((8, 3))):
+            goal = grid.to_index((10, 10))
+            goal_cells = bytearray(grid.get_cell_count())
+            goal_cells[goal] = 1
+
+            found, parents, _ = jump_point_search(grid, start, goal)
+            path = fill_jump_path(grid, parents, found)
+            _, dijkstra_parents, _ = nearest_goal_search(grid, start,
+                                                         goal_cells)
+            dijkstra_path = trace(grid, dijkstra_parents, goal)
+
+            self.assertEqual(
+                sum(grid.step_cost_list[c] for c in path[1:]),
+                sum(grid.step_cost_list[grid.to_index(c)]
+                    for c in dijkstra_path[1:])
+            )
+
+
+class TestBidirectionalSearch(unittest.TestCase):
+    """ Test the bidirectional searches find paths as good as the one way
+    searches, and report what both ends expanded. """
+
+    def setUp(self):
+        self.grid = GridGraph([row[:] for row in walkable_maze_matrix])
+        self.start = self.grid.to_index((1, 3))
+
+    def test_bfs_finds_shortest_path(self):
+        goal, parents, visit_order = bidirectional_breadth_first_search(
+            self.grid,
+            self.start,
+            self.grid.diamond_cells
+        )
+
+        self.assertEqual(goal, self.grid.to_index((3, 3)))
+        self.assertEqual(len(trace(self.grid, parents, goal)), 7)
+        self.assertIn(self.start, visit_order)
+        self.assertIn(goal, visit_order)
+
+    def test_a_star_avoids_slow_tiles(self):
+        """ The searches meet on the cheap route round the ladders, not on
+        the direct route over the slow tiles. """
+        grid = GridGraph([
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 3, 1, 1, 1, 3, 0],
+            [0, 3, 0, 0, 0, 3, 0],
+            [0, 3, 4, 4, 4, 1, 0],
+            [0, 0, 0, 0, 0, 0, 0]
+        ])
+        goal = grid.to_index((3, 5))
+
+        found, parents, _ = bidirectional_a_star_search(
+            grid,
+            grid.to_index((3, 1)),
+            goal
+        )
+
+        path = trace(grid, parents, found)
+
+        self.assertEqual(found, goal)
+        self.assertEqual(path[0], (3, 1))
+        self.assertIn((1, 3), path)
+        self.assertEqual(
+            sum(grid.step_cost_list[grid.to_index(c)] for c in path[1:]),
+            8
+        )
+
+    def test_a_star_is_as_cheap_as_dijkstra(self):
+        """ A row of slow tiles sits between the two ends, the first place
+        the searches meet is not always on the cheapest path. """
+        matrix = open_maze(12)
+        matrix[5] = [0] + [C.SLOW_GRID] * 10 + [0]
+        matrix[5][7] = C.WALKABLE_GRID
+        grid = GridGraph(matrix)
+        goal = grid.to_index((10, 10))
+        goal_cells = bytearray(grid.get_cell_count())
+        goal_cells[goal] = 1
+
+        for start in (grid.to_index((1, 1)), grid.to_index((3, 9))):
+            found, parents, _ = bidirectional_a_star_search(grid, start, goal)
+            _, dijkstra_parents, _ = nearest_goal_search(grid, start,
+                                                         goal_cells)
+
+            self.assertEqual(found, goal)
+            self.assertEqual(
+                sum(grid.step_cost_list[grid.to_index(c)]
+                    for c in trace(grid, parents, found)[1:]),
+                sum(grid.step_cost_list[grid.to_index(c)]
+                    for c in trace(grid, dijkstra_parents, goal)[1:])
+            )
+
+    def test_unreachable_goal_returns_no_cell(self):
+        """ Walling off both ladders cuts the top floor off from the
+        diamond. """
+        matrix = [row[:] for row in walkable_maze_matrix]
+        matrix[2][1] = matrix[2][5] = C.NON_WALKABLE_GRID
+        grid = GridGraph(matrix)
+        goal = grid.to_index((3, 3))
+
+        found, _, _ = bidirectional_breadth_first_search(
+            grid,
+            self.start,
+            grid.diamond_cells
+        )
+        self.assertEqual(found, NO_CELL)
+
+        found, _, _ = bidirectional_a_star_search(grid, self.start, goal)
+        self.assertEqual(found, NO_CELL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import unittest
+
+from agent.game_state import GameState
+from agent.competitive_computer import MinimaxComputer, AlphaBetaComputer
+from agent.transposition_table import (
+    ZobristHasher,
+    TranspositionTable,
+    EXACT,
+    LOWER_BOUND,
+    UPPER_BOUND
+)
+from testing.competitive_case import CompetitiveSearchTestCase
+
+
+class TestZobristHasher(unittest.TestCase):
+    """ Test node keys only depend on what the node is, not how the search
+    got there. """
+
+    def setUp(self):
+        self.hasher = ZobristHasher(100)
+        self.diamond_cells = (40, 60)
+
+    def key(self, state, player_action=None) -> int:
+        return self.hasher.get_key(state, self.diamond_cells, 1,
+                                   player_action, None)
+
+    def test_equal_states_have_equal_keys(self):
+        self.assertEqual(
+            self.key(GameState(10, (20, 30), 0b11)),
+            self.key(GameState(10, (20, 30), 0b11))
+        )
+
+    def test_enemies_are_told_apart(self):
+        """ The enemies move in turn, so two enemies swapping places is a
+        different node. """
+        self.assertNotEqual(
+            self.key(GameState(10, (20, 30), 0b11)),
+            self.key(GameState(10, (30, 20), 0b11))
+        )
+
+    def test_previous_action_is_part_of_the_key(self):
+        state = GameState(10, (20, 30), 0b11)
+
+        self.assertNotEqual(self.key(state), self.key(state, "LEFT"))
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """ Test what the table gives back for each kind of stored value. """
+
+    def setUp(self):
+        self.table = TranspositionTable(size=8)
+        self.table.new_search()
+
+    def test_size_is_rounded_up_to_a_power_of_two(self):
+        self.assertEqual(TranspositionTable(size=5).size, 8)
+
+    def test_shallower_entry_is_not_used(self):
+        self.table.store(3, depth=2, value=1.5, action="LEFT", nodes=10)
+
+        self.assertIsNone(self.table.lookup(3, depth=3))
+        self.assertEqual(self.table.lookup(3, depth=2), (1.5, "LEFT"))
+        self.assertEqual((self.table.hits, self.table.probes), (1, 2))
+        self.assertEqual(self.table.nodes_saved, 10)
+
+    def test_bounds_are_only_used_outside_the_window(self):
+        """ A value that failed high is a lower bound, it only answers a
+        search whose beta it still beats. """
+        self.table.store(3, 2, 5, "UP", 10, alpha=0, beta=4)
+        self.table.store(4, 2, -1, "UP", 10, alpha=0, beta=4)
+
+        self.assertEqual(self.table._slots[3][3], LOWER_BOUND)
+        self.assertEqual(self.table._slots[4][3], UPPER_BOUND)
+        self.assertIsNone(self.table.lookup(3, 2, alpha=0, beta=6))
+        self.assertEqual(self.table.lookup(3, 2, alpha=0, beta=5), (5, "UP"))
+        self.assertIsNone(self.table.lookup(4, 2, alpha=-2, beta=6))
+        self.assertEqual(self.table.lookup(4, 2, alpha=-1, beta=6),
+                         (-1, "UP"))
+
+    def test_deeper_entries_of_this_search_are_kept(self):
+        """ Keys 1 and 9 share a slot. A shallower entry does not replace a
+        deeper one from the same search, but does replace one from an
+        earlier search. """
+        self.table.store(1, 4, 0, "UP", 10)
+        self.table.store(9, 2, 0, "UP", 10)
+
+        self.assertEqual(self.table._slots[1][0], 1)
+        self.assertEqual(self.table._slots[1][3], EXACT)
+
+        self.table.new_search()
+        self.table.store(9, 2, 0, "UP", 10)
+
+        self.assertEqual(self.table._slots[1][0], 9)
+
+
+class TestCompetitiveTransposition(CompetitiveSearchTestCase):
+    """ Test the competitive computers share work through the table. """
+
+    def make_computer(self, computer_class, use_table):
+        computer = super().make_computer(computer_class)
+        computer.use_transposition_table = use_table
+
+        return computer
+
+    def test_table_gives_the_same_move(self):
+        for computer_class in (MinimaxComputer, AlphaBetaComputer):
+            with_table = self.make_computer(computer_class, True)
+            without_table = self.make_computer(computer_class, False)
+
+            self.assertEqual(
+                with_table.minimax(self.state, depth=8, agent_index=0),
+                without_table.minimax(self.state, depth=8, agent_index=0)
+            )
+            self.assertLessEqual(with_table.nodes_expanded,
+                                 without_table.nodes_expanded)
+
+    def test_table_is_kept_between_searches(self):
+        """ Searching the same position again is answered by the table
+        without expanding anything. """
+        computer = self.make_computer(AlphaBetaComputer, True)
+        result = computer.minimax(self.state, depth=6, agent_index=0)
+        computer.nodes_expanded = 0
+
+        self.assertEqual(
+            computer.minimax(self.state, depth=6, agent_index=0),
+            result
+        )
+        self.assertEqual(computer.nodes_expanded, 0)
+        self.assertEqual(computer.transposition_table.hits, 1)
+
+    def test_root_search_keeps_its_own_variation(self):
+        """ A position searched again from the root is searched rather than
+        answered by the table, so its principal variation is not the one
+        left over from the search before. """
+        computer = self.make_computer(AlphaBetaComputer, True)
+        other_state = dict(self.state, main_agent=(5, 10))
+        actions = []
+
+        for state in (self.state, other_state, self.state):
+            _, action = computer.search_to_depth(
+                computer.to_game_state(state), 8
+            )
+            actions.append(action)
+
+            self.assertEqual(computer.principal_variation[0], (0, action))
+
+        self.assertNotEqual(actions[0], actions[1])
+
+    def test_iterative_deepening_keeps_the_deepest_finished_search(self):
+        """ Iterative deepening should get past the first search in the
+        time given, and make the move of the deepest search that finished. """
+        computer = self.make_computer(AlphaBetaComputer, True)
+        computer.move_time_ms = 50
+
+        value, action = computer.iterative_deepening(
+            computer.to_game_state(self.state)
+        )
+
+        self.assertGreaterEqual(computer.search_depth, 2)
+        self.assertIsNone(computer._deadline)
+
+        fixed_depth = self.make_computer(AlphaBetaComputer, False)
+        self.assertEqual(
+            fixed_depth.minimax(self.state, depth=computer.search_depth,
+                                agent_index=0)[0],
+            value
+        )
+        self.assertIn(action, ["LEFT", "RIGHT", "UP", "DOWN"])
+
+    def test_first_search_always_finishes(self):
+        """ However small the budget, there is always a move to make. """
+        computer = self.make_computer(MinimaxComputer, True)
+        computer.move_time_ms = 1e-6
+
+        _, action = computer.iterative_deepening(
+            computer.to_game_state(self.state)
+        )
+
+        self.assertEqual(computer.search_depth, 1)
+        self.assertIsNotNone(action)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,9 @@ import pygame
 import random
 import time
 import inspect
+import numpy as np
+
+from grid_graph import GridGraph, NO_CELL, UNREACHABLE
 
 
 class Diamond(pygame.sprite.Sprite):
@@ -89,6 +92,8 @@ class World:
                 to be used in the game, and can be blit all at once with a
                 single method.
             _ladder_img (Surface): Holds the image a ladder.
+            _grid_graph (GridGraph): The compiled version of the walkable
+                maze matrix, which the computer classes search over.
 
         Args:
             world_matrix (list of lists): The initial matrix to be used for the
@@ -113,6 +118,7 @@ class World:
         # Also initialize the walkable maze now, so that the computer
         # can use it.
         self._find_walkable_areas_in_the_maze()
+        self._grid_graph = GridGraph.for_matrix(self._walkable_maze_matrix)
         self.was_highlight_ran = False
         self.diamond_regeneration_positions = {
             "small": C.small_regeneration,
@@ -240,6 +246,9 @@ class World:
                     self._world_matrix[i][j] = 0
                     self._walkable_maze_matrix[i][j] = 0
 
+        if clear_diamond_pos:
+            self._grid_graph.refresh()
+
         return location_of_ones_in_matrix
 
     def clear_diamond(self, grid_x, grid_y):
@@ -253,6 +262,8 @@ class World:
             self.diamond_filled_regeneration_count += 1
             self.fill_maze_with_diamonds()
 
+        self._grid_graph.refresh()
+
     def fill_maze_with_diamonds(self):
         """ This function will find update the coords of a diamond by removing
         the current diamond and placing a new diamond at a different location.
@@ -279,6 +290,8 @@ class World:
                 col_cnt += 1
             row_cnt += 1
 
+        self._grid_graph.refresh()
+
         return C.PASS
 
     def update_diamond_position(self, are_locations_defined=False):
@@ -328,6 +341,8 @@ class World:
             # through the column using the second index
             diamond.update_position(new_diamond_col, new_diamond_row)
 
+        self._grid_graph.refresh()
+
         return C.PASS
 
     def draw_grid(self, screen, screen_height, screen_width) -> None:
@@ -432,6 +447,48 @@ class World:
         time.sleep(3)
         return C.PASS
 
+    def get_spawn_grids(self, count, occupied) -> list:
+        """ Pick grids for characters to start on, each as far along the
+        maze as it can be from the occupied grids and the grids picked before
+        it. Only grids with a floor under them that the first occupied grid
+        can reach are picked, so nobody starts on a ladder or out of reach.
+        No grid is picked twice, so fewer than count grids are picked if
+        there are not that many free.
+
+        Args:
+            count (int): The number of grids to pick.
+            occupied (list of tuple): The (grid_y, grid_x) grids characters
+                already start on, the first being the main character's.
+
+        Returns:
+            list of tuple: The (grid_y, grid_x) grids picked.
+        """
+        grid = self._grid_graph
+        distances = grid.get_distance_table()
+        ranks = [
+            grid.walkable_rank[grid.to_index(coord)] for coord in occupied
+        ]
+        ranks = [rank for rank in ranks if rank != NO_CELL]
+
+        cells = grid.walkable_cells
+        candidates = grid.cell_types[cells] != C.LADDER_GRID
+        if ranks:
+            candidates &= distances[ranks[0]] != UNREACHABLE
+            nearest = distances[ranks].min(axis=0).astype(np.int64)
+        else:
+            nearest = np.full(len(cells), UNREACHABLE, dtype=np.int64)
+        candidates[ranks] = False
+
+        grids = []
+        for _ in range(min(count, int(candidates.sum()))):
+            rank = int(np.argmax(np.where(candidates, nearest, -1)))
+            grids.append(grid.to_coord(int(cells[rank])))
+
+            candidates[rank] = False
+            nearest = np.minimum(nearest, distances[rank])
+
+        return grids
+
     def print_walkable_maze_matrix(self) -> None:
         """ Print walkable maze matrix in a nice format """
         print(*self._walkable_maze_matrix, sep="\n")
@@ -439,6 +496,9 @@ class World:
     def get_walkable_maze_matrix(self) -> list:
         return self._walkable_maze_matrix
 
+    def get_grid_graph(self) -> GridGraph:
+        return self._grid_graph
+
     def get_collidable_tile_list(self) -> list:
         return self._collidable_tile_list
 